@@ -0,0 +1,60 @@
+"""
+Benchmark of the bytecode fast path - files with up-to-date __pycache__ bytecode without prints
+
+Usage: python benchmarks/bytecode.py [directory ...]
+"""
+import os
+import sys
+import time
+import warnings
+import compileall
+
+from noprint.bytecode import cached_code, uses_names
+from noprint.detect import Detector, PrintRule
+from noprint.module import walk_files
+from noprint.sprint import _parse_file, _Settings
+
+
+def _timed(files, bytecode):
+    """Scan all files, return total time and results"""
+    settings = _Settings(None, Detector([PrintRule()], bytecode=bytecode))
+    start = time.perf_counter()
+    results = [_parse_file(path, settings=settings).findings for path in files]
+    return time.perf_counter() - start, results
+
+
+def main():
+    """Run the benchmark"""
+    paths = sys.argv[1:] or [os.path.dirname(os.__file__)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for path in paths:  # Bytecode is up-to-date, as after a test run
+            compileall.compile_dir(path, quiet=2)
+    files = []
+    for path in [mod_file for root in paths for mod_file in walk_files(root)]:
+        try:  # Skip unparsable files and warm up OS caches
+            _timed([path], bytecode=False)
+        except (SyntaxError, LookupError, ValueError):
+            continue
+        files.append(path)
+
+    codes = [cached_code(path) for path in files]
+    fresh = sum(code is not None for code in codes)
+    cleared = sum(
+        code is not None and not uses_names(code, ["print"]) for code in codes
+    )
+    full, expected = _timed(files, bytecode=False)
+    fast, results = _timed(files, bytecode=True)
+    differ = sum(res != exp for res, exp in zip(results, expected))
+
+    sys.stdout.write(
+        f"files: {len(files)}, with up-to-date bytecode: {fresh}, cleared by bytecode: {cleared}\n"
+        f"results differing from the syntax tree: {differ}\n"
+        f"source only: {full:.3f}s\n"
+        f"with bytecode: {fast:.3f}s\n"
+        f"saved: {full - fast:.3f}s ({(full - fast) / full if full else 0:.1%})\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
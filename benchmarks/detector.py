@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of the detection engine against plain ast.walk lookup
+
+Usage: python benchmarks/detector.py [directory ...]
+"""
+import os
+import ast
+import sys
+import time
+
+from noprint.detect import Detector, PrintRule
+
+
+def _trees(paths):
+    """Parse all python files from given directories"""
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [name for name in dirs if name != "__pycache__"]
+            for name in files:
+                if not name.endswith(".py"):
+                    continue
+                with open(os.path.join(root, name), "rb") as file:
+                    try:
+                        yield ast.parse(file.read())
+                    except (SyntaxError, LookupError, ValueError):
+                        continue
+
+
+def _ast_walk(tree):
+    """Detection loop used before the detection engine"""
+    return [
+        node.lineno for node in ast.walk(tree) if node.__dict__.get("id") == "print"
+    ]
+
+
+def _detector_walk(tree, detector=Detector([PrintRule()])):
+    """Detection engine traversal"""
+    return [finding.line for finding in detector.walk(tree)]
+
+
+def _timed(func, trees, repeat=3):
+    """Best time out of several runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [sorted(func(tree)) for tree in trees]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    """Run the benchmark"""
+    paths = sys.argv[1:] or [os.path.dirname(os.__file__)]
+    trees = list(_trees(paths))
+
+    walk, expected = _timed(_ast_walk, trees)
+    engine, results = _timed(_detector_walk, trees)
+    assert results == expected, "Detection engine changed scan results"
+
+    sys.stdout.write(
+        f"trees: {len(trees)}\n"
+        f"ast.walk + __dict__: {walk:.3f}s\n"
+        f"detection engine: {engine:.3f}s\n"
+        f"speedup: {walk / engine if engine else 0:.2f}x\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of peak memory of the scan pipeline for growing package trees
+
+Usage: python benchmarks/memory.py [--depths N [N ...]] [--fanout N] [--workers N] [--queue-depth N]
+                                   [--executor KIND]
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+from noprint.bench import PACKAGE, generate
+from noprint.executors import EXECUTORS
+from noprint.sprint import Scanner
+
+
+def _scan(args) -> (int, int, float):
+    """Scan the generated package, return number of results, peak of traced memory and time"""
+    count = 0
+    with Scanner(
+        workers=args.workers, executor=args.executor, queue_depth=args.queue_depth
+    ) as scanner:
+        scanner.pool(args.executor)  # Pool startup isn't part of the measurement
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in scanner.results([PACKAGE]):
+            count += 1  # Results are consumed as they arrive, none are kept
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return count, peak, elapsed
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[2, 3, 4, 5], help="depths of trees"
+    )
+    parser.add_argument(
+        "--fanout", type=int, default=4, help="subpackages of every package"
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-depth", type=int, default=2)
+    parser.add_argument("--executor", choices=list(EXECUTORS), default="sequential")
+    parser.add_argument("--scan", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.scan:
+        json.dump(_scan(args), sys.stdout)
+        return
+
+    sys.stdout.write(
+        f"{args.executor} executor, {args.workers} workers, queue depth {args.queue_depth}\n"
+        f"{'depth':>6}{'modules':>10}{'results':>10}{'time [s]':>10}{'peak [KiB]':>12}\n"
+    )
+    for depth in args.depths:
+        with tempfile.TemporaryDirectory() as root:
+            tree = generate(root, depth=depth, fanout=args.fanout, modules=2, lines=30)
+            # Fresh interpreter for every tree, package is resolved from its working directory
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--scan"] + sys.argv[1:],
+                check=True,
+                cwd=root,
+                stdout=subprocess.PIPE,
+            ).stdout
+            count, peak, elapsed = json.loads(out)
+        sys.stdout.write(
+            f"{depth:>6}{tree.files:>10}{count:>10}{elapsed:>10.3f}{peak / 2**10:>12.0f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
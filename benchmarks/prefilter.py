@@ -0,0 +1,61 @@
+"""
+Benchmark of the textual pre-filter used before building the syntax tree
+
+Usage: python benchmarks/prefilter.py [directory ...]
+"""
+import os
+import sys
+import time
+
+from noprint.detect import Detector, PrintRule
+from noprint.sprint import _read_source
+
+
+def _python_files(paths):
+    """Collect all python files from given directories"""
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [name for name in dirs if name != "__pycache__"]
+            yield from (
+                os.path.join(root, name) for name in files if name.endswith(".py")
+            )
+
+
+def _timed(files, prefilter):
+    """Scan all files, return total time and results"""
+    detector = Detector([PrintRule()], prefilter=prefilter)
+    start = time.perf_counter()
+    results = [detector.scan(_read_source(path), filename=path) for path in files]
+    return time.perf_counter() - start, results
+
+
+def main():
+    """Run the benchmark"""
+    paths = sys.argv[1:] or [os.path.dirname(os.__file__)]
+    files = []
+    detector = Detector([PrintRule()], prefilter=False)
+    for path in _python_files(paths):
+        try:  # Skip unparsable files and warm up OS caches
+            detector.scan(_read_source(path), filename=path)
+        except (SyntaxError, LookupError, ValueError):
+            continue
+        files.append(path)
+
+    detector = Detector([PrintRule()])
+    cleared = sum(not detector.may_match(_read_source(path)) for path in files)
+    full, expected = _timed(files, prefilter=False)
+    fast, results = _timed(files, prefilter=True)
+    assert results == expected, "Pre-filter changed scan results"
+
+    hit_rate = cleared / len(files) if files else 0
+    sys.stdout.write(
+        f"files: {len(files)}\n"
+        f"pre-filter hit rate: {hit_rate:.1%} ({cleared} files cleared without parsing)\n"
+        f"full parse: {full:.3f}s\n"
+        f"with pre-filter: {fast:.3f}s\n"
+        f"saved: {full - fast:.3f}s ({(full - fast) / full if full else 0:.1%})\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
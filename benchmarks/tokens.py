@@ -0,0 +1,106 @@
+"""
+Benchmark of token stream detection against syntax tree detection
+
+Reports throughput and peak memory on a large generated module (or given files) and agreement of both
+engines on a directory tree.
+
+Usage: python benchmarks/tokens.py [--lines N] [--compare directory] [file ...]
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from noprint.detect import ENGINES, PrintRule
+
+MEASURE = """
+import sys, json, time, resource
+from noprint.detect import ENGINES, PrintRule
+detector = ENGINES[sys.argv[1]]([PrintRule()], prefilter=False)
+with open(sys.argv[2], "rb") as file:
+    data = file.read()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+findings = detector.scan(data)
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+json.dump({"time": elapsed, "rss": after - before, "findings": len(findings)}, sys.stdout)
+"""
+
+
+def _generate(lines: int) -> str:
+    """Generate large module resembling protobuf generated code"""
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as file:
+        file.write("from google.protobuf import descriptor as _descriptor\n\n")
+        for i in range(lines // 8):
+            statement = f"print(_MSG{i})" if i % 1000 == 0 else "pass"
+            file.write(
+                f"_MSG{i} = _descriptor.Descriptor(\n"
+                f"    name='Msg{i}', full_name='pkg.Msg{i}', filename=None,\n"
+                f"    fields=[_descriptor.FieldDescriptor(name='field', index={i}, number=1,\n"
+                f"        type=9, cpp_type=9, label=1, has_default_value=False,\n"
+                f"        default_value=b''.decode('utf-8'), message_type=None)],\n"
+                f"    serialized_start={i * 64}, serialized_end={i * 64 + 63},\n"
+                ")\n"
+                f"{statement}\n"
+            )
+        return file.name
+
+
+def _measure(engine: str, path: str) -> dict:
+    """Scan file in separate process to get its peak memory"""
+    out = subprocess.run(
+        [sys.executable, "-c", MEASURE, engine, path],
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout
+    return json.loads(out)
+
+
+def _compare(path: str):
+    """Compare findings of both engines on all python files within directory"""
+    detectors = {name: engine([PrintRule()]) for name, engine in ENGINES.items()}
+    files = differ = total = 0
+    for root, _, names in os.walk(path):
+        for name in (name for name in names if name.endswith(".py")):
+            with open(os.path.join(root, name), "rb") as file:
+                data = file.read()
+            try:
+                findings = {key: det.scan(data) for key, det in detectors.items()}
+            except (SyntaxError, LookupError, ValueError):
+                continue
+            files += 1
+            total += len(findings["ast"])
+            if findings["ast"] != findings["tokens"]:
+                differ += 1
+                sys.stdout.write(f"  differs: {os.path.join(root, name)}\n")
+    sys.stdout.write(f"agreement: {files - differ}/{files} files, {total} prints\n")
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=40000)
+    parser.add_argument("--compare", default=os.path.dirname(os.__file__))
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    files = args.files or [_generate(args.lines)]
+    for path in files:
+        size = os.path.getsize(path) / 2**20
+        sys.stdout.write(f"{path} ({size:.1f} MiB)\n")
+        for engine in ENGINES:
+            res = _measure(engine, path)
+            sys.stdout.write(
+                f"  {engine:>6}: {res['time']:.3f}s, {size / res['time']:.1f} MiB/s, "
+                f"peak RSS +{res['rss'] / 1024:.1f} MiB, {res['findings']} prints\n"
+            )
+    if not args.files:
+        os.unlink(files[0])
+    _compare(args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,14 @@
 Initial module for NoPrint containing constants and cli reference
 """
 
-ENCODING_CAPTURE = r"^[ \t\f]*#.*?coding[:=][ \t]*([-_.a-zA-Z0-9]+)"
+__version__ = "3.1.1"
+
+# Defaults and choices of CLI options, parsing arguments doesn't need to import anything else
+CACHE_DIR = ".noprint_cache"
+CHUNK_SIZE = 2**18  # Bytes of source files sent to a worker within a single job
+ENGINE_NAMES = ("ast", "tokens")  # noprint.detect.ENGINES
+FORMAT_NAMES = ("json", "jsonl", "sarif")  # noprint.output.FORMATS
+EXECUTOR_NAMES = ("sequential", "thread", "process")  # noprint.executors.EXECUTORS
+# noprint.archive
+ARCHIVE_SUFFIXES = (".whl", ".zip", ".egg", ".pyz", ".tar.gz", ".tgz", ".tar")
+NOTEBOOK_SUFFIX = ".ipynb"  # noprint.notebook
@@ -0,0 +1,139 @@
+"""
+Python files within wheels, sdists and zip archives, read without extracting anything to disk
+"""
+import os
+import zipfile
+import tarfile
+import threading
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+from noprint import ARCHIVE_SUFFIXES
+from noprint.exceptions import ImportException
+
+ZIP_SUFFIXES = (".whl", ".zip", ".egg", ".pyz")  # Read by zipfile, the rest by tarfile
+
+_local = threading.local()  # Zip archive opened last within the thread
+
+
+class Member(NamedTuple):
+    """Python file within an archive, data is carried along only for archives without random access"""
+
+    archive: str
+    member: str  # Name of the member, always with / separators
+    size: int
+    data: Optional[bytes] = None
+    # Directory within the archive the member was listed from, like a zipimport sys.path entry
+    prefix: str = ""
+
+    @property
+    def path(self) -> str:
+        """Path of the member, in the form accepted by zipimport"""
+        return f"{self.archive}/{self.member}"
+
+    @property
+    def name(self) -> str:
+        """Module name derived from the path of the member within its directory of the archive"""
+        parts = self.member[len(self.prefix) : -3].split("/")
+        if parts[-1] == "__init__" and len(parts) > 1:
+            parts.pop()
+        return ".".join(parts)
+
+
+def split_archive(path: str) -> Optional[Tuple[str, str]]:
+    """Archive file and directory within it (empty for the whole archive), None for other paths
+
+    Directories within zip archives are given like sys.path entries for zipimport, e.g. dist/lib.zip/src
+    """
+    path = path.replace(os.sep, "/")
+    if path.endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path):
+        return path, ""
+    parts = path.split("/")
+    for idx in range(len(parts) - 1, 0, -1):
+        archive = "/".join(parts[:idx])
+        if archive.endswith(ZIP_SUFFIXES) and os.path.isfile(archive):
+            return archive, "/".join(parts[idx:]).strip("/") + "/"
+    return None
+
+
+def _accepts(path_filter, member: str) -> bool:
+    """Check the member and directories it's in against the path filter, relative to the listed directory"""
+    if path_filter is None:
+        return True
+    parts = member.split("/")
+    for idx in range(1, len(parts)):
+        if not path_filter.accepts_dir("/".join(parts[:idx])):
+            return False
+    return path_filter.accepts_file(member)
+
+
+def _sdist_root(member: str) -> str:
+    """Leading directories of the tar member which aren't a part of module names
+
+    Sdists keep everything within name-version/ (not a valid package name), optionally with src/ layout
+    """
+    parts = member.split("/")
+    if len(parts) < 2 or parts[0].isidentifier():
+        return ""
+    if len(parts) > 2 and parts[1] == "src":
+        return f"{parts[0]}/src/"
+    return f"{parts[0]}/"
+
+
+def members(archive: str, prefix: str = "", path_filter=None) -> Iterator[Member]:
+    """Python files of the archive (within given directory), compressed tar archives are streamed
+
+    Zip members are read later by the job scanning them, tar members are read right away
+    """
+    try:
+        yield from _members(archive, prefix, path_filter)
+    except (OSError, zipfile.BadZipFile, tarfile.TarError) as exc:
+        raise ImportException(f"Unable to read archive [{archive}]: {exc}") from exc
+
+
+def _members(archive: str, prefix: str, path_filter) -> Iterator[Member]:
+    if archive.endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive) as zfile:
+            infos = zfile.infolist()
+        for info in infos:
+            name = info.filename
+            if (
+                name.endswith(".py")
+                and name.startswith(prefix)
+                and not info.is_dir()
+                and _accepts(path_filter, name[len(prefix) :])
+            ):
+                yield Member(archive, name, info.file_size, prefix=prefix)
+        return
+
+    with tarfile.open(archive, "r|*") as tfile:
+        for info in tfile:
+            name = info.name
+            if not (info.isfile() and name.endswith(".py")):
+                continue
+            root = _sdist_root(name)
+            if _accepts(path_filter, name[len(root) :]):
+                data = tfile.extractfile(info).read()
+                yield Member(archive, name, info.size, data, root)
+
+
+def _zip(archive: str) -> zipfile.ZipFile:
+    """Zip archive opened last within this thread, reopened once it changes"""
+    stat = os.stat(archive)
+    key = (archive, stat.st_mtime_ns, stat.st_size)
+    opened = getattr(_local, "opened", None)
+    if opened is None or opened[0] != key:
+        if opened is not None:
+            opened[1].close()
+        # Kept open for following members of the archive, closed once another one is read
+        opened = _local.opened = (
+            key,
+            zipfile.ZipFile(archive),  # pylint: disable=consider-using-with
+        )
+    return opened[1]
+
+
+def read(member: Member) -> bytes:
+    """Source of the member, zip archives are opened once for consecutive members"""
+    if member.data is not None:
+        return member.data
+    return _zip(member.archive).read(member.member)
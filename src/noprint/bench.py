@@ -0,0 +1,291 @@
+"""
+Benchmark suite - synthetic package trees timed through discovery, parsing and end-to-end scans
+
+Usage: python -m noprint.bench [--depth N] [--fanout N] [--modules N] [--lines N] [--density F]
+                               [--missing-init F] [--workers N [N ...]] [--executor KIND] [--json FILE]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+from typing import List, NamedTuple, Optional, Tuple
+
+from noprint.executors import EXECUTORS
+from noprint.sprint import _get_module, _get_subpackages, _parse_pyfile
+
+PACKAGE = "noprint_bench_pkg"
+
+END_TO_END = """
+import sys, json, time
+from noprint.sprint import Scanner, detect_prints, _targets
+try:
+    import resource
+except ImportError:
+    resource = None
+start = time.perf_counter()
+with Scanner(workers=int(sys.argv[2]), executor=sys.argv[3]) as scanner:
+    kind = scanner.choose_executor(list(_targets([sys.argv[1]])))
+    if kind != "sequential":
+        scanner.pool(kind).submit(int).result()  # Pool startup round trip
+    ready = time.perf_counter()
+    status = detect_prints(scanner, [sys.argv[1]])
+elapsed = time.perf_counter() - start
+rss = None
+if resource is not None:
+    rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    ) * (1 if sys.platform == "darwin" else 1024)
+json.dump(
+    {"time": elapsed, "pool": ready - start, "rss": rss, "status": status, "executor": kind},
+    sys.stdout,
+)
+"""
+
+
+class TreeStats(NamedTuple):
+    """Size of the generated package tree"""
+
+    packages: int
+    files: int
+    bytes: int
+    prints: int
+
+
+class Timing(NamedTuple):
+    """Result of a single benchmark phase"""
+
+    phase: str
+    workers: int
+    time: float
+    files: int
+    rss: Optional[int] = None  # Peak resident memory in bytes, end-to-end only
+    pool: Optional[float] = None  # Pool startup, end-to-end only
+    executor: Optional[str] = None  # Executor picked for the scan, end-to-end only
+
+    @property
+    def files_per_sec(self) -> float:
+        """Throughput of the phase"""
+        return self.files / self.time if self.time else 0.0
+
+
+def _module_source(rng: random.Random, lines: int, density: float) -> Tuple[str, int]:
+    """Source of a module with roughly given number of lines and share of prints"""
+    out, prints = ["import os\n", "\n"], 0
+    number = 0
+    while len(out) < lines:
+        number += 1
+        out.append(f"def func_{number}(arg, *args, **kwargs):\n")
+        out.append(f'    """Function number {number}"""\n')
+        out.append("    value = [item * 2 for item in args if item] + list(kwargs)\n")
+        # Share of lines with print is density, every function takes 6 lines
+        if rng.random() < density * 6:
+            out.append("    print(value)\n")
+            prints += 1
+        else:
+            out.append("    value.append(os.sep)\n")
+        out.append("    return {'arg': arg, 'value': value}\n")
+        out.append("\n")
+    return "".join(out), prints
+
+
+def generate(  # pylint: disable=too-many-arguments,too-many-locals
+    root: str,
+    *,
+    depth: int = 3,
+    fanout: int = 3,
+    modules: int = 5,
+    lines: int = 200,
+    density: float = 0.01,
+    missing_init: float = 0.1,
+    seed: int = 0,
+) -> TreeStats:
+    """Generate package tree - every package has fanout subpackages (up to depth) and given number of modules
+
+    Share of subpackages given by missing_init has no __init__.py"""
+    rng = random.Random(seed)
+    packages = files = size = prints = 0
+    directories = [(os.path.join(root, PACKAGE), 0)]
+    while directories:
+        directory, level = directories.pop()
+        os.makedirs(directory)
+        packages += 1
+        names = [f"mod_{i}.py" for i in range(modules)]
+        if level == 0 or rng.random() >= missing_init:
+            names.append("__init__.py")
+        for name in names:
+            source, found = _module_source(rng, lines, density)
+            with open(os.path.join(directory, name), "w", encoding="utf-8") as file:
+                file.write(source)
+            files += 1
+            size += len(source)
+            prints += found
+        if level < depth:
+            directories.extend(
+                (os.path.join(directory, f"sub_{i}"), level + 1) for i in range(fanout)
+            )
+    return TreeStats(packages, files, size, prints)
+
+
+def discover(package: str) -> list:
+    """Resolve the package and all its subpackages in the current process"""
+    found = []
+    frontier = [_get_module(package)]
+    while frontier:
+        module = frontier.pop()
+        found.append(module)
+        frontier.extend(_get_subpackages(module.name, module))
+    return found
+
+
+def bench_discovery(package: str) -> Tuple[Timing, list]:
+    """Time module discovery (what _parse_module does besides scanning)"""
+    start = time.perf_counter()
+    modules = discover(package)
+    elapsed = time.perf_counter() - start
+    files = sum(len(module.origin) for module in modules)
+    return Timing("discovery", 0, elapsed, files), modules
+
+
+def bench_parsing(modules: list) -> Timing:
+    """Time reading and scanning all files of discovered modules in the current process"""
+    start = time.perf_counter()
+    files = 0
+    for module in modules:
+        if module.origin:
+            files += len(_parse_pyfile(module).files)
+    return Timing("parsing", 0, time.perf_counter() - start, files)
+
+
+def bench_end_to_end(  # pylint: disable=too-many-arguments
+    package: str, workers: int, files: int, cwd: str, executor: str = "auto"
+) -> Timing:
+    """Time detect_prints in a fresh interpreter, so its peak memory and pool startup are measured"""
+    out = subprocess.run(
+        [sys.executable, "-c", END_TO_END, package, str(workers), executor],
+        check=True,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ).stdout
+    result = json.loads(out)
+    return Timing(
+        "end-to-end",
+        workers,
+        result["time"],
+        files,
+        result["rss"],
+        result["pool"],
+        result["executor"],
+    )
+
+
+def run(args, root: str) -> List[Timing]:
+    """Generate the tree and run all phases"""
+    stats = generate(
+        root,
+        depth=args.depth,
+        fanout=args.fanout,
+        modules=args.modules,
+        lines=args.lines,
+        density=args.density,
+        missing_init=args.missing_init,
+        seed=args.seed,
+    )
+    sys.stdout.write(
+        f"tree: {stats.packages} packages, {stats.files} files, "
+        f"{stats.bytes / 2**20:.1f} MiB, {stats.prints} prints\n"
+    )
+
+    cwd = os.getcwd()
+    os.chdir(root)  # Package is resolved from the working directory
+    try:
+        discovery, modules = bench_discovery(PACKAGE)
+        parsing = bench_parsing(modules)
+    finally:
+        os.chdir(cwd)
+    timings = [discovery, parsing]
+    for workers in args.workers:
+        timings.append(
+            bench_end_to_end(PACKAGE, workers, stats.files, root, args.executor)
+        )
+    return timings
+
+
+def _table(timings: List[Timing]) -> str:
+    """Human readable summary"""
+    rows = [
+        f"{'phase':<12}{'workers':>8}{'time [s]':>10}{'files/s':>10}{'pool [s]':>10}{'rss [MiB]':>11}"
+        f"{'executor':>12}"
+    ]
+    for timing in timings:
+        pool = f"{timing.pool:.3f}" if timing.pool is not None else "-"
+        rss = f"{timing.rss / 2**20:.1f}" if timing.rss is not None else "-"
+        rows.append(
+            f"{timing.phase:<12}{timing.workers or '-':>8}{timing.time:>10.3f}"
+            f"{timing.files_per_sec:>10.0f}{pool:>10}{rss:>11}{timing.executor or '-':>12}"
+        )
+    return "\n".join(rows) + "\n"
+
+
+def main(argv=None):
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m noprint.bench", description=__doc__.split("\n")[1]
+    )
+    parser.add_argument("--depth", type=int, default=3, help="levels of subpackages")
+    parser.add_argument(
+        "--fanout", type=int, default=3, help="subpackages of every package"
+    )
+    parser.add_argument(
+        "--modules", type=int, default=5, help="modules of every package"
+    )
+    parser.add_argument("--lines", type=int, default=200, help="lines of every module")
+    parser.add_argument(
+        "--density", type=float, default=0.01, help="share of lines with print"
+    )
+    parser.add_argument(
+        "--missing-init",
+        type=float,
+        default=0.1,
+        help="share of subpackages without __init__.py",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, os.cpu_count() or 1],
+        help="worker counts of end-to-end runs",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["auto"] + list(EXECUTORS),
+        default="auto",
+        help="executor of end-to-end runs",
+    )
+    parser.add_argument("--json", metavar="FILE", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        timings = run(args, root)
+    sys.stdout.write(_table(timings))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(
+                [
+                    dict(timing._asdict(), files_per_sec=timing.files_per_sec)
+                    for timing in timings
+                ],
+                file,
+                indent=2,
+            )
+    return timings
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
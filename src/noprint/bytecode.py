@@ -0,0 +1,68 @@
+"""
+Names used by up-to-date bytecode from __pycache__, checked instead of reading and parsing the source
+"""
+import os
+import marshal
+import __future__
+from types import CodeType
+from typing import Iterable, Optional
+from importlib.util import MAGIC_NUMBER, cache_from_source, source_hash
+
+# Flags of pyc header (PEP 552)
+FLAG_HASH = 0b01
+# Annotations are kept as strings by "from __future__ import annotations", the flag differs between versions
+CO_FUTURE_ANNOTATIONS = __future__.annotations.compiler_flag
+
+
+def _fresh(data: bytes, path: str) -> bool:
+    """Validate pyc header against the source file - modification time and size or hash of the source"""
+    if len(data) < 16 or data[:4] != MAGIC_NUMBER:
+        return False
+    if int.from_bytes(data[4:8], "little") & FLAG_HASH:
+        with open(path, "rb") as file:
+            return data[8:16] == source_hash(file.read())
+    stat = os.stat(path)
+    return (
+        int.from_bytes(data[8:12], "little") == int(stat.st_mtime) & 0xFFFFFFFF
+        and int.from_bytes(data[12:16], "little") == stat.st_size & 0xFFFFFFFF
+    )
+
+
+def cached_code(path: str) -> Optional[CodeType]:
+    """Code object of the source file from __pycache__, None unless the pyc is up-to-date"""
+    try:
+        with open(cache_from_source(path), "rb") as file:
+            data = file.read()
+        if not _fresh(data, path):
+            return None
+        code = marshal.loads(memoryview(data)[16:])
+    except (OSError, ValueError, EOFError, TypeError, NotImplementedError):
+        return None
+    return code if isinstance(code, CodeType) else None
+
+
+def uses_names(code: CodeType, names: Iterable[str]) -> bool:
+    """Check the code object and all code objects nested in it for any use of the names
+
+    Global, local, free and attribute names are checked, as well as string constants when
+    annotations are postponed"""
+    names = frozenset(names)
+    stack = [code]
+    while stack:
+        code = stack.pop()
+        if not names.isdisjoint(code.co_names) or not names.isdisjoint(
+            code.co_varnames + code.co_cellvars + code.co_freevars
+        ):
+            return True
+        strings = code.co_flags & CO_FUTURE_ANNOTATIONS
+        consts = list(code.co_consts)
+        while consts:
+            const = consts.pop()
+            if isinstance(const, CodeType):
+                stack.append(const)
+            elif isinstance(const, (tuple, frozenset)):
+                consts.extend(const)
+            elif strings and isinstance(const, str):
+                if any(name in const for name in names):
+                    return True
+    return False
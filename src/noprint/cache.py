@@ -0,0 +1,113 @@
+"""
+Persistent on-disk cache of per-file scan results
+"""
+import os
+import sys
+import json
+import hashlib
+
+from noprint import CACHE_DIR, __version__
+from noprint.detect import Finding
+
+CACHE_FILE = "results.json"
+
+
+def hasher(data: bytes = b""):
+    """Incremental content hash, fed by files which are streamed rather than read at once"""
+    return hashlib.blake2b(data, digest_size=16)
+
+
+def digest(data: bytes) -> str:
+    """Content hash used when file stats don't match the cached entry"""
+    return hasher(data).hexdigest()
+
+
+class ResultCache:
+    """Cache of findings keyed on (path, size, mtime_ns) with a content hash fallback"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, signature: str = ""):
+        self.path = os.path.join(cache_dir, CACHE_FILE)
+        self.header = {
+            "noprint": __version__,
+            "python": sys.version,
+            "signature": signature,
+        }
+        self.entries = {}  # path -> [size, mtime_ns, digest, findings]
+        self.updates = {}
+        self.stamp = None  # (size, mtime_ns) of the cache file when it was read
+
+    def _stamp(self):
+        """Size and modification time of the cache file, None when it doesn't exist"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _read(self) -> dict:
+        """Read entries from disk, discard everything written by a different setup"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(content, dict) or content.get("header") != self.header:
+            return {}
+        return content.get("files", {})
+
+    def load(self):
+        """Load cache contents from disk"""
+        self.stamp = self._stamp()
+        self.entries = self._read()
+        return self
+
+    def refresh(self):
+        """Reload cache contents if the file was replaced since it was read"""
+        if self._stamp() != self.stamp:
+            self.load()
+        return self
+
+    def lookup(self, path: str, stat: os.stat_result):
+        """Get cached findings if file stats match, otherwise return None"""
+        entry = self.entries.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return tuple(Finding(*finding) for finding in entry[3])
+        return None
+
+    def lookup_digest(self, path: str, data: bytes):
+        """Get cached findings if file contents didn't change, otherwise return None"""
+        entry = self.entries.get(path)
+        if entry and entry[2] == digest(data):
+            return tuple(Finding(*finding) for finding in entry[3])
+        return None
+
+    def store(self, path: str, key: tuple, findings: tuple):
+        """Record scan result of a file, key being (size, mtime_ns, digest)"""
+        self.updates[path] = [*key, [list(finding) for finding in findings]]
+
+    def save(self):
+        """Merge updates with entries on disk and replace the cache file atomically"""
+        if not self.updates:
+            return
+        entries = self._read()  # Another job might have written in the meantime
+        entries.update(self.updates)
+        entries = {
+            path: entry for path, entry in entries.items() if os.path.isfile(path)
+        }
+
+        import tempfile  # pylint: disable=import-outside-toplevel
+
+        cache_dir = os.path.dirname(self.path)
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=cache_dir, suffix=".tmp", delete=False
+        ) as file:
+            try:
+                json.dump({"header": self.header, "files": entries}, file)
+            except Exception:
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, self.path)
+        self.stamp = self._stamp()
+        self.entries = entries
+        self.updates = {}
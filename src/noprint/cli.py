@@ -1,18 +1,21 @@
 """
 CLI module for NoPrint
 """
+import os
 import sys
 import argparse
-import contextvars
-from multiprocessing import cpu_count
 
-import noprint.logger as logging
+from noprint import (
+    CACHE_DIR,
+    CHUNK_SIZE,
+    ENGINE_NAMES,
+    EXECUTOR_NAMES,
+    FORMAT_NAMES,
+    __version__,
+)
 
-from noprint.sprint import detect_prints
-
-
-log_lvl = contextvars.ContextVar("log_lvl")
-error_out = contextvars.ContextVar("error_out")
+# Scanning modules are imported only once arguments are parsed, --version and argument errors stay fast
+# pylint: disable=import-outside-toplevel
 
 
 def parse_args():
@@ -41,8 +44,10 @@ def parse_args():
     )
     parser.add_argument(
         "packages",
-        help="which packages/modules to check, syntax: <package>[.<module> ...], e.g. noprint or noprint.cli",
-        nargs="+",
+        help="which packages/modules to check, syntax: <package>[.<module> ...], e.g. noprint or noprint.cli; "
+        "file and directory paths (e.g. src/noprint/, cli.py or demo.ipynb) are scanned directly, "
+        "as are wheels, sdists and zip archives (e.g. dist/noprint.whl or lib.zip/src)",
+        nargs="*",
         type=str,
     )
     parser.add_argument(
@@ -53,52 +58,214 @@ def parse_args():
         type=int,
         help="set how many threads to use",
     )
-    parser.add_argument("--version", action="version", version="%(prog)s 3.1.1")
+    parser.add_argument(
+        "--executor",
+        choices=("auto",) + EXECUTOR_NAMES,
+        default="auto",
+        help="how jobs are run - inline, in threads or in worker processes; "
+        "auto runs small scans inline and large ones in worker processes (default: auto)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        default=CHUNK_SIZE,
+        type=int,
+        metavar="BYTES",
+        help=f"bytes of source files sent to a worker within a single job (default: {CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="skip files and directories matching glob or dotted name (e.g. migrations, *_pb2.py or "
+        "pkg.vendor), excluded directories are never listed; can be repeated and extends "
+        "exclude of [tool.noprint] in pyproject.toml",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="scan only files matching glob or dotted name; can be repeated and extends "
+        "include of [tool.noprint] in pyproject.toml",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="scan only files changed since given git reference (limited to packages, if any are given)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=ENGINE_NAMES,
+        default="ast",
+        help="detection engine - full syntax tree or token stream (faster and lighter on large files)",
+    )
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="always build the syntax tree, even for files which can't contain a print",
+    )
+    parser.add_argument(
+        "--bytecode",
+        action="store_true",
+        help="files with up-to-date __pycache__ bytecode which doesn't use print at all are reported clear "
+        "without reading their source; annotations of local variables are not compiled, so files using "
+        "print only there (def f(): x: print = 1) are reported clear too",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        nargs="?",
+        const=CACHE_DIR,
+        default=None,
+        help=f"reuse results of unchanged files, stored in given directory (default: {CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text",) + FORMAT_NAMES,
+        default="text",
+        help="report format - text is logged, other formats are streamed to standard output",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="show time spent in each phase, file counters and slowest files after the scan",
+    )
+    parser.add_argument(
+        "--stats-json",
+        metavar="FILE",
+        help="write the statistics as JSON into the file",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="profile the scan (including pool workers) and dump results readable with pstats into the file",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and report new and resolved prints whenever files change",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        default=0.5,
+        type=float,
+        metavar="SECONDS",
+        help="how often files are checked for changes in watch mode (default: 0.5)",
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
     args = parser.parse_known_intermixed_args()[0]
+    if not args.packages and args.changed_since is None:
+        parser.error("packages are required, unless --changed-since is given")
+    if args.watch and (args.first_only or args.changed_since is not None):
+        parser.error("--watch can't be combined with --first-only or --changed-since")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    if args.watch and args.format != "text":
+        parser.error("--watch supports only text format")
+    if args.watch:
+        from noprint.archive import split_archive
+
+        if any(split_archive(pkg) for pkg in args.packages):
+            parser.error("--watch can't be used with archives")
+    _read_config(parser, args)
 
-    err_out = args.error_out
-    first_only = args.first_only
-    verbose = bool(args.verbose)
-    very_verbose = args.verbose >= 2
-    packages = args.packages
-    multi = (
-        cpu_count()
+    args.multi = (
+        (os.cpu_count() or 1)
         if args.multi is not None and args.multi <= 0
         else args.multi
         if args.multi
         else 1
     )  # cpu_count when <=0; 1 when not given; otherwise multi
+    return args
+
 
-    lvl = logging.ERROR if err_out else logging.WARNING
+def _read_config(parser, args):
+    """Extend patterns given as arguments with [tool.noprint] section of the closest pyproject.toml"""
+    from noprint.config import find_pyproject, load_config
+    from noprint.exceptions import ConfigException
 
-    var = contextvars.ContextVar("packages")
-    var.set(packages)
-    var = contextvars.ContextVar("first_only")
-    var.set(first_only)
-    var = contextvars.ContextVar("verbose")
-    var.set(verbose)
-    var = contextvars.ContextVar("very_verbose")
-    var.set(very_verbose)
-    var = contextvars.ContextVar("mt_threads")
-    var.set(multi)
+    path = find_pyproject()
+    if path is None:
+        return
+    try:
+        config = load_config(path)
+    except (ConfigException, OSError) as exc:
+        parser.error(str(exc))
+    args.include = config.get("include", []) + args.include
+    args.exclude = config.get("exclude", []) + args.exclude
 
-    log_lvl.set(lvl)
-    error_out.set(err_out)
+
+def _write_stats(args, scanner):
+    """Show or store statistics and profile of the scan"""
+    if args.stats:
+        sys.stderr.write(scanner.stats.table(scanner.workers))
+    if args.stats_json:
+        import json
+
+        with open(args.stats_json, "w", encoding="utf-8") as file:
+            json.dump(scanner.stats.summary(scanner.workers), file, indent=2)
+    if args.profile:
+        scanner.stats.dump_profile(args.profile)
 
 
 def cli():
     """CLI function"""
-    parse_args()
+    args = parse_args()
+
+    import noprint.logger as logging
+    from noprint.sprint import Scanner, detect_prints
+
+    lvl = logging.ERROR if args.error_out else logging.WARNING
+    output = None
+    if args.format != "text":
+        from noprint.output import FORMATS
+
+        output = FORMATS[args.format](error_out=args.error_out)
+
+    with Scanner(
+        workers=args.multi,
+        first_only=args.first_only,
+        mode=args.mode,
+        prefilter=not args.no_prefilter,
+        bytecode=args.bytecode,
+        cache_dir=args.cache_dir,
+        verbose=bool(args.verbose),
+        stats=args.stats or args.stats_json is not None,
+        profile=args.profile is not None,
+        executor=args.executor,
+        chunk_size=args.chunk_size,
+        include=args.include,
+        exclude=args.exclude,
+    ) as scanner:
+        if args.watch:
+            from noprint.watch import Watcher
 
-    result = detect_prints()
+            try:
+                Watcher(scanner, args.packages, interval=args.poll_interval).run(
+                    args.verbose, lvl
+                )
+            except KeyboardInterrupt:
+                sys.exit(0)
+        result = detect_prints(
+            scanner,
+            args.packages,
+            changed_since=args.changed_since,
+            verbosity=args.verbose,
+            level=lvl,
+            output=output,
+        )
+        if scanner.stats is not None:
+            _write_stats(args, scanner)
 
     if result == 2:
         logging.log("Exiting with critical status", logging.CRITICAL)
     elif result == 1:
-        logging.log("Print statements detected", log_lvl.get())
+        logging.log("Print statements detected", lvl)
     else:
         logging.log("No print statements found, cheers 🍺", logging.INFO)
 
-    if not error_out.get() and result == 1:
+    if not args.error_out and result == 1:
         result = 0
     sys.exit(result)  # 0 when success, 1 for error, 2 for critical
@@ -0,0 +1,63 @@
+"""
+Settings read from [tool.noprint] section of pyproject.toml
+"""
+import os
+from typing import Dict, List, Optional
+
+from noprint.exceptions import ConfigException
+
+SECTION = b"[tool.noprint]"
+OPTIONS = ("include", "exclude")  # Lists of patterns, see noprint.filters.PathFilter
+
+
+def _toml():
+    """TOML parser - tomllib of Python 3.11+ or tomli package (dependency on older versions)"""
+    # pylint: disable=import-outside-toplevel
+    try:
+        import tomllib
+    except ImportError:
+        import tomli as tomllib
+    return tomllib
+
+
+def find_pyproject(directory: Optional[str] = None) -> Optional[str]:
+    """Closest pyproject.toml within the directory (working directory by default) or its parents"""
+    directory = os.path.abspath(directory or os.getcwd())
+    while True:
+        path = os.path.join(directory, "pyproject.toml")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def load_config(path: str) -> Dict[str, List[str]]:
+    """Options of [tool.noprint] section, TOML is parsed only when the file contains the section"""
+    with open(path, "rb") as file:
+        data = file.read()
+    if SECTION not in data:
+        return {}
+    toml = _toml()
+    try:
+        section = toml.loads(data.decode("utf-8")).get("tool", {}).get("noprint", {})
+    except (toml.TOMLDecodeError, UnicodeDecodeError) as exc:
+        raise ConfigException(f"Unable to read [{path}]: {exc}") from exc
+
+    config = {}
+    for key, value in section.items():
+        if key not in OPTIONS:
+            raise ConfigException(
+                f"Unknown option [{key}] in [tool.noprint] of [{path}]"
+            )
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list) or not all(
+            isinstance(pat, str) for pat in value
+        ):
+            raise ConfigException(
+                f"Option [{key}] in [tool.noprint] of [{path}] must be a list of patterns"
+            )
+        config[key] = value
+    return config
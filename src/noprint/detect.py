@@ -0,0 +1,284 @@
+"""
+Detection engine - single syntax tree traversal shared by all rules
+"""
+import io
+import re
+import ast
+import keyword
+import tokenize
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+
+class Finding(NamedTuple):
+    """Single rule match within a file"""
+
+    line: int
+    col: int
+    rule: str
+    # Number of the notebook cell, line is counted within the cell
+    cell: Optional[int] = None
+
+
+class Rule(ABC):
+    """Base class for detection rules, checked against nodes of selected types"""
+
+    name = ""
+    node_types: Tuple[type, ...] = ()
+
+    def keywords(self) -> Optional[Tuple[bytes, ...]]:
+        """Byte strings of which at least one has to be present in the source for a match
+
+        None means the rule can't be pre-filtered"""
+        return None
+
+    @abstractmethod
+    def check(self, node: ast.AST) -> bool:
+        """Check if node violates the rule"""
+
+
+class NameRule(Rule):
+    """Rule matching usage of selected names"""
+
+    node_types = (ast.Name,)
+    names: Tuple[str, ...] = ()
+
+    def keywords(self):
+        return tuple(name.encode() for name in self.names)
+
+    def check(self, node):
+        return node.id in self.names
+
+
+class PrintRule(NameRule):
+    """No prints are allowed!"""
+
+    name = "print"
+    names = ("print",)
+
+
+RULES = {rule.name: rule for rule in [PrintRule]}
+
+# Nodes which never contain any other nodes worth visiting
+_LEAVES = frozenset(
+    [
+        node
+        for base in (ast.expr_context, ast.boolop, ast.operator, ast.unaryop, ast.cmpop)
+        for node in base.__subclasses__()
+    ]
+    + [ast.Constant, ast.alias, ast.Pass, ast.Break, ast.Continue]
+)
+
+
+class Engine(ABC):
+    """Base class for detection engines, finding violations of the rules within python source"""
+
+    def __init__(
+        self, rules: Iterable[Rule], prefilter: bool = True, bytecode: bool = False
+    ):
+        self.rules = list(rules)
+        self.prefilter = None
+        keywords = [rule.keywords() for rule in self.rules]
+        if prefilter and all(kwds is not None for kwds in keywords):
+            # Any non-ASCII byte may be a part of identifier normalized to a keyword (NFKC, PEP-3131)
+            patterns = [re.escape(kwd) for kwds in keywords for kwd in kwds]
+            self.prefilter = re.compile(b"|".join(patterns + [rb"[^\x00-\x7f]"]))
+
+        # Names looked up in bytecode of __pycache__ files (noprint.bytecode), only name rules can be checked
+        self.bytecode_names: Optional[FrozenSet[str]] = None
+        if bytecode and all(isinstance(rule, NameRule) for rule in self.rules):
+            self.bytecode_names = frozenset(
+                name for rule in self.rules for name in rule.names
+            )
+
+    @property
+    def signature(self) -> str:
+        """Identifier of the detector setup, results differ between signatures"""
+        return ",".join(sorted(rule.name for rule in self.rules))
+
+    def may_match(self, data: bytes) -> bool:
+        """Cheap textual check whether the source can contain a match at all"""
+        return self.prefilter is None or self.prefilter.search(data) is not None
+
+    @abstractmethod
+    def scan(
+        self, data: bytes, first: bool = False, filename: str = "<unknown>"
+    ) -> Tuple[Finding, ...]:
+        """Find rule violations within python source code, sorted by their position"""
+
+
+class Detector(Engine):
+    """Run all rules within a single traversal of the syntax tree"""
+
+    def __init__(
+        self, rules: Iterable[Rule], prefilter: bool = True, bytecode: bool = False
+    ):
+        super().__init__(rules, prefilter=prefilter, bytecode=bytecode)
+        self.dispatch = {}
+        for rule in self.rules:
+            for node_type in rule.node_types:
+                self.dispatch.setdefault(node_type, []).append(rule)
+        self.leaves = _LEAVES.difference(self.dispatch)  # Unless some rule needs them
+
+    def walk(self, tree: ast.AST, first: bool = False) -> Tuple[Finding, ...]:
+        """Find rule violations within syntax tree, sorted by their position"""
+        findings = []
+        dispatch, leaves = self.dispatch, self.leaves
+        stack = [tree]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node = pop()
+            rules = dispatch.get(type(node))
+            if rules:
+                for rule in rules:
+                    if rule.check(node):
+                        findings.append(
+                            Finding(node.lineno, node.col_offset, rule.name)
+                        )
+                        if first:
+                            return tuple(findings)
+            # Children are pushed in reverse, so the tree is visited in source order
+            for field in reversed(node._fields):
+                child = getattr(node, field, None)
+                if type(child) is list:  # pylint: disable=unidiomatic-typecheck
+                    for item in reversed(child):
+                        if type(item) not in leaves and isinstance(item, ast.AST):
+                            push(item)
+                elif type(child) not in leaves and isinstance(child, ast.AST):
+                    push(child)
+        return tuple(sorted(findings))
+
+    def scan(self, data, first=False, filename="<unknown>"):
+        """Parse python source code and find rule violations"""
+        if not self.may_match(data):
+            return ()
+        # Parser detects encoding from BOM or coding cookie within the first two lines
+        # PEP-263, PEP-3120
+        return self.walk(ast.parse(data, filename=filename), first=first)
+
+
+# Names following these tokens are never plain name lookups
+_NOT_NAMES = frozenset([".", "def", "class", "as"])
+# Statements which refer to names without loading them
+_NAME_STATEMENTS = frozenset(["import", "from", "global", "nonlocal"])
+_SKIPPED = frozenset(
+    [tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING]
+)
+
+
+class TokenDetector(Engine):
+    """Flag names straight from the token stream, without building the syntax tree
+
+    Supports only name rules. Token stream doesn't know the grammar, so some names are judged by
+    surrounding tokens, see README for differences against syntax tree detection"""
+
+    def __init__(
+        self, rules: Iterable[Rule], prefilter: bool = True, bytecode: bool = False
+    ):
+        super().__init__(rules, prefilter=prefilter, bytecode=bytecode)
+        if not all(isinstance(rule, NameRule) for rule in self.rules):
+            raise ValueError("Token engine supports only name rules")
+        self.names = {name: rule.name for rule in self.rules for name in rule.names}
+
+    @property
+    def signature(self) -> str:
+        return f"tokens:{super().signature}"
+
+    def _match(self, token: tokenize.TokenInfo) -> Optional[str]:
+        """Rule name matching the token, identifiers are NFKC normalized (PEP-3131)"""
+        name = token.string
+        if not name.isascii():
+            name = unicodedata.normalize("NFKC", name)
+        return self.names.get(name)
+
+    def scan(self, data, first=False, filename="<unknown>"):
+        if not self.may_match(data):
+            return ()
+
+        findings = []
+        state = _TokenState()
+        pending = None  # Matched name, unless it's a keyword argument
+        keyword_arg = False  # Name in place of keyword argument, func(a, print=1)
+        for token in tokenize.tokenize(io.BytesIO(data).readline):
+            if token.type in _SKIPPED:
+                continue
+            if pending is not None:
+                if not (keyword_arg and token.string == "="):
+                    findings.append(pending)
+                    if first:
+                        return tuple(findings)
+                pending = None
+
+            if token.type == tokenize.NAME and state.is_name(token):
+                rule = self._match(token)
+                if rule:
+                    col = len(token.line[: token.start[1]].encode("utf-8"))
+                    pending = Finding(token.start[0], col, rule)
+                    keyword_arg = state.depth > 0 and state.prev.string in ("(", ",")
+            state.update(token)
+        return tuple(sorted(findings))
+
+
+class _TokenState:
+    """Tracks surroundings of the token needed to judge whether a name is loaded or stored"""
+
+    def __init__(self):
+        self.prev = None  # Previous significant token
+        self.depth = 0  # Bracket nesting
+        self.stmt_start = True
+        self.name_stmt = False  # Within import/global/nonlocal statement
+        self.with_stmt = False  # Within with statement header, "as" targets are names
+        self.def_name = False  # Waiting for def parameters
+        self.params = []  # (kind, bracket depth) of def and lambda parameter lists
+
+    def is_name(self, token: tokenize.TokenInfo) -> bool:
+        """Check if NAME token is a plain name - not keyword, attribute, parameter etc."""
+        if keyword.iskeyword(token.string) or self.name_stmt:
+            return False
+        prev = self.prev.string if self.prev is not None else None
+        if prev in _NOT_NAMES:
+            return prev == "as" and self.with_stmt
+        if self.params and self.params[-1][1] == self.depth:
+            kind = self.params[-1][0]
+            return prev not in (",", "*", "**", "(" if kind == "def" else "lambda")
+        return True
+
+    def update(self, token: tokenize.TokenInfo):  # pylint: disable=too-many-branches
+        """Move state past the token"""
+        string = token.string
+        if token.type == tokenize.NEWLINE:
+            self.__init__()  # pylint: disable=unnecessary-dunder-call
+            return
+        if token.type == tokenize.OP:
+            if string in "([{":
+                self.depth += 1
+                if self.def_name and string == "(":
+                    self.params.append(("def", self.depth))
+                    self.def_name = False
+            elif string in ")]}":
+                self.depth -= 1
+                while self.params and self.params[-1][1] > self.depth:
+                    self.params.pop()
+            elif string == ":":
+                if self.params and self.params[-1] == ("lambda", self.depth):
+                    self.params.pop()
+                elif self.depth == 0:
+                    self.with_stmt = False
+        elif token.type == tokenize.NAME:
+            if string in _NAME_STATEMENTS and self.stmt_start:
+                self.name_stmt = True
+            elif string == "with":
+                self.with_stmt = True
+            elif string == "def":
+                self.def_name = True
+            elif string == "lambda":
+                self.params.append(("lambda", self.depth))
+
+        self.stmt_start = (string in (";", ":") and self.depth == 0) or (
+            string == "async" and self.stmt_start
+        )
+        self.prev = token
+
+
+ENGINES = {"ast": Detector, "tokens": TokenDetector}
@@ -9,3 +9,11 @@ class ImportException(Exception):
 
 class ParentModuleNotFoundException(Exception):
     "Raised when there was import exception in print_seeker"
+
+
+class ChangedFilesException(Exception):
+    "Raised when list of changed files couldn't be read from version control"
+
+
+class ConfigException(Exception):
+    "Raised when [tool.noprint] section of pyproject.toml is invalid"
@@ -0,0 +1,78 @@
+"""
+Executors running scan jobs - inline, in a thread pool or in a process pool
+"""
+import sys
+import concurrent.futures
+from collections import deque
+from concurrent.futures import Executor, Future
+
+# Smallest targets worth starting worker processes for, smaller ones are scanned inline
+AUTO_MIN_BYTES = 2**20
+AUTO_MIN_FILES = 64
+
+
+class InlineExecutor(Executor):
+    """Runs jobs one by one in the calling thread, only once their results are waited for
+
+    Nothing is pickled and no process is spawned, pending jobs can be cancelled until they run
+    """
+
+    def __init__(self, max_workers=None):  # pylint: disable=unused-argument
+        self.pending = deque()
+
+    def submit(self, fn, *args, **kwargs):  # pylint: disable=arguments-differ
+        future = Future()
+        self.pending.append((future, fn, args, kwargs))
+        return future
+
+    def run_next(self) -> bool:
+        """Run the oldest pending job, False when there is none"""
+        while self.pending:
+            future, func, args, kwargs = self.pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            return True
+        return False
+
+    def shutdown(self, wait=True, **kwargs):  # pylint: disable=unused-argument
+        while self.pending:
+            self.pending.popleft()[0].cancel()
+
+
+# Executor classes by their names, pools (and multiprocessing) are imported only once they're used
+EXECUTORS = {
+    "sequential": "InlineExecutor",
+    "thread": "ThreadPoolExecutor",
+    "process": "ProcessPoolExecutor",
+}
+# Executors sharing settings of the scan with the main process
+IN_PROCESS = ("sequential", "thread")
+
+
+def get_executor(kind: str) -> type:
+    """Executor class of given name"""
+    if kind == "sequential":
+        return InlineExecutor
+    return getattr(concurrent.futures, EXECUTORS[kind])
+
+
+def _gil_enabled() -> bool:
+    """False only on free-threaded builds running without the GIL"""
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check() if check is not None else True
+
+
+def auto_executor(workers: int, files: int, size: int) -> str:
+    """Pick the executor for the scan of given number of files and bytes
+
+    Worker processes pay off only when the scan outweighs their startup and pickling of jobs
+    """
+    if workers <= 1 or files < AUTO_MIN_FILES or size < AUTO_MIN_BYTES:
+        return "sequential"
+    return "process" if _gil_enabled() else "thread"
@@ -0,0 +1,120 @@
+"""
+Include and exclude patterns of scanned files, applied while directories are listed
+"""
+import os
+import re
+import copy
+from typing import Iterable, Optional, Pattern, Tuple
+
+from noprint import NOTEBOOK_SUFFIX
+
+
+def _pattern_path(pattern: str) -> str:
+    """Glob over file paths, dotted names (e.g. pkg.migrations) are turned into paths (pkg/migrations)"""
+    pattern = pattern.replace(os.sep, "/").rstrip("/")
+    if "/" not in pattern and not pattern.endswith((".py", NOTEBOOK_SUFFIX)):
+        pattern = pattern.replace(".", "/")
+    return pattern
+
+
+def _translate(pattern: str) -> str:
+    """Regular expression of the glob, wildcards (*, ?, [seq]) never match the / separator"""
+    parts = []
+    idx = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        idx += 1
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            # Closing bracket right after [ or [! is a part of the sequence
+            end = idx + (pattern[idx : idx + 1] == "!")
+            end = pattern.find("]", end + (pattern[end : end + 1] == "]"))
+            if end < 0:
+                parts.append(re.escape(char))
+                continue
+            seq = pattern[idx:end].replace("\\", "\\\\")
+            if seq.startswith("!"):
+                seq = "^" + seq[1:]
+            elif seq.startswith("^"):
+                seq = "\\" + seq
+            parts.append(f"(?!/)[{seq}]")
+            idx = end + 1
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def _compile(patterns: Tuple[str, ...]) -> Optional[Pattern]:
+    """Single expression matching trailing components of a path against any of the patterns"""
+    if not patterns:
+        return None
+    return re.compile(
+        "(?:^|/)(?:"
+        + "|".join(_translate(_pattern_path(pat)) for pat in patterns)
+        + r")\Z",
+        re.S,
+    )
+
+
+def _matches(regex: Pattern, path: str, is_file: bool) -> bool:
+    """Check the path, python files and notebooks are also matched by their module path (without suffix)"""
+    path = path.replace(os.sep, "/")
+    if regex.search(path):
+        return True
+    stem, suffix = os.path.splitext(path)
+    return is_file and suffix in (".py", NOTEBOOK_SUFFIX) and bool(regex.search(stem))
+
+
+class PathFilter:
+    """Include and exclude patterns compiled once, shared by the main process and pool workers
+
+    Patterns are globs (migrations, *_pb2.py, tests/data/*) or dotted names (pkg.migrations), matched
+    against trailing components of paths relative to the scan root, so directories above the scanned
+    tree never match. Excluded directories are never descended into, include patterns (if any) limit
+    only the scanned files"""
+
+    def __init__(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        root: Optional[str] = None,
+    ):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.root = root
+        self._include = _compile(self.include)
+        self._exclude = _compile(self.exclude)
+
+    def __bool__(self) -> bool:
+        return bool(self.include or self.exclude)
+
+    def rooted(self, root: str) -> "PathFilter":
+        """Same patterns matched against paths relative to the root (directory of the scanned tree)"""
+        path_filter = copy.copy(self)
+        path_filter.root = root
+        return path_filter
+
+    def _relative(self, path: str) -> str:
+        """Path relative to the root, paths are given as found by listing the root"""
+        if self.root is None:
+            return path
+        prefix = os.path.join(self.root, "")
+        if path.startswith(prefix):
+            return path[len(prefix) :]
+        return os.path.relpath(path, self.root)
+
+    def accepts_dir(self, path: str) -> bool:
+        """Check if the directory is descended into"""
+        return self._exclude is None or not _matches(
+            self._exclude, self._relative(path), False
+        )
+
+    def accepts_file(self, path: str) -> bool:
+        """Check if the python file (or notebook) is scanned"""
+        path = self._relative(path)
+        if self._exclude is not None and _matches(self._exclude, path, True):
+            return False
+        return self._include is None or _matches(self._include, path, True)
@@ -1,8 +1,11 @@
 """
 Logging setup for NoPrint
 """
+import sys
+import time
 import logging
 
+from typing import IO, Iterable, Optional
 from logging import INFO, WARNING, ERROR, CRITICAL
 
 
@@ -18,10 +21,96 @@ def log(msg: str, level: int):
         logger.critical(msg)
 
 
+def isatty(stream: IO[str]) -> bool:
+    """Check if stream is an interactive terminal, colors are used only there"""
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+_NAMES = {WARNING: "WARNING", ERROR: "ERROR", CRITICAL: "CRITICAL"}
+_COLORS = {
+    WARNING: "\033[1;33m",
+    ERROR: "\033[1;31m",
+    CRITICAL: "\033[1;101m",
+}
+_SUCCESS = "\033[1;32m"
+_RESET = "\033[1;0m"
+
+
+def _label(level: int, color: bool) -> str:
+    """Level name as displayed in front of the message"""
+    label = f"[{_NAMES[level]}]"
+    return f"{_COLORS[level]}{label}{_RESET}" if color else label
+
+
+class Reporter:  # pylint: disable=too-many-instance-attributes
+    """Buffered writer of report lines, levels are filtered before anything is formatted
+
+    Lines are written in batches, when the buffer fills up, after flush_interval seconds or on flush()
+    """
+
+    def __init__(
+        self,
+        stream: Optional[IO[str]] = None,
+        level: int = INFO,
+        color: Optional[bool] = None,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 0.1,
+    ):  # pylint: disable=too-many-arguments
+        self.stream = stream if stream is not None else sys.stderr
+        self.level = level
+        self.color = isatty(self.stream) if color is None else color
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.prefixes = {lvl: f"{_label(lvl, self.color)}:" for lvl in _COLORS}
+        self.lines = []
+        self.size = 0
+        self.flushed = time.monotonic()
+
+    def enabled(self, level: int) -> bool:
+        """Check if messages of the level are written at all"""
+        return level >= self.level
+
+    def write(self, msg: str, level: int):
+        """Queue a single line"""
+        self.write_many((msg,), level)
+
+    def write_many(self, msgs: Iterable[str], level: int):
+        """Queue a batch of lines of the same level"""
+        if level < self.level:
+            return
+        if level == INFO:
+            prefix, suffix = (_SUCCESS, f"{_RESET}\n") if self.color else ("", "\n")
+        else:
+            prefix, suffix = self.prefixes[level], "\n"
+        lines = [f"{prefix}{msg}{suffix}" for msg in msgs]
+        self.lines.extend(lines)
+        self.size += sum(map(len, lines))
+        if (
+            self.size >= self.buffer_size
+            or time.monotonic() - self.flushed >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Write all queued lines at once"""
+        if self.lines:
+            self.stream.write("".join(self.lines))
+            self.stream.flush()
+            self.lines = []
+            self.size = 0
+        self.flushed = time.monotonic()
+
+
 logger = logging.getLogger("noprint")
+COLOR = isatty(sys.stderr)
 
 formatter = logging.Formatter("%(levelname)s:%(message)s")
-formatter_success = logging.Formatter("\033[1;32m%(message)s\033[1;0m")
+formatter_success = logging.Formatter(
+    f"{_SUCCESS}%(message)s{_RESET}" if COLOR else "%(message)s"
+)
 
 ch = logging.StreamHandler()
 ch.setLevel(WARNING)
@@ -30,16 +119,14 @@ ch.setFormatter(formatter)
 chs = logging.StreamHandler()
 chs.setLevel(INFO)
 chs.setFormatter(formatter_success)
-chs.semit = chs.emit
-chs.emit = lambda record: chs.semit(record) if record.levelno == chs.level else None
+chs.addFilter(lambda record: record.levelno == INFO)  # Filtered before formatting
 
 logger.addHandler(ch)
 logger.addHandler(chs)
 logger.setLevel(logging.INFO)
 
-logging.addLevelName(WARNING, f"\033[1;33m[{logging.getLevelName(WARNING)}]\033[1;0m")
-logging.addLevelName(ERROR, f"\033[1;31m[{logging.getLevelName(ERROR)}]\033[1;0m")
-logging.addLevelName(
-    CRITICAL, f"\033[1;101m[{logging.getLevelName(CRITICAL)}]\033[1;0m"
-)
+for _level in (WARNING, ERROR, CRITICAL):
+    logging.addLevelName(_level, _label(_level, COLOR))
 # LogLevel.INFO doesn't display levelname, so not needed
+
+reporter = Reporter()
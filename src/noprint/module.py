@@ -5,10 +5,11 @@ Logging setup for NoPrint
 import os
 import sys
 
-from pathlib import Path
 from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 from importlib.machinery import ModuleSpec, PathFinder
 
+from noprint import NOTEBOOK_SUFFIX
 from noprint.exceptions import ParentModuleNotFoundException
 
 
@@ -26,15 +27,12 @@ def _get_module_search_path(module: ModuleSpec):
 def _get_module_location(module: ModuleSpec):
     """Get location of the module"""
     if module.has_location:
-        path = Path(module.origin)
-        if path.name == "__init__.py":
-            path = path.parents[1]
-        else:
-            path = path.parents[0]
+        path = os.path.dirname(module.origin)
+        if os.path.basename(module.origin) == "__init__.py":
+            path = os.path.dirname(path)
     else:
-        path = Path(_get_module_search_path(module))
-        path = path.parent
-    return str(path)
+        path = os.path.dirname(os.path.normpath(_get_module_search_path(module)))
+    return path or os.curdir
 
 
 @lru_cache(maxsize=None)
@@ -47,7 +45,9 @@ def _find_parent_dir(package: str, in_cwd: bool) -> str:
     module = PathFinder.find_spec(package, path=paths)
 
     if module is None:
-        raise ParentModuleNotFoundException(f"Parent module not found for package {package}, [in_cwd: {in_cwd}]")
+        raise ParentModuleNotFoundException(
+            f"Parent module not found for package {package}, [in_cwd: {in_cwd}]"
+        )
     path = _get_module_location(module)
 
     return path
@@ -75,7 +75,105 @@ def _package_to_dir(path, submodules):
     return package_path
 
 
-class Module:
+@lru_cache(maxsize=None)
+def _dir_package(directory: str) -> Tuple[str, Tuple[str, ...]]:
+    """Location of the top-level package and package path of the directory, based on __init__.py files"""
+    if not os.path.isfile(os.path.join(directory, "__init__.py")):
+        return directory, ()
+    parent, name = os.path.split(directory)
+    parent_loc, parts = _dir_package(parent)
+    return parent_loc, parts + (name,)
+
+
+class DirListing(NamedTuple):
+    """Package directory contents relevant for module discovery"""
+
+    packages: Tuple[str, ...]  # Subdirectories - potential subpackages
+    # Names of python files, except __init__.py and __main__.py
+    modules: Tuple[str, ...]
+    init: bool
+    main: bool
+    sizes: Optional[Dict[str, int]] = None  # Sizes of python files by their names
+    notebooks: Tuple[str, ...] = ()  # Names of jupyter notebooks, without the suffix
+
+    def size(self, name: str) -> Optional[int]:
+        """Size of the python file in bytes, when it was listed"""
+        return self.sizes.get(name) if self.sizes is not None else None
+
+    @property
+    def origin(self) -> List[str]:
+        """Files making the package itself"""
+        return [
+            name
+            for name, found in (("__init__.py", self.init), ("__main__.py", self.main))
+            if found
+        ]
+
+    @property
+    def files(self) -> List[str]:
+        """Names of all scanned files - package files, modules and notebooks"""
+        return (
+            self.origin
+            + [f"{name}.py" for name in self.modules]
+            + [f"{name}{NOTEBOOK_SUFFIX}" for name in self.notebooks]
+        )
+
+
+def list_dir(path: str, path_filter=None) -> DirListing:
+    """Single scandir pass over the directory, entry types come from cached DirEntry info
+
+    Entries rejected by the path filter (noprint.filters.PathFilter) are skipped without stat calls
+    """
+    packages, modules, notebooks, sizes = [], [], [], {}
+    init = main = False
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name = entry.name
+            if entry.is_dir():
+                if (
+                    name != "__pycache__"
+                    and not name.startswith(".")
+                    and (path_filter is None or path_filter.accepts_dir(entry.path))
+                ):
+                    packages.append(name)
+            elif (
+                name.endswith((".py", NOTEBOOK_SUFFIX))
+                and (path_filter is None or path_filter.accepts_file(entry.path))
+                and entry.is_file()
+            ):
+                sizes[name] = entry.stat().st_size
+                if name == "__init__.py":
+                    init = True
+                elif name == "__main__.py":
+                    main = True
+                elif name.endswith(".py"):
+                    modules.append(name[:-3])
+                else:
+                    notebooks.append(name[: -len(NOTEBOOK_SUFFIX)])
+    return DirListing(
+        tuple(packages), tuple(modules), init, main, sizes, tuple(notebooks)
+    )
+
+
+def walk_sizes(path: str, path_filter=None) -> Iterator[Tuple[str, int]]:
+    """All python files and notebooks within directory tree with their sizes, single scandir pass per directory"""
+    directories = [path]
+    while directories:
+        directory = directories.pop()
+        listing = list_dir(directory, path_filter)
+        yield from (
+            (os.path.join(directory, name), listing.sizes[name])
+            for name in listing.files
+        )
+        directories.extend(os.path.join(directory, name) for name in listing.packages)
+
+
+def walk_files(path: str, path_filter=None) -> Iterator[str]:
+    """All python files and notebooks within directory tree, single scandir pass per directory"""
+    return (mod_file for mod_file, _ in walk_sizes(path, path_filter))
+
+
+class Module:  # pylint: disable=too-many-instance-attributes
     """Module class to use instead of official classes which import main package when submodule is provided"""
 
     _origin = None
@@ -85,6 +183,11 @@ class Module:
     _package = None
 
     _search_path = None
+    _listing = None  # (directory, DirListing)
+    in_package = False  # Discovered within a package with __init__.py
+    size = None  # Bytes of the module file, when known without resolving the module
+    # Include and exclude patterns applied to listings of the package
+    path_filter = None
 
     def __init__(self, package: str, in_cwd: bool = True):
         self._package = package
@@ -94,11 +197,73 @@ class Module:
         except Exception as exc:
             raise ParentModuleNotFoundException(exc) from exc
 
+    @classmethod
+    def from_path(cls, path: str, size: Optional[int] = None) -> "Module":
+        """Module of the source file, package is resolved from __init__.py files of parent directories"""
+        path = os.path.abspath(path)
+        directory, filename = os.path.split(path)
+        parent_loc, parts = _dir_package(directory)
+        if filename != "__init__.py" or not parts:
+            parts = parts + (os.path.splitext(filename)[0],)
+
+        module = cls.__new__(cls)
+        module._package = ".".join(parts)
+        module._parent_loc = parent_loc
+        module._origin = [path]
+        module.size = size
+        return module
+
+    @classmethod
+    def child(
+        cls, parent: "Module", name: str, package: bool, suffix: str = ".py"
+    ) -> "Module":
+        """Submodule (or notebook) found in the listing of parent's directory, resolved without further lookups"""
+        directory = parent.search_path
+        module = cls.__new__(cls)
+        module._package = f"{parent.name}.{name}"
+        module._parent_loc = parent._parent_loc  # pylint: disable=protected-access
+        module.in_package = parent.listing.init
+        module.path_filter = parent.path_filter
+        if package:
+            module._search_path = os.path.join(directory, name)
+        else:
+            module._origin = [os.path.join(directory, f"{name}{suffix}")]
+            module._search_path = ""
+            module.size = parent.listing.size(f"{name}{suffix}")
+        return module
+
+    def resolve(self) -> "Module":
+        """Find origin and list the package directory now, so that copies of the module don't repeat it"""
+        if self.search_path:
+            self._list(self.search_path)
+        self._origin = self.origin
+        return self
+
+    def _list(self, directory: str) -> DirListing:
+        """Cached listing of the package directory"""
+        if self._listing is None or self._listing[0] != directory:
+            self._listing = (directory, list_dir(directory, self.path_filter))
+        return self._listing[1]
+
+    @property
+    def listing(self) -> DirListing:
+        """Contents of the package directory"""
+        return (
+            self._list(self.search_path)
+            if self.search_path
+            else DirListing((), (), False, False)
+        )
+
     @property
     def origin(self):
         """Function to recover module origin - file paths"""
+        # Package found in the listing of its parent
+        if self._origin is None and self._search_path:
+            self._origin = [
+                os.path.join(self._search_path, name) for name in self.listing.origin
+            ]
         if self._origin is None:
-            path = Path(self._parent_loc)
+            path = self._parent_loc
             for step in self._package.split(".")[0:-1]:
                 path = os.path.join(path, step)
             # SRC path
@@ -108,10 +273,9 @@ class Module:
             # Check if module with submodules
             if os.path.isdir(os.path.join(path, cur_package)):
                 path = os.path.join(path, cur_package)
-                candidates = ["__init__.py", "__main__.py"]
-                for candidate in candidates:
-                    if os.path.isfile(os.path.join(path, candidate)):
-                        self._origin.append(os.path.join(path, candidate))
+                self._origin = [
+                    os.path.join(path, name) for name in self._list(path).origin
+                ]
             else:
                 if os.path.isfile(os.path.join(path, f"{cur_package}.py")):
                     self._origin.append(os.path.join(path, f"{cur_package}.py"))
@@ -122,14 +286,18 @@ class Module:
         """Recover package name"""
         return self._package
 
+    @property
+    def root(self) -> str:
+        """Directory of the top-level package, the scan root of the package and its subpackages"""
+        return self._parent_loc
+
     @property
     def search_path(self):
         """Get path to use for searching submodules"""
         if self._search_path is None:
-            self._search_path = _package_to_dir(self._parent_loc, self._package)
-        if self._search_path and os.path.isdir(self._search_path):
-            return self._search_path
-        return None
+            path = _package_to_dir(self._parent_loc, self._package)
+            self._search_path = path if path and os.path.isdir(path) else ""
+        return self._search_path or None
 
     def __eq__(self, other):
         if isinstance(other, Module):
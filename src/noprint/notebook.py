@@ -0,0 +1,217 @@
+"""
+Code cells of Jupyter notebooks, streamed so that large outputs (e.g. base64 images) are skipped unread
+"""
+import re
+import json
+from typing import Callable, Iterator, Optional, Tuple
+
+from noprint.detect import Finding
+
+CHUNK = 2**16  # Bytes of the notebook read at once
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_STRING_END = re.compile(rb'["\\]')
+_CONTAINER_TOKEN = re.compile(rb'["\\{}\[\]]')
+_SCALAR_END = re.compile(rb"[,}\] \t\r\n]")
+# Line magics, shell escapes and help (%time f(), !pip install, x = !ls, obj?), masked by pass
+_MAGIC = re.compile(
+    r"^([ \t]*)(?:[%!?]|[\w.]+[ \t]*=[ \t]*[%!]|[\w.]+\?\??[ \t]*$).*$", re.M
+)
+_CELL_MAGIC = re.compile(r"\s*%%(\w*)")
+# Cell magics running the rest of the cell as python, other cells (%%bash, %%html, ...) aren't python
+PYTHON_CELL_MAGICS = frozenset(["time", "timeit", "capture", "prun"])
+
+
+class _Reader:
+    """Pull parser of JSON read in chunks, consumed input is dropped and skipped strings aren't decoded"""
+
+    def __init__(self, file, hasher=None):
+        self.file = file
+        self.hasher = hasher
+        self.buf = b""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Read next chunk into the buffer, dropping consumed input"""
+        chunk = self.file.read(CHUNK)
+        if self.hasher is not None:
+            self.hasher.update(chunk)
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def _peek(self) -> bytes:
+        """Next character after whitespace, it's not consumed"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos : self.pos + 1]
+            if not self._fill():
+                raise ValueError("Unexpected end of notebook")
+
+    def _take(self, expected: bytes) -> bytes:
+        """Consume next character, which has to be one of expected"""
+        char = self._peek()
+        if char not in expected:
+            raise ValueError(
+                f"Unexpected {char!r} in notebook, expected one of {expected!r}"
+            )
+        self.pos += 1
+        return char
+
+    def string(self, keep: bool = True) -> Optional[str]:
+        """Read a string, only kept strings are decoded"""
+        self._take(b'"')
+        parts = []
+        while True:
+            match = _STRING_END.search(self.buf, self.pos)
+            if match is None or match.end() == len(self.buf) and match.group() == b"\\":
+                end = len(self.buf) if match is None else match.start()
+                if keep:
+                    parts.append(self.buf[self.pos : end])
+                self.pos = end
+                if not self._fill():
+                    raise ValueError("Unexpected end of notebook")
+                continue
+            end = match.end() + (match.group() == b"\\")  # Escaped character is skipped
+            if keep:
+                parts.append(self.buf[self.pos : end])
+            self.pos = end
+            if match.group() == b'"':
+                return json.loads(b'"' + b"".join(parts)) if keep else None
+
+    def skip(self):
+        """Skip any value"""
+        char = self._peek()
+        if char == b'"':
+            self.string(keep=False)
+            return
+        if char not in b"{[":
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match is not None:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of notebook")
+        self.pos += 1
+        depth = 1
+        while depth:
+            match = _CONTAINER_TOKEN.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of notebook")
+                continue
+            self.pos = match.start()
+            char = match.group()
+            if char == b'"':
+                self.string(keep=False)
+            elif char == b"\\":
+                raise ValueError("Unexpected '\\' in notebook")
+            else:
+                depth += 1 if char in b"{[" else -1
+                self.pos += 1
+
+    def items(self) -> Iterator[str]:
+        """Keys of an object, value of every key has to be consumed before the next one"""
+        self._take(b"{")
+        if self._peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            key = self.string()
+            self._take(b":")
+            yield key
+            if self._take(b",}") == b"}":
+                return
+
+    def values(self) -> Iterator[None]:
+        """Elements of an array, every element has to be consumed before the next one"""
+        self._take(b"[")
+        if self._peek() == b"]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            if self._take(b",]") == b"]":
+                return
+
+    def text(self) -> str:
+        """String or list of strings joined together (multiline strings of nbformat)"""
+        if self._peek() != b"[":
+            return self.string()
+        return "".join(self.string() for _ in self.values())
+
+    def finish(self):
+        """Read the rest of the notebook, so that the hasher gets all of it"""
+        while self._fill():
+            self.pos = len(self.buf)
+
+
+def python_source(source: str) -> Optional[str]:
+    """Source of the code cell with IPython syntax masked, line numbers are kept
+
+    Cells of python cell magics (%%time, %%timeit, ...) are scanned with the magic line masked, cells
+    with other cell magics (%%bash, %%html, ...) aren't python and are skipped (None)
+    """
+    magic = _CELL_MAGIC.match(source)
+    if magic is not None and magic.group(1) not in PYTHON_CELL_MAGICS:
+        return None
+    return _MAGIC.sub(r"\1pass", source)
+
+
+def _cell(reader: _Reader) -> Tuple[Optional[str], Optional[str]]:
+    """Type and source of the cell, all other keys (outputs, metadata) are skipped"""
+    cell_type = source = None
+    for key in reader.items():
+        if key == "cell_type":
+            cell_type = reader.string()
+        elif key == "source":
+            source = reader.text()
+        else:
+            reader.skip()
+    return cell_type, source
+
+
+def code_cells(path: str, hasher=None) -> Iterator[Tuple[int, str]]:
+    """Numbers (counted from 1, over all cells) and python sources of code cells of the notebook (nbformat 4)
+
+    Hasher (e.g. hashlib.blake2b) is updated with the whole file, once all cells are consumed
+    """
+    with open(path, "rb") as file:
+        reader = _Reader(file, hasher)
+        try:
+            for key in reader.items():
+                if key != "cells":
+                    reader.skip()
+                    continue
+                for number, _ in enumerate(reader.values(), start=1):
+                    cell_type, source = _cell(reader)
+                    if cell_type == "code" and source is not None:
+                        source = python_source(source)
+                        if source is not None:
+                            yield number, source
+            reader.finish()
+        except (ValueError, TypeError) as exc:
+            raise ValueError(f"Invalid notebook [{path}]: {exc}") from exc
+
+
+def scan_notebook(
+    path: str,
+    scan: Callable[[bytes], Tuple[Finding, ...]],
+    first: bool = False,
+    hasher=None,
+) -> Tuple[Finding, ...]:
+    """Findings within code cells of the notebook, tagged with their cell numbers
+
+    With first, scan stops at the first cell with findings (and the hasher isn't complete)
+    """
+    findings = []
+    for number, source in code_cells(path, hasher):
+        found = scan(source.encode("utf-8"))
+        findings.extend(finding._replace(cell=number) for finding in found)
+        if first and found:
+            break
+    return tuple(findings)
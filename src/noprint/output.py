@@ -0,0 +1,174 @@
+"""
+Machine-readable output formats, records are streamed as soon as module results arrive
+"""
+import os
+import sys
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional
+
+from noprint import __version__
+from noprint.sprint import _file_name
+
+
+class Output(ABC):
+    """Base class of output formats, writing straight to the stream without the logging machinery"""
+
+    def __init__(self, stream: Optional[IO[str]] = None, error_out: bool = False):
+        self.stream = stream if stream is not None else sys.stdout
+        self.error_out = error_out
+
+    def start(self):
+        """Write everything preceding the first record"""
+
+    def records(self, result) -> Iterator[dict]:
+        """Records describing a module result or an error"""
+        if isinstance(result, Exception):
+            yield {"type": "error", "message": str(result)}
+            return
+        for mod_file, findings, _ in result.files:
+            module = _file_name(result.name, mod_file)
+            for finding in findings:
+                record = {
+                    "type": "finding",
+                    "path": mod_file,
+                    "module": module,
+                    "line": finding.line,
+                    "col": finding.col,
+                    "rule": finding.rule,
+                }
+                if finding.cell is not None:
+                    record["cell"] = finding.cell  # Line and column are within the cell
+                yield record
+
+    def write(self, result) -> int:
+        """Write records of the result and return its status"""
+        for record in self.records(result):
+            self.stream.write(self.format(record))
+        self.stream.flush()
+        return 2 if isinstance(result, Exception) else result.status
+
+    @abstractmethod
+    def format(self, record: dict) -> str:
+        """Serialize a single record"""
+
+    def finish(self):
+        """Write everything following the last record"""
+
+
+class JsonLinesOutput(Output):
+    """One JSON object per line"""
+
+    def format(self, record):
+        return json.dumps(record) + "\n"
+
+
+class JsonOutput(Output):
+    """JSON array of records, written incrementally"""
+
+    def __init__(self, stream=None, error_out=False):
+        super().__init__(stream, error_out)
+        self.separator = "\n"
+
+    def start(self):
+        self.stream.write("[")
+
+    def format(self, record):
+        text = self.separator + json.dumps(record)
+        self.separator = ",\n"
+        return text
+
+    def finish(self):
+        self.stream.write("\n]\n")
+        self.stream.flush()
+
+
+def _uri(path: str) -> str:
+    """Artifact location - relative to working directory when possible"""
+    path = os.path.abspath(path)
+    cwd = os.getcwd()
+    try:
+        if os.path.commonpath([path, cwd]) == cwd:
+            return Path(os.path.relpath(path, cwd)).as_posix()
+    except ValueError:  # Different drives on Windows
+        pass
+    return Path(path).as_uri()
+
+
+class SarifOutput(Output):
+    """SARIF 2.1.0 log with a single run, results are written incrementally"""
+
+    SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+    def __init__(self, stream=None, error_out=False, rules: Iterable[str] = ("print",)):
+        super().__init__(stream, error_out)
+        self.rules = list(rules)
+        self.errors: List[str] = []
+        self.separator = ""
+
+    def start(self):
+        driver = {
+            "name": "NoPrint",
+            "version": __version__,
+            "informationUri": "https://github.com/rgryta/NoPrint",
+            "rules": [
+                {"id": rule, "shortDescription": {"text": f"Usage of {rule}"}}
+                for rule in self.rules
+            ],
+        }
+        header = json.dumps(
+            {
+                "$schema": self.SCHEMA,
+                "version": "2.1.0",
+                "runs": [{"tool": {"driver": driver}}],
+            }
+        )
+        # Results array is left open and streamed into
+        self.stream.write(header[: -len("}]}")] + ', "results": [')
+
+    def format(self, record):
+        if record["type"] == "error":
+            self.errors.append(record["message"])
+            return ""
+        text = f"{record['rule']} found in {record['module']}"
+        if "cell" in record:
+            text += f" (cell {record['cell']})"
+        result = {
+            "ruleId": record["rule"],
+            "level": "error" if self.error_out else "warning",
+            "message": {"text": text},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": _uri(record["path"])},
+                        "region": {
+                            "startLine": record["line"],
+                            "startColumn": record["col"] + 1,
+                        },
+                    },
+                    "logicalLocations": [
+                        {"fullyQualifiedName": record["module"], "kind": "module"}
+                    ],
+                }
+            ],
+        }
+        if "cell" in record:  # Region of notebook findings is within the cell
+            result["properties"] = {"cell": record["cell"]}
+        text = self.separator + json.dumps(result)
+        self.separator = ",\n"
+        return text
+
+    def finish(self):
+        invocation = {
+            "executionSuccessful": not self.errors,
+            "toolExecutionNotifications": [
+                {"level": "error", "message": {"text": message}}
+                for message in self.errors
+            ],
+        }
+        self.stream.write(f'], "invocations": [{json.dumps(invocation)}]}}]}}\n')
+        self.stream.flush()
+
+
+FORMATS = {"json": JsonOutput, "jsonl": JsonLinesOutput, "sarif": SarifOutput}
@@ -2,31 +2,73 @@
 Module responsible for finding print statements in python modules
 """
 import os
-import re
-import ast
-import pkgutil
-import functools
-import contextvars
-from pathlib import Path
-from multiprocessing.pool import Pool
+import time
+import heapq
+import queue
+from itertools import chain, islice
+from collections import deque
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from contextlib import closing
+from concurrent.futures import Executor
 
 import noprint.logger as logging
 
-from noprint import ENCODING_CAPTURE
-from noprint.module import Module
-from noprint.exceptions import ImportException, ParentModuleNotFoundException
-
-
-packages = contextvars.ContextVar("packages", default=[])
-mt_threads = contextvars.ContextVar("mt_threads", default=1)
-log_lvl = contextvars.ContextVar("log_lvl", default=logging.WARNING)
-first_only = contextvars.ContextVar("first_only", default=False)
-verbose = contextvars.ContextVar("verbose", default=False)
-very_verbose = contextvars.ContextVar("very_verbose", default=False)
-
-
-def _get_module(package):
-    """Get Module of the package"""
+from noprint import ARCHIVE_SUFFIXES, CHUNK_SIZE, NOTEBOOK_SUFFIX
+from noprint.stats import Stats
+from noprint.executors import (
+    AUTO_MIN_BYTES,
+    AUTO_MIN_FILES,
+    EXECUTORS,
+    IN_PROCESS,
+    InlineExecutor,
+    auto_executor,
+    get_executor,
+)
+from noprint.detect import ENGINES, Detector, Engine, Finding, PrintRule, Rule
+from noprint.module import Module, walk_sizes
+from noprint.exceptions import (
+    ChangedFilesException,
+    ImportException,
+    ParentModuleNotFoundException,
+)
+
+# Worker process settings
+_cache = None  # pylint: disable=invalid-name
+_detector = Detector([PrintRule()])  # pylint: disable=invalid-name
+_verbose = False  # pylint: disable=invalid-name
+_collect_stats = False  # pylint: disable=invalid-name
+_profile = False  # pylint: disable=invalid-name
+
+
+class _Settings(NamedTuple):
+    """Settings of scan jobs - installed into pool worker processes, passed along to jobs run in-process"""
+
+    cache: object  # noprint.cache.ResultCache or None
+    detector: Engine
+    verbose: bool = False
+    collect_stats: bool = False
+    profile: bool = False
+
+
+def _init_worker(settings: _Settings):
+    """Pool worker initializer"""
+    # pylint: disable=global-statement
+    global _cache, _detector, _verbose, _collect_stats, _profile
+    _cache = settings.cache
+    _detector = settings.detector
+    _verbose = settings.verbose
+    _collect_stats = settings.collect_stats or settings.profile
+    _profile = settings.profile
+
+
+def _worker_settings() -> _Settings:
+    """Settings installed into this worker process, used by jobs run without explicit settings"""
+    return _Settings(_cache, _detector, _verbose, _collect_stats, _profile)
+
+
+def _get_module(package, verbose: Optional[bool] = None):
+    """Get Module of the package, verbose checks whether it overshadows installed module"""
+    verbose = _verbose if verbose is None else verbose
     try:
         module = Module(package)
     except ParentModuleNotFoundException as exc:
@@ -35,23 +77,18 @@ def _get_module(package):
         raise ImportException(
             f"Module [{package}] is not present in current environment, directory or PYTHONPATH"
         )
+    if not verbose:
+        return module
 
     system_module = None
     try:
         system_module = Module(package, in_cwd=False)
-    except ParentModuleNotFoundException:  # pragma: no cover
+    except ParentModuleNotFoundException:
         pass
 
-    if not system_module and verbose.get():
-        logging.log(
-            f"Module [{package}] is not installed", logging.WARNING
-        )  # pragma: no cover
-    elif (
-        verbose.get()
-        and system_module
-        and module != system_module
-        and len(system_module.origin) > 0
-    ):  # pragma: no cover
+    if not system_module:
+        logging.log(f"Module [{package}] is not installed", logging.WARNING)
+    elif module != system_module and len(system_module.origin) > 0:
         logging.log(
             f"Module [{package}] is overshadowing installed module", logging.WARNING
         )
@@ -59,167 +96,897 @@ def _get_module(package):
     return module
 
 
-def _get_subpackages(package, module):
-    """Get all candidates for submodules"""
+def _get_subpackages(package, module, verbose: Optional[bool] = None):
+    """Get all submodules, resolved from a single listing of the package directory"""
+    verbose = _verbose if verbose is None else verbose
     # If module is a file or contains __init__ then yield it and set flag
     isinit = False
     if module.origin:
-        candidates = [Path(orig).name for orig in module.origin]
+        candidates = [os.path.basename(orig) for orig in module.origin]
         isinit = "__init__.py" in candidates
+    if module.origin and not isinit:
+        return []
 
-    # Grab submodules and all packages within the directory
-    candidates = []
-    sub_pkgs = []
-    if not module.origin or isinit:
-        pkg_path = module.search_path
-        if pkg_path:  # Found non-.py file as submodule
-            candidates = [
-                f"{module.name}.{name}"
-                for name in os.listdir(pkg_path)
-                if os.path.isdir(os.path.join(pkg_path, name)) and name != "__pycache__"
-            ]
-            sub_pkgs = [
-                ".".join([package, name])
-                for _, name, _ in pkgutil.iter_modules([pkg_path])
-            ]
+    listing = module.listing
     # If submodule is a directory and doesn't contain __init__ raise Warning
-    candidates_missing = set(candidates) - set(sub_pkgs)
-    if isinit and candidates_missing and verbose.get():  # pragma: no cover
-        for candidate in candidates_missing:
-            logging.log(f"Module [{candidate}] has no __init__.py", logging.WARNING)
-    # Patch missing submodules
-    return list(set(candidates) | set(sub_pkgs))
+    if module.in_package and not listing.init and verbose:  # pragma: no cover
+        logging.log(f"Module [{package}] has no __init__.py", logging.WARNING)
+    return (
+        [Module.child(module, name, package=True) for name in listing.packages]
+        + [Module.child(module, name, package=False) for name in listing.modules]
+        + [
+            Module.child(module, name, package=False, suffix=NOTEBOOK_SUFFIX)
+            for name in listing.notebooks
+        ]
+    )
 
 
-def _parse_module(package: str):
-    """Grab all packages and subpackages"""
-    module = _get_module(package)
+class FileResult(NamedTuple):
+    """Findings within a single file"""
 
-    sub_pkgs = _get_subpackages(package, module)
+    path: str
+    findings: Tuple[Finding, ...]
+    key: Optional[tuple] = None  # (size, mtime_ns, digest) when it should be cached
 
-    funcs = []
-    for pkg in sub_pkgs:
-        funcs = funcs + [functools.partial(_parse_module, package=pkg)]
-    return module if module.origin else None, funcs
 
+class ModuleResult(NamedTuple):
+    """Compact scan result of a single module, sent back from pool workers"""
 
-def _parse_pyfile(module):
-    """Method for parsing python source code files to look for prints"""
-    if isinstance(module, ImportException):
-        logging.log(module.args[0], logging.CRITICAL)
-        return 2
+    name: str
+    files: Tuple[FileResult, ...]
+    status: int
+
+
+class Report(NamedTuple):
+    """Results of a single scan"""
 
-    encoding = "utf-8"
+    modules: Tuple[ModuleResult, ...]
+    errors: Tuple[Exception, ...]
+
+    @property
+    def status(self) -> int:
+        """0 when clean, 1 when something was found, 2 on errors"""
+        if self.errors:
+            return 2
+        return max((module.status for module in self.modules), default=0)
+
+
+def _read_source(mod_file: str, stats: Optional[Stats] = None) -> bytes:
+    """Read source file with a single binary read"""
+    start = time.perf_counter() if stats is not None else 0.0
+    with open(mod_file, "rb") as file:
+        data = file.read()
+    if stats is not None:
+        stats.read(len(data), time.perf_counter() - start)
+    return data
+
+
+def _scan_source(
+    data: bytes,
+    mod_file: str,
+    first: bool = False,
+    stats: Optional[Stats] = None,
+    settings: Optional[_Settings] = None,
+) -> Tuple[Finding, ...]:
+    """Find prints within source code of the file"""
+    detector = _detector if settings is None else settings.detector
+    if stats is None:
+        return detector.scan(data, first=first, filename=mod_file)
+    start = time.perf_counter()
+    findings = detector.scan(data, first=first, filename=mod_file)
+    stats.parsed(mod_file, time.perf_counter() - start)
+    return findings
+
+
+def _bytecode_clear(
+    mod_file: str, detector: Engine, stats: Optional[Stats] = None
+) -> bool:
+    """Check up-to-date bytecode of the file, True only when it doesn't use any of detected names
+
+    Files without such bytecode or using the names are read and parsed for exact findings
+    """
+    from noprint.bytecode import (  # pylint: disable=import-outside-toplevel
+        cached_code,
+        uses_names,
+    )
+
+    start = time.perf_counter() if stats is not None else 0.0
+    code = cached_code(mod_file)
+    clear = code is not None and not uses_names(code, detector.bytecode_names)
+    if stats is not None:
+        stats.add("bytecode", time.perf_counter() - start)
+        if clear:
+            stats.count("bytecode")
+    return clear
+
+
+def _scan_notebook(  # pylint: disable=too-many-arguments
+    mod_file: str,
+    first: bool = False,
+    stats: Optional[Stats] = None,
+    hasher=None,
+    settings: Optional[_Settings] = None,
+) -> Tuple[Finding, ...]:
+    """Find prints within code cells of the notebook, streamed from the file cell by cell"""
+    from noprint.notebook import (  # pylint: disable=import-outside-toplevel
+        scan_notebook,
+    )
+
+    detector = _detector if settings is None else settings.detector
+
+    def scan(data: bytes) -> Tuple[Finding, ...]:
+        return detector.scan(data, first=first, filename=mod_file)
+
+    if stats is None:
+        return scan_notebook(mod_file, scan, first, hasher)
+    start = time.perf_counter()
+    findings = scan_notebook(mod_file, scan, first, hasher)
+    stats.read(os.path.getsize(mod_file), 0.0)  # Reading isn't told apart from parsing
+    stats.parsed(mod_file, time.perf_counter() - start)
+    return findings
+
+
+def _parse_notebook(
+    mod_file: str,
+    first: bool = False,
+    stats: Optional[Stats] = None,
+    settings: Optional[_Settings] = None,
+) -> FileResult:
+    """Scan a notebook, cache entries are keyed by a digest computed while it's streamed"""
+    settings = _worker_settings() if settings is None else settings
+    cache = settings.cache
+    if cache is None:
+        return FileResult(
+            mod_file, _scan_notebook(mod_file, first, stats, settings=settings)
+        )
+
+    stat = os.stat(mod_file)
+    findings = cache.lookup(mod_file, stat)
+    if findings is not None:
+        if stats is not None:
+            stats.count("cached")
+        return FileResult(mod_file, findings)
+
+    from noprint.cache import hasher  # pylint: disable=import-outside-toplevel
+
+    content = hasher()
+    findings = _scan_notebook(mod_file, first, stats, content, settings)
+    if first and findings:  # Partial result, not worth caching
+        return FileResult(mod_file, findings)
+    key = (stat.st_size, stat.st_mtime_ns, content.hexdigest())
+    return FileResult(mod_file, findings, key)
+
+
+def _parse_file(
+    mod_file: str,
+    first: bool = False,
+    stats: Optional[Stats] = None,
+    settings: Optional[_Settings] = None,
+) -> FileResult:
+    """Scan a single file, reusing cached results of unchanged files and up-to-date bytecode
+
+    Settings of jobs run in-process are given explicitly, pool workers use the installed ones
+    """
+    settings = _worker_settings() if settings is None else settings
+    if mod_file.endswith(NOTEBOOK_SUFFIX):
+        return _parse_notebook(mod_file, first, stats, settings)
+    detector, cache = settings.detector, settings.cache
+    if detector.bytecode_names is not None and _bytecode_clear(
+        mod_file, detector, stats
+    ):
+        return FileResult(mod_file, ())
+    if cache is None:
+        data = _read_source(mod_file, stats)
+        return FileResult(
+            mod_file, _scan_source(data, mod_file, first, stats, settings)
+        )
+
+    stat = os.stat(mod_file)
+    findings = cache.lookup(mod_file, stat)
+    if findings is not None:
+        if stats is not None:
+            stats.count("cached")
+        return FileResult(mod_file, findings)
+
+    from noprint.cache import digest  # pylint: disable=import-outside-toplevel
+
+    data = _read_source(mod_file, stats)
+    findings = cache.lookup_digest(mod_file, data)
+    if findings is None:
+        findings = _scan_source(data, mod_file, first, stats, settings)
+        if first and findings:  # Partial result, not worth caching
+            return FileResult(mod_file, findings)
+    elif stats is not None:
+        stats.count("cached")
+    key = (stat.st_size, stat.st_mtime_ns, digest(data))
+    return FileResult(mod_file, findings, key)
+
+
+def _parse_pyfile(
+    module,
+    first: bool = False,
+    stats: Optional[Stats] = None,
+    settings: Optional[_Settings] = None,
+) -> ModuleResult:
+    """Method for parsing python source code files to look for prints"""
     status = 0
-    # First two lines of Python source code have to be ASCII compatible
-    # PEP-8, PEP-263, PEP-3120
+    files = []
     for mod_file in module.origin:
-        with open(mod_file, "r", encoding="utf-8") as file:
-            for _ in range(2):  # Check 1st two lines
-                try:
-                    found = re.search(ENCODING_CAPTURE, file.readline())
-                # pylint: disable=broad-exception-caught
-                except Exception as exc:  # pragma: no cover
-                    logging.log(exc.args[0], logging.CRITICAL)
-                    return 2
-                if found:
-                    encoding = found.group(1)
+        result = _parse_file(mod_file, first=first, stats=stats, settings=settings)
+        files.append(result)
+        if result.findings:
+            status = 1
+            if first:
+                break
+    return ModuleResult(module.name, tuple(files), status)
+
+
+def _parse_member(
+    member,
+    first: bool = False,
+    stats: Optional[Stats] = None,
+    settings: Optional[_Settings] = None,
+):
+    """Scan python file within an archive, its source goes straight from the archive to the detector"""
+    from noprint.archive import read  # pylint: disable=import-outside-toplevel
+
+    start = time.perf_counter() if stats is not None else 0.0
+    data = read(member)
+    if stats is not None:
+        stats.read(len(data), time.perf_counter() - start)
+        stats.count("modules")
+    findings = _scan_source(data, member.path, first, stats, settings)
+    return ModuleResult(
+        member.name, (FileResult(member.path, findings),), 1 if findings else 0
+    )
+
+
+def _parse_module(
+    package,
+    first: bool = False,
+    recursive: bool = True,
+    stats: Optional[Stats] = None,
+    settings: Optional[_Settings] = None,
+):
+    """Grab all packages and subpackages, scan the module itself for prints
+
+    Package can be given by its name, as an already resolved Module or as a member of an archive
+    (noprint.archive.Member). Returns the module result and its subpackages"""
+    settings = _worker_settings() if settings is None else settings
+    if isinstance(package, tuple):
+        return _parse_member(package, first, stats, settings), []
+    verbose = settings.verbose
+    if stats is None:
+        module = (
+            package if isinstance(package, Module) else _get_module(package, verbose)
+        )
+        sub_pkgs = _get_subpackages(module.name, module, verbose) if recursive else []
+        return (
+            _parse_pyfile(module, first, settings=settings) if module.origin else None,
+            sub_pkgs,
+        )
+
+    start = time.perf_counter()
+    module = package if isinstance(package, Module) else _get_module(package, verbose)
+    origin = module.origin
+    lap = time.perf_counter()
+    stats.add("resolve", lap - start)
+    sub_pkgs = _get_subpackages(module.name, module, verbose) if recursive else []
+    stats.add("listing", time.perf_counter() - lap)
+    stats.count("modules")
+    return _parse_pyfile(module, first, stats, settings) if origin else None, sub_pkgs
+
+
+def _parse_chunk(
+    packages,
+    first: bool = False,
+    recursive: bool = True,
+    settings: Optional[_Settings] = None,
+):
+    """Pool job - scan a chunk of packages, errors of a single package don't affect the others
+
+    Jobs run in-process get settings of their scan, pool worker processes use the installed ones.
+    Returns module results and errors, subpackages and stats of the job (None unless they are collected)
+    """
+    settings = _worker_settings() if settings is None else settings
+    if settings.cache is not None:
+        # Worker of a warm pool, results of previous scans might be saved since
+        settings.cache.refresh()
+    stats = None
+    if settings.collect_stats or settings.profile:
+        stats = Stats()
+        stats.start(profile=settings.profile)
+    results, sub_pkgs = [], []
+    try:
+        for package in packages:
+            try:
+                result, subs = _parse_module(package, first, recursive, stats, settings)
+            except Exception as exc:  # pylint: disable=broad-except
+                results.append(exc)
+                continue
+            sub_pkgs.extend(subs)
+            if result:
+                results.append(result)
+                if first and result.status:
                     break
+    finally:
+        if stats is not None:
+            stats.stop()
+    return results, sub_pkgs, stats
 
-        with open(mod_file, "r", encoding=encoding) as file:
-            parsed = ast.parse(file.read())
-            clear = True
-            name = ""
-            if mod_file.endswith("__init__.py") or mod_file.endswith("__main__.py"):
-                name = f".{mod_file[-11:-3]}"  # pragma: no cover
-            for node in ast.walk(parsed):
-                if node.__dict__.get("id") == "print":
-                    clear = False
-                    status = 1
-                    if verbose.get():  # pragma: no cover
-                        logging.log(
-                            f"[{module.name}{name}] Line: {node.lineno}", log_lvl.get()
-                        )
-
-                    if first_only.get():  # pragma: no cover
-                        return status
-            if clear and very_verbose.get():
-                logging.log(
-                    f"[CLEAR]:[{module.name}{name}]", logging.INFO
-                )  # pragma: no cover
-    return status
+
+CHUNK_MODULES = 16  # Most packages of unknown size sent to a worker within a single job
+# Bytes every file is weighted by on top of its size - for opening it
+FILE_COST = 2**10
 
 
-class PackageFinder:
-    """Class responsible for finding all packages and handling multiprocessing"""
+def _size(package) -> Optional[int]:
+    """Size of the module file or archive member, None for packages and modules not listed yet"""
+    return getattr(package, "size", None)
 
-    processes = []
-    results = []
 
-    def __init__(self):  # pragma: no cover
-        self.pool = Pool(mt_threads.get())
+def _chunks(
+    packages: list, workers: int, chunk_size: int = CHUNK_SIZE
+) -> Iterator[list]:
+    """Split packages into jobs of balanced size, largest first to avoid a long tail
 
-    def err_callback(self, exc):  # pragma: no cover
-        """Error callback from searching module"""
-        self.results.append(exc)
+    Packages of unknown size go first (they are listed by the job and lead to further jobs), modules
+    are packed by size of their files into jobs of chunk_size, but at least enough of them to keep
+    given (idle) workers busy"""
+    unknown = [package for package in packages if _size(package) is None]
+    count = max(1, min(CHUNK_MODULES, -(-len(unknown) // max(workers, 1))))
+    for i in range(0, len(unknown), count):
+        yield unknown[i : i + count]
 
-    def callback(self, res):  # pragma: no cover
-        """Callback from finding module"""
-        self.results.append(res[0])
-        for func in res[1]:
-            proc = self.pool.apply_async(
-                func, callback=self.callback, error_callback=self.err_callback
+    sized = sorted(
+        (package for package in packages if _size(package) is not None),
+        key=_size,
+        reverse=True,
+    )
+    if not sized:
+        return
+    total = sum(package.size for package in sized) + FILE_COST * len(sized)
+    jobs = min(len(sized), max(-(-total // chunk_size), workers))
+    chunks = [[] for _ in range(jobs)]
+    heap = [(0, index) for index in range(jobs)]  # (bytes, chunk), smallest on top
+    for package in sized:
+        size, index = heapq.heappop(heap)
+        chunks[index].append(package)
+        heapq.heappush(heap, (size + package.size + FILE_COST, index))
+    # Every chunk is led by one of the largest modules, in descending order
+    yield from chunks
+
+
+WINDOW = 1024  # Most packages taken from the backlog at once and split into chunks
+QUEUE_DEPTH = 2  # Jobs submitted ahead for every worker
+# Most targets looked at before the scan starts, when picking the executor
+PEEK_TARGETS = 4096
+
+
+class _Backlog:
+    """Packages waiting to be submitted, bounded by depth and breadth of the tree rather than its size
+
+    Most recently discovered packages are taken first (depth-first), a window at a time
+    """
+
+    def __init__(self, workers: int, chunk_size: int = CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.sources = []  # Stack of iterators over (package or error, recursive)
+        self.chunks = deque()  # (chunk, recursive) ready to be submitted
+        self.errors = deque()  # Errors found among the targets
+
+    def push(self, targets: Iterable):
+        """Add (package, recursive) pairs, they are taken before anything pushed earlier"""
+        self.sources.append(iter(targets))
+
+    def pop(self, idle: Optional[int] = None) -> Optional[Tuple[list, bool]]:
+        """Next chunk of packages and whether they're scanned recursively, None once there's nothing left
+
+        A window is split between idle workers (all by default), once they're busy it's packed only by
+        chunk size - so that small directories don't turn into a job per file"""
+        idle = self.workers if idle is None else idle
+        while not self.chunks and self.sources:
+            window = list(islice(self.sources[-1], WINDOW))
+            if not window:
+                self.sources.pop()
+                continue
+            self.errors.extend(tgt for tgt, _ in window if isinstance(tgt, Exception))
+            for recursive in (True, False):
+                packages = [
+                    tgt
+                    for tgt, rec in window
+                    if rec is recursive and not isinstance(tgt, Exception)
+                ]
+                self.chunks.extend(
+                    (chunk, recursive)
+                    for chunk in _chunks(packages, idle, self.chunk_size)
+                )
+        return self.chunks.popleft() if self.chunks else None
+
+
+def _recorded(items: Iterable, seen: list) -> Iterator:
+    """Iterate over the items, remembering them in the list"""
+    for item in items:
+        seen.append(item)
+        yield item
+
+
+def _within(path: str, parents: List[str]) -> bool:
+    """Check if the path is one of the parents (normalized absolute paths) or lies within one"""
+    path = os.path.normcase(os.path.abspath(path))
+    return any(
+        path == parent or path.startswith(parent.rstrip(os.sep) + os.sep)
+        for parent in parents
+    )
+
+
+def _changed_modules(ref: str, pkgs, path_filter=None) -> List[Module]:
+    """Modules of python files changed since git ref, limited to given packages and the path filter
+
+    Packages given by their names are matched by module names, paths by file paths. Paths are
+    matched by the filter relative to the top-level directory of the repository"""
+    from noprint.vcs import (  # pylint: disable=import-outside-toplevel
+        changed_files,
+        toplevel,
+    )
+
+    paths = [os.path.normcase(os.path.abspath(pkg)) for pkg in pkgs if _is_path(pkg)]
+    names = [pkg for pkg in pkgs if not _is_path(pkg)]
+    modules = {}
+    top = toplevel()
+    for path in changed_files(ref, top):
+        if path_filter is not None and not _filter_accepts(
+            path_filter, os.path.relpath(path, top)
+        ):
+            continue
+        module = Module.from_path(path)
+        if (
+            not pkgs
+            or _within(path, paths)
+            or any(
+                module.name == pkg or module.name.startswith(f"{pkg}.") for pkg in names
+            )
+        ):
+            modules[module.name] = module
+    return list(modules.values())
+
+
+def _is_path(package: str) -> bool:
+    """Check if argument is a file system path (or archive) rather than a package name"""
+    return package.endswith((".py", NOTEBOOK_SUFFIX) + ARCHIVE_SUFFIXES) or any(
+        sep in package for sep in (os.sep, os.altsep) if sep
+    )
+
+
+def _filter_accepts(path_filter, path: str) -> bool:
+    """Check the file (relative to the scan root) and its parent directories below the root"""
+    directory = os.path.dirname(path)
+    while directory:
+        if not path_filter.accepts_dir(directory):
+            return False
+        directory = os.path.dirname(directory)
+    return path_filter.accepts_file(path)
+
+
+def _path_modules(path: str, path_filter=None) -> Iterator[Module]:
+    """Modules of python files and notebooks at given path, without import-style resolution
+
+    Files given explicitly are scanned, directories are walked skipping paths rejected by the filter.
+    Archives yield their python members instead"""
+    if os.path.isdir(path):
+        for mod_file, size in walk_sizes(
+            path, path_filter and path_filter.rooted(path)
+        ):
+            yield Module.from_path(mod_file, size)
+    elif os.path.isfile(path) and path.endswith((".py", NOTEBOOK_SUFFIX)):
+        yield Module.from_path(path, os.path.getsize(path))
+    else:
+        from noprint.archive import (  # pylint: disable=import-outside-toplevel
+            members,
+            split_archive,
+        )
+
+        archive = split_archive(path)
+        if archive is None:
+            raise ImportException(
+                f"Path [{path}] is not a python file, directory nor archive"
             )
-            self.processes.append(proc)
-
-    def packages_iter(self):
-        """Iterate over all provided subpackages"""
-        for package in packages.get():
-            func = functools.partial(_parse_module, package=package)
-            proc = self.pool.apply_async(
-                func, callback=self.callback, error_callback=self.err_callback
+        yield from members(*archive, path_filter=path_filter)
+
+
+def _targets(
+    packages: Iterable[str], changed_since: Optional[str] = None, path_filter=None
+):
+    """Packages (scanned with their subpackages) and modules to scan, or errors preventing that"""
+    if changed_since is not None:
+        try:
+            for module in _changed_modules(changed_since, packages, path_filter):
+                yield module, False
+        except ChangedFilesException as exc:
+            yield exc, False
+        return
+
+    for package in packages:
+        if not _is_path(package):
+            yield package, True
+            continue
+        try:
+            for module in _path_modules(package, path_filter):
+                yield module, False
+        except ImportException as exc:
+            yield exc, False
+
+
+def _file_name(name: str, mod_file: str) -> str:
+    """Name of the module file for logging, package files are told apart by their suffix"""
+    if mod_file.endswith("__init__.py") or mod_file.endswith("__main__.py"):
+        return f"{name}.{mod_file[-11:-3]}"
+    return name
+
+
+def _location(finding: Finding) -> str:
+    """Line of the finding, preceded by the cell number for notebooks"""
+    if finding.cell is None:
+        return f"Line: {finding.line}"
+    return f"Cell: {finding.cell} Line: {finding.line}"
+
+
+def _report(
+    result, verbosity: int = 0, level: int = logging.WARNING, reporter=None
+) -> int:
+    """Report the result received from a worker and return its status
+
+    Lines of the whole result are written as a batch through the buffered reporter"""
+    reporter = reporter if reporter is not None else logging.reporter
+    if isinstance(result, Exception):
+        reporter.write(str(result), logging.CRITICAL)
+        return 2
+
+    lines = verbosity >= 1 and reporter.enabled(level)
+    clear = verbosity >= 2 and reporter.enabled(logging.INFO)
+    if not (lines or clear):
+        return result.status
+    for mod_file, findings, _ in result.files:
+        name = _file_name(result.name, mod_file)
+        if lines and findings:
+            reporter.write_many(
+                [f"[{name}] {_location(finding)}" for finding in findings], level
             )
-            self.processes.append(proc)
-
-        while len(self.processes) > 0:
-            for job in list(self.processes):
-                if job.ready():
-                    self.processes.remove(job)
-                    res = self.results.pop()
-                    if res:
-                        yield res
-
-    def run(self):
-        """Find print statements and potential exceptions from selected packages"""
-        results = []
-
-        for module in self.packages_iter():
-            res = _parse_pyfile(module)
-            results.append(res)
-            if res >= 1 and first_only.get():  # pragma: no cover
-                break
-        self.pool.terminate()
-        self.pool.join()
-        return max(results)
+        elif clear and not findings:
+            reporter.write(f"[CLEAR]:[{name}]", logging.INFO)
+    return result.status
+
+
+def _resolve(targets, verbose: bool = False, path_filter=None):
+    """Resolve packages given by their names once per scan in the main process
+
+    Jobs get ready Modules with their directory listings, errors are returned in place of targets
+    """
+    seen = set()
+    for target, recursive in targets:
+        if not isinstance(target, str):  # Module, archive member or error
+            yield target, recursive
+        elif target not in seen:
+            seen.add(target)
+            try:
+                module = _get_module(target, verbose)
+            except ImportException as exc:
+                yield exc, recursive
+                continue
+            # Inherited by all its subpackages
+            module.path_filter = path_filter and path_filter.rooted(module.root)
+            yield module.resolve(), recursive
+
+
+def _target_sizes(target: Module, recursive: bool) -> Iterator[int]:
+    """Sizes of files of the scan target, sizes known from directory listings are not looked up again"""
+    if target.size is not None:
+        yield target.size
+    elif recursive and target.search_path:
+        yield from (
+            size for _, size in walk_sizes(target.search_path, target.path_filter)
+        )
+    else:
+        yield from (os.stat(path).st_size for path in target.origin)
+
+
+def _estimate(targets, files_limit: int, bytes_limit: int) -> Tuple[int, int]:
+    """Count files and bytes of the targets, stops as soon as both limits are reached"""
+    files = size = 0
+    for target, recursive in targets:
+        if isinstance(target, Exception):
+            continue
+        try:
+            for file_size in _target_sizes(target, recursive):
+                files += 1
+                size += file_size
+                if files >= files_limit and size >= bytes_limit:
+                    return files, size
+        except OSError:
+            continue  # Reported by the job itself
+    return files, size
+
+
+def _next_completed(
+    completed: queue.SimpleQueue,
+    stats: Optional[Stats] = None,
+    executor: Optional[Executor] = None,
+):
+    """Block until any job finishes, time spent waiting is collected in stats
+
+    Inline executor runs its next job first, unless some job has already finished"""
+    start = time.perf_counter() if stats is not None else 0.0
+    if isinstance(executor, InlineExecutor) and completed.empty():
+        executor.run_next()
+    future = completed.get()
+    if stats is not None:
+        stats.add("wait", time.perf_counter() - start)
+    return future
+
+
+class Scanner:  # pylint: disable=too-many-instance-attributes
+    """Reusable scanner, keeps its worker pool warm between scans
+
+    Use as a context manager or call close() to shut the pool down"""
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        *,
+        workers: int = 1,
+        first_only: bool = False,
+        rules: Optional[Iterable[Rule]] = None,
+        mode: str = "ast",
+        prefilter: bool = True,
+        bytecode: bool = False,
+        cache_dir: Optional[str] = None,
+        verbose: bool = False,
+        stats: bool = False,
+        profile: bool = False,
+        executor: str = "auto",
+        chunk_size: int = CHUNK_SIZE,
+        queue_depth: int = QUEUE_DEPTH,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+    ):
+        if executor != "auto" and executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor [{executor}]")
+        self.workers = workers
+        self.first_only = first_only
+        self.verbose = verbose
+        self.profile = profile
+        self.executor_kind = executor
+        self.chunk_size = chunk_size
+        # Jobs in flight are limited, so memory doesn't grow with the size of scanned tree
+        self.queue_depth = queue_depth
+        # Timers and counters of all scans, collected only when asked for (or profiling)
+        self.stats = Stats() if stats or profile else None
+        self.detector = ENGINES[mode](
+            rules if rules is not None else [PrintRule()],
+            prefilter=prefilter,
+            bytecode=bytecode,
+        )
+        self.cache = None
+        if cache_dir:
+            from noprint.cache import (  # pylint: disable=import-outside-toplevel
+                ResultCache,
+            )
+
+            self.cache = ResultCache(cache_dir, self.detector.signature).load()
+        # Patterns of scanned files, matched while directories are listed
+        self.path_filter = None
+        if include or exclude:
+            from noprint.filters import (  # pylint: disable=import-outside-toplevel
+                PathFilter,
+            )
+
+            self.path_filter = PathFilter(include, exclude)
+        self._executors = {}
+
+    def _settings(self, in_process: bool = False) -> _Settings:
+        """Settings of the scan used by jobs"""
+        return _Settings(
+            self.cache,
+            self.detector,
+            self.verbose,
+            self.stats is not None,
+            # Main process profiler already covers jobs run inline
+            self.profile and not in_process,
+        )
+
+    def pool(self, kind: str) -> Executor:
+        """Executor of given kind, started on first use and kept until closed"""
+        if kind not in self._executors:
+            if kind in IN_PROCESS:
+                self._executors[kind] = get_executor(kind)(self.workers)
+            else:
+                self._executors[kind] = get_executor(kind)(
+                    self.workers,
+                    initializer=_init_worker,
+                    initargs=(self._settings(),),
+                )
+        return self._executors[kind]
+
+    @property
+    def executor(self) -> Executor:
+        """Worker pool of the selected executor (process pool for auto), started on first use"""
+        kind = self.executor_kind
+        return self.pool("process" if kind == "auto" else kind)
+
+    def choose_executor(self, targets) -> str:
+        """Executor for the scan of given targets, auto picks it by their size"""
+        if self.executor_kind != "auto":
+            return self.executor_kind
+        if self.workers <= 1:
+            return "sequential"
+        files, size = _estimate(
+            islice(targets, PEEK_TARGETS), AUTO_MIN_FILES, AUTO_MIN_BYTES
+        )
+        return auto_executor(self.workers, files, size)
+
+    def _prepare(self, targets) -> Tuple[Executor, Optional[_Settings]]:
+        """Pick and start the executor of the scan, returns it with settings passed to its jobs
+
+        Jobs run in this process get the settings along, so scanners don't affect each other.
+        Pool worker processes have them installed by their initializer (None is returned)
+        """
+        kind = self.choose_executor(targets)
+        if self.verbose:
+            logging.log(f"Scanning with {kind} executor", logging.INFO)
+        settings = self._settings(in_process=True) if kind in IN_PROCESS else None
+        return self.pool(kind), settings
+
+    def _submit(  # pylint: disable=too-many-arguments
+        self,
+        executor,
+        backlog: "_Backlog",
+        frontier: dict,
+        completed,
+        settings: Optional[_Settings] = None,
+    ):
+        """Submit chunks from the backlog until the limit of jobs in flight is reached"""
+        while len(frontier) < self.workers * self.queue_depth:
+            ready = backlog.pop(max(0, self.workers - len(frontier)))
+            if ready is None:
+                return
+            future = executor.submit(
+                _parse_chunk, ready[0], self.first_only, ready[1], settings
+            )
+            # Wall clock time of submission, compared with start of the job when collecting stats
+            frontier[future] = time.time() if self.stats is not None else None
+            future.add_done_callback(completed.put)
+
+    def results(  # pylint: disable=too-many-locals,too-many-branches
+        self, packages: Iterable[str] = (), changed_since: Optional[str] = None
+    ) -> Iterator[Union[ModuleResult, Exception]]:
+        """Iterate over module results and errors as soon as their jobs complete
+
+        Targets are discovered lazily and only a limited number of jobs is in flight, so results are
+        held only until they're consumed. Closing the iterator early cancels outstanding jobs
+        """
+        frontier = {}  # Submitted future -> time of submission, separate for each scan
+        completed = queue.SimpleQueue()
+        stats = self.stats
+        main = Stats() if stats is not None else None  # Time of the result loop
+        backlog = _Backlog(self.workers, self.chunk_size)
+
+        if main is not None:
+            main.start(profile=self.profile)
+        try:
+            targets = _resolve(
+                _targets(packages, changed_since, self.path_filter),
+                self.verbose,
+                self.path_filter,
+            )
+            head = []  # Targets looked at while picking the executor
+            executor, settings = self._prepare(_recorded(targets, head))
+            backlog.push(chain(head, targets))
+
+            while True:
+                self._submit(executor, backlog, frontier, completed, settings)
+                while backlog.errors:
+                    yield backlog.errors.popleft()
+                if not frontier:
+                    break
+                future = _next_completed(completed, stats, executor)
+                if future not in frontier or future.cancelled():
+                    continue
+                submitted = frontier.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    yield exc
+                    continue
+                items, sub_pkgs, job_stats = future.result()
+                if job_stats is not None:
+                    stats.merge(job_stats, submitted)
+                backlog.push((package, True) for package in sub_pkgs)
+                # Workers get subpackages before results are consumed
+                self._submit(executor, backlog, frontier, completed, settings)
+                for item in items:
+                    if not isinstance(item, Exception):
+                        self._store(item)
+                    yield item
+        finally:
+            for future in frontier:
+                future.cancel()
+            if self.cache is not None:
+                self.cache.save()
+            if main is not None:
+                main.stop()
+                stats.add("wall", main.busy)
+                stats.add_profile(main.profile)
+
+    def _store(self, result: ModuleResult):
+        """Remember results of scanned files in the cache"""
+        if self.cache is not None:
+            for file in result.files:
+                if file.key:
+                    self.cache.store(file.path, file.key, file.findings)
+
+    def scan(
+        self, packages: Iterable[str] = (), changed_since: Optional[str] = None
+    ) -> Report:
+        """Scan packages, modules or paths and collect the results"""
+        modules, errors = [], []
+        with closing(self.results(packages, changed_since)) as results:
+            for result in results:
+                if isinstance(result, Exception):
+                    errors.append(result)
+                else:
+                    modules.append(result)
+                if self.first_only and (errors or result.status):
+                    break
+        return Report(tuple(modules), tuple(errors))
+
+    def scan_source(self, data: bytes, name: str = "<unknown>") -> Tuple[Finding, ...]:
+        """Scan source code in the current process, without touching the pool"""
+        return self.detector.scan(data, first=self.first_only, filename=name)
 
+    def close(self):
+        """Shut the worker pools down"""
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors = {}
 
-def detect_prints() -> int:  # pragma: no cover
-    """Detect print statements from packages found by _get_subpackages"""
-    # pylint: disable=unnecessary-lambda-assignment
-    get_var = lambda name, ctx: [var.get() for var in iter(ctx) if var.name == name][0]
+    def __enter__(self):
+        return self
 
-    ctx = contextvars.copy_context()
+    def __exit__(self, *exc_info):
+        self.close()
 
-    packages.set(get_var("packages", ctx))
-    mt_threads.set(get_var("mt_threads", ctx))
-    log_lvl.set(get_var("log_lvl", ctx))
-    first_only.set(get_var("first_only", ctx))
-    verbose.set(get_var("verbose", ctx))
-    very_verbose.set(get_var("very_verbose", ctx))
 
+def detect_prints(  # pylint: disable=too-many-arguments
+    scanner: Scanner,
+    packages: Iterable[str] = (),
+    changed_since: Optional[str] = None,
+    *,
+    verbosity: int = 0,
+    level: int = logging.WARNING,
+    output=None,
+) -> int:
+    """Report results of the scan as soon as they arrive and return the overall status
+
+    Results are logged, unless an output format (noprint.output) is given"""
     logging.log(
         "Starting analysis, depending on package complexity, this may take a few seconds...",
         logging.INFO,
     )
-    pkg_finder = PackageFinder()
-    return pkg_finder.run()
+    status = 0
+    if output is not None:
+        output.start()
+    with closing(scanner.results(packages, changed_since)) as results:
+        for result in results:
+            start = time.perf_counter()
+            if output is not None:
+                res = output.write(result)
+            else:
+                res = _report(result, verbosity, level)
+            if scanner.stats is not None:
+                scanner.stats.add("report", time.perf_counter() - start)
+            status = max(status, res)
+            if res >= 1 and scanner.first_only:
+                break
+    if output is not None:
+        output.finish()
+    logging.reporter.flush()
+    return status
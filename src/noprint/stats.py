@@ -0,0 +1,165 @@
+"""
+Timers and counters of scan phases, collected in pool workers and merged in the main process
+"""
+import time
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+# Phases timed within pool workers, in the order they are shown
+WORKER_PHASES = ("resolve", "listing", "bytecode", "read", "parse")
+# Phases timed within the main process
+MAIN_PHASES = ("wait", "report")
+
+
+class _ProfileData:  # pylint: disable=too-few-public-methods
+    """Picklable profiler results, accepted by pstats.Stats like a cProfile.Profile"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        """Stats are already created"""
+
+
+class Stats:  # pylint: disable=too-many-instance-attributes
+    """Timers and counters of a single job or, once merged, of the whole scan"""
+
+    slowest_count = 10
+
+    def __init__(self):
+        self.timers: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.slowest: List[Tuple[float, str]] = []  # Heap of (parse time, path)
+        self.queue_wait_max = 0.0
+        # Wall clock time when the job started, compared across processes
+        self.started = 0.0
+        self.busy = 0.0  # Time spent running jobs
+        # Profiler results, picklable within jobs, pstats.Stats once merged
+        self.profile = None
+        self._profiler = None
+
+    def add(self, phase: str, seconds: float):
+        """Add time spent in the phase"""
+        self.timers[phase] = self.timers.get(phase, 0.0) + seconds
+
+    def count(self, counter: str, value: int = 1):
+        """Increase the counter"""
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def read(self, size: int, seconds: float):
+        """Record a file read"""
+        self.add("read", seconds)
+        self.count("files")
+        self.count("bytes", size)
+
+    def _keep_slowest(self, seconds: float, path: str):
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, (seconds, path))
+        else:
+            heapq.heappushpop(self.slowest, (seconds, path))
+
+    def parsed(self, path: str, seconds: float):
+        """Record a file scan, keeping only the slowest files"""
+        self.add("parse", seconds)
+        self._keep_slowest(seconds, path)
+
+    def start(self, profile: bool = False):
+        """Start measuring a job"""
+        self.started = time.time()
+        self.busy = -time.perf_counter()
+        if profile:
+            import cProfile  # pylint: disable=import-outside-toplevel
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        """Stop measuring the job, profiler results are kept in picklable form"""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.create_stats()
+            self.profile = _ProfileData(self._profiler.stats)
+            self._profiler = None
+        self.busy += time.perf_counter()
+        self.count("jobs")
+
+    def merge(self, other: "Stats", submitted: Optional[float] = None):
+        """Add results of a finished job, submitted being wall clock time of its submission"""
+        for phase, seconds in other.timers.items():
+            self.add(phase, seconds)
+        for counter, value in other.counters.items():
+            self.count(counter, value)
+        for seconds, path in other.slowest:
+            self._keep_slowest(seconds, path)
+        if submitted is not None:
+            wait = max(other.started - submitted, 0.0)
+            self.add("queue", wait)
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+        self.busy += other.busy
+        self.add_profile(other.profile)
+
+    def add_profile(self, data: Optional[_ProfileData]):
+        """Merge profiler results of a job"""
+        if data is None:
+            return
+        import pstats  # pylint: disable=import-outside-toplevel
+
+        if self.profile is None:
+            self.profile = pstats.Stats()
+        self.profile.add(data)
+
+    def summary(self, workers: int) -> dict:
+        """Collected results as a JSON serializable dictionary"""
+        wall = self.timers.get("wall", 0.0)
+        jobs = self.counters.get("jobs", 0)
+        queue_wait = self.timers.get("queue", 0.0)
+        return {
+            "wall": wall,
+            "workers": workers,
+            "utilization": self.busy / (wall * workers) if wall and workers else 0.0,
+            "phases": {
+                phase: self.timers.get(phase, 0.0)
+                for phase in WORKER_PHASES + MAIN_PHASES
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "queue_wait": {
+                "total": queue_wait,
+                "mean": queue_wait / jobs if jobs else 0.0,
+                "max": self.queue_wait_max,
+            },
+            "slowest": [
+                {"path": path, "parse": seconds}
+                for seconds, path in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+    def table(self, workers: int) -> str:
+        """Collected results as a human readable table"""
+        summary = self.summary(workers)
+        rows = [
+            f"wall time: {summary['wall']:.3f} s, {workers} workers "
+            f"utilized at {summary['utilization']:.0%}",
+            "counters: "
+            + ", ".join(
+                f"{name} {value}" for name, value in summary["counters"].items()
+            ),
+            f"{'phase':<10}{'time [s]':>10}",
+        ]
+        rows += [
+            f"{phase:<10}{seconds:>10.3f}"
+            for phase, seconds in summary["phases"].items()
+        ]
+        wait = summary["queue_wait"]
+        rows.append(
+            f"queue wait: total {wait['total']:.3f} s, mean {wait['mean']:.4f} s, max {wait['max']:.3f} s"
+        )
+        rows.append("slowest files:")
+        rows += [
+            f"{item['parse']:>10.4f} s  {item['path']}" for item in summary["slowest"]
+        ]
+        return "\n".join(rows) + "\n"
+
+    def dump_profile(self, path: str):
+        """Write merged profiler results of all jobs, readable with pstats"""
+        if self.profile is not None:
+            self.profile.dump_stats(path)
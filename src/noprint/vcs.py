@@ -0,0 +1,64 @@
+"""
+Version control integration for scanning only changed files
+"""
+import os
+import subprocess
+from typing import List, Optional
+
+from noprint.exceptions import ChangedFilesException
+
+
+def _git(*args: str, cwd: str = None) -> str:
+    """Run git command and return its output"""
+    try:
+        proc = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except (OSError, subprocess.CalledProcessError) as exc:
+        stderr = getattr(exc, "stderr", None)
+        msg = stderr.decode(errors="replace").strip() if stderr else str(exc)
+        raise ChangedFilesException(
+            f"Unable to get changed files from git: {msg}"
+        ) from exc
+    return proc.stdout.decode("utf-8", errors="surrogateescape")
+
+
+def toplevel() -> str:
+    """Top-level directory of the repository within the working directory"""
+    return _git("rev-parse", "--show-toplevel").strip()
+
+
+def changed_files(ref: str, top: Optional[str] = None) -> List[str]:
+    """Python files and notebooks changed in the working tree and index since ref (deleted files excluded)
+
+    Untracked files (not ignored) are new to the working tree, so they are included as well
+    """
+    if top is None:
+        top = toplevel()
+    out = _git(
+        "diff",
+        "--name-only",
+        "--diff-filter=d",
+        "-z",
+        ref,
+        "--",
+        "*.py",
+        "*.ipynb",
+        cwd=top,
+    )
+    untracked = _git(
+        "ls-files",
+        "--others",
+        "--exclude-standard",
+        "-z",
+        "--",
+        "*.py",
+        "*.ipynb",
+        cwd=top,
+    )
+    paths = dict.fromkeys(out.split("\0") + untracked.split("\0"))
+    return [os.path.join(top, path) for path in paths if path]
@@ -0,0 +1,269 @@
+"""
+Watch mode - single full scan followed by incremental rescans of changed files
+"""
+import os
+import time
+import tokenize
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import noprint.logger as logging
+
+from noprint import NOTEBOOK_SUFFIX
+from noprint.detect import Finding
+from noprint.exceptions import ParentModuleNotFoundException
+from noprint.module import Module, list_dir, walk_files
+from noprint.notebook import code_cells, scan_notebook
+from noprint.sprint import (
+    Scanner,
+    _file_name,
+    _is_path,
+    _location,
+    _read_source,
+    _report,
+    _within,
+)
+
+
+class Change(NamedTuple):
+    """Findings which appeared or disappeared in a file between two scans"""
+
+    name: str
+    path: str
+    new: Tuple[Finding, ...]
+    resolved: Tuple[Finding, ...]
+
+
+class _Entry(NamedTuple):
+    """Findings of a watched file from its last scan"""
+
+    name: str
+    findings: Tuple[Finding, ...]
+    lines: Tuple[str, ...]  # Source lines of findings, used to match them between scans
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    """Modification time and size of the file, None if it's gone"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _lines(data: bytes, findings: Tuple[Finding, ...]) -> Tuple[str, ...]:
+    """Stripped source lines of findings"""
+    lines = data.splitlines()
+    return tuple(
+        lines[finding.line - 1].strip().decode("utf-8", "replace")
+        for finding in findings
+    )
+
+
+def _file_lines(path: str, findings: Tuple[Finding, ...]) -> Tuple[str, ...]:
+    """Stripped source lines of findings within the file, lines of notebooks are taken from their cells"""
+    if not findings:
+        return ()
+    if not path.endswith(NOTEBOOK_SUFFIX):
+        return _lines(_read_source(path), findings)
+    cells = {number: source.encode("utf-8") for number, source in code_cells(path)}
+    return tuple(_lines(cells[finding.cell], (finding,))[0] for finding in findings)
+
+
+def _diff(old: _Entry, new: _Entry) -> Tuple[Tuple[Finding, ...], Tuple[Finding, ...]]:
+    """New and resolved findings, matched by rule and source line so shifted lines aren't reported"""
+    old_keys = Counter((f.rule, line) for f, line in zip(old.findings, old.lines))
+    new_keys = Counter((f.rule, line) for f, line in zip(new.findings, new.lines))
+    added, removed = new_keys - old_keys, old_keys - new_keys
+
+    def pick(entry, keys):
+        picked = []
+        for finding, line in zip(entry.findings, entry.lines):
+            if keys[(finding.rule, line)] > 0:
+                keys[(finding.rule, line)] -= 1
+                picked.append(finding)
+        return tuple(picked)
+
+    return pick(new, added), pick(old, removed)
+
+
+def _root(package: str) -> Optional[str]:
+    """Scan root (normalized absolute path) of the package given by its name or path, None if not found"""
+    if _is_path(package):
+        path = os.path.abspath(package)
+        root = path if os.path.isdir(path) else os.path.dirname(path)
+    else:
+        try:
+            root = os.path.abspath(Module(package).root)
+        except ParentModuleNotFoundException:
+            return None
+    return os.path.normcase(root)
+
+
+class Watcher:  # pylint: disable=too-many-instance-attributes
+    """Keeps findings of all scanned files in memory and rescans only the files which changed
+
+    Changes are detected by polling stats of known files and their directories"""
+
+    def __init__(
+        self,
+        scanner: Scanner,
+        packages: Iterable[str],
+        interval: float = 0.5,
+        debounce: float = 0.1,
+    ):
+        self.scanner = scanner
+        self.packages = list(packages)
+        self.interval = interval
+        self.debounce = debounce
+        self.files: Dict[str, _Entry] = {}
+        # Last seen stats of files
+        self.stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.dirs: Dict[str, Optional[Tuple[int, int]]] = {}
+        # Scan roots of the packages, paths are matched by the path filter relative to them
+        self.roots = [root for root in map(_root, self.packages) if root is not None]
+
+    def _track_dir(self, directory: str):
+        if directory not in self.dirs:
+            self.dirs[directory] = _stamp(directory)
+
+    def start(self, verbosity: int = 0, level: int = logging.WARNING) -> int:
+        """Full scan of the packages, remembering findings of every file"""
+        status = 0
+        for result in self.scanner.results(self.packages):
+            status = max(status, _report(result, verbosity, level))
+            if isinstance(result, Exception):
+                continue
+            for mod_file, findings, _ in result.files:
+                path = os.path.abspath(mod_file)
+                lines = _file_lines(path, findings)
+                self.files[path] = _Entry(result.name, findings, lines)
+                self.stamps[path] = _stamp(path)
+                self._track_dir(os.path.dirname(path))
+        # Directories given as paths are watched even when empty
+        for package in self.packages:
+            if os.path.isdir(package):
+                self._track_dir(os.path.abspath(package))
+        return status
+
+    def _path_filter(self, directory: str):
+        """Path filter of the scanner rooted at the innermost scan root of the directory"""
+        path_filter = self.scanner.path_filter
+        if path_filter is None:
+            return None
+        roots = [root for root in self.roots if _within(directory, [root])]
+        return path_filter.rooted(max(roots, key=len, default=directory))
+
+    def _discover(self, directory: str) -> Set[str]:
+        """Python files and notebooks added to the directory and its new subdirectories"""
+        path_filter = self._path_filter(directory)
+        try:
+            listing = list_dir(directory, path_filter)
+        except OSError:
+            return set()
+        added = {os.path.join(directory, name) for name in listing.files}
+        for name in listing.packages:
+            subdirectory = os.path.join(directory, name)
+            if subdirectory not in self.dirs:
+                self._track_dir(subdirectory)
+                for mod_file in walk_files(subdirectory, path_filter):
+                    added.add(mod_file)
+                    self._track_dir(os.path.dirname(mod_file))
+        return added - set(self.stamps)
+
+    def poll(self) -> Set[str]:
+        """Paths of files which were modified, added or removed since the last poll"""
+        changed = set()
+        for path, stamp in self.stamps.items():
+            current = _stamp(path)
+            if current != stamp:
+                self.stamps[path] = current
+                changed.add(path)
+        for directory, stamp in list(self.dirs.items()):
+            current = _stamp(directory)
+            if current != stamp:
+                self.dirs[directory] = current
+                added = self._discover(directory)
+                self.stamps.update((path, _stamp(path)) for path in added)
+                changed.update(added)
+        for path in changed:
+            if self.stamps[path] is None:
+                del self.stamps[path]
+        return changed
+
+    def _scan(self, path: str) -> Tuple[Tuple[Finding, ...], Tuple[str, ...]]:
+        """Findings of the file and their source lines"""
+        if path.endswith(NOTEBOOK_SUFFIX):
+            findings = scan_notebook(
+                path, lambda data: self.scanner.detector.scan(data, filename=path)
+            )
+            return findings, _file_lines(path, findings)
+        data = _read_source(path)
+        findings = self.scanner.detector.scan(data, filename=path)
+        return findings, _lines(data, findings)
+
+    def rescan(self, paths: Iterable[str]) -> List[Change]:
+        """Scan changed files in the current process and compare with their previous findings"""
+        changes = []
+        for path in sorted(paths):
+            old = self.files.get(path)
+            name = old.name if old else Module.from_path(path).name
+            if not os.path.isfile(path):
+                new = _Entry(name, (), ())
+                self.files.pop(path, None)
+            else:
+                try:
+                    findings, lines = self._scan(path)
+                except (OSError, SyntaxError, ValueError, tokenize.TokenError) as exc:
+                    # Probably saved in the middle of editing, previous findings are kept
+                    logging.log(f"[{_file_name(name, path)}] {exc}", logging.CRITICAL)
+                    continue
+                new = _Entry(name, findings, lines)
+                self.files[path] = new
+            added, resolved = _diff(old or _Entry(name, (), ()), new)
+            if added or resolved:
+                changes.append(Change(name, path, added, resolved))
+        return changes
+
+    def wait(self) -> Set[str]:
+        """Block until some files change, then until the burst of saves settles"""
+        changed = set()
+        while not changed:
+            time.sleep(self.interval)
+            changed = self.poll()
+        while True:
+            time.sleep(self.debounce)
+            more = self.poll()
+            if not more:
+                return changed
+            changed |= more
+
+    def run(
+        self,
+        verbosity: int = 0,
+        level: int = logging.WARNING,
+        rounds: Optional[int] = None,
+    ):
+        """Report the initial scan, then differences after every change until interrupted"""
+        self.start(max(verbosity, 1), level)
+        logging.reporter.flush()
+        logging.log(f"Watching {len(self.files)} files for changes...", logging.INFO)
+        while rounds is None or rounds > 0:
+            for change in self.rescan(self.wait()):
+                report_change(change, level)
+            logging.reporter.flush()
+            if rounds is not None:
+                rounds -= 1
+
+
+def report_change(change: Change, level: int = logging.WARNING, reporter=None):
+    """Report findings which appeared or disappeared"""
+    reporter = reporter if reporter is not None else logging.reporter
+    name = _file_name(change.name, change.path)
+    reporter.write_many(
+        [f"[NEW]:[{name}] {_location(finding)}" for finding in change.new], level
+    )
+    reporter.write_many(
+        [f"[RESOLVED]:[{name}] {_location(finding)}" for finding in change.resolved],
+        logging.INFO,
+    )
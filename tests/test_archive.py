@@ -0,0 +1,155 @@
+"""
+Module with tests for noprint.archive
+"""
+import io
+import os
+import tarfile
+import threading
+import zipfile
+from unittest import mock
+
+import pytest
+
+from noprint.archive import Member, _sdist_root, members, read, split_archive
+from noprint.exceptions import ImportException
+from noprint.filters import PathFilter
+
+SOURCES = {
+    "pkg/__init__.py": b"",
+    "pkg/mod.py": b"print(1)\n",
+    "pkg/migrations/m.py": b"print(2)\n",
+    "pkg/data.txt": b"print(3)\n",
+    "pkg-1.0.dist-info/METADATA": b"",
+}
+
+
+def _zip(path):
+    with zipfile.ZipFile(path, "w") as zfile:
+        zfile.writestr("pkg/", b"")
+        for name, data in SOURCES.items():
+            zfile.writestr(name, data)
+    return str(path)
+
+
+def _tar(path):
+    with tarfile.open(path, "w:gz") as tfile:
+        for name, data in SOURCES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tfile.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "member, prefix, name",
+    [
+        ("pkg/__init__.py", "", "pkg"),
+        ("pkg/mod.py", "", "pkg.mod"),
+        ("__init__.py", "", "__init__"),
+        ("src/pkg/__init__.py", "src/", "pkg"),
+        ("src/pkg/mod.py", "src/", "pkg.mod"),
+    ],
+)
+def test_member(member, prefix, name):
+    """Testing Member - zipimport-style paths and module names"""
+    item = Member("dist/pkg.whl", member, 0, prefix=prefix)
+    assert item.path == f"dist/pkg.whl/{member}"
+    assert item.name == name
+
+
+@pytest.mark.parametrize(
+    "member, root",
+    [
+        ("s-1.0/setup.py", "s-1.0/"),
+        ("s-1.0/s/m.py", "s-1.0/"),
+        ("s-1.0/src/s/m.py", "s-1.0/src/"),
+        ("s-1.0/src.py", "s-1.0/"),
+        ("pkg/mod.py", ""),
+        ("setup.py", ""),
+    ],
+)
+def test__sdist_root(member, root):
+    """Testing _sdist_root - name-version/ directory and src/ layout aren't part of module names"""
+    assert _sdist_root(member) == root
+
+
+def test_members_sdist(tmp_path):
+    """Testing members - modules of sdists are named without their top-level directory"""
+    sdist = tmp_path / "s-1.0.tar.gz"
+    with tarfile.open(sdist, "w:gz") as tfile:
+        for name in ("s-1.0/setup.py", "s-1.0/src/s/m.py", "s-1.0/src/s/tests/t.py"):
+            info = tarfile.TarInfo(name)
+            tfile.addfile(info, io.BytesIO(b""))
+    path_filter = PathFilter(exclude=["s-1*", "src", "tests"])
+    found = list(members(str(sdist), path_filter=path_filter))
+    assert [item.name for item in found] == ["setup", "s.m"]
+
+
+def test_split_archive(tmp_path):
+    """Testing split_archive - whole archives and directories within zip archives"""
+    archive = _zip(tmp_path / "pkg.whl").replace(os.sep, "/")
+    tar = _tar(tmp_path / "pkg.tar.gz").replace(os.sep, "/")
+    assert split_archive(archive) == (archive, "")
+    assert split_archive(tar) == (tar, "")
+    assert split_archive(f"{archive}/pkg/migrations/") == (archive, "pkg/migrations/")
+    assert split_archive(f"{tar}/pkg") is None
+    assert split_archive(str(tmp_path / "missing.zip")) is None
+    assert split_archive(str(tmp_path)) is None
+
+
+@pytest.mark.parametrize("build", [_zip, _tar])
+def test_members(tmp_path, build):
+    """Testing members - python files are listed (zip) or streamed with their data (tar)"""
+    archive = build(tmp_path / ("pkg.whl" if build is _zip else "pkg.tar.gz"))
+    found = list(members(archive))
+    assert [item.member for item in found] == [
+        "pkg/__init__.py",
+        "pkg/mod.py",
+        "pkg/migrations/m.py",
+    ]
+    assert [item.size for item in found] == [0, 9, 9]
+    assert [item.data is None for item in found] == [build is _zip] * 3
+    assert [read(item) for item in found] == [b"", b"print(1)\n", b"print(2)\n"]
+
+    path_filter = PathFilter(exclude=["migrations"])
+    assert [item.name for item in members(archive, path_filter=path_filter)] == [
+        "pkg",
+        "pkg.mod",
+    ]
+
+
+def test_members_prefix(tmp_path):
+    """Testing members - only the directory of the zip archive is listed"""
+    archive = _zip(tmp_path / "pkg.zip")
+    found = list(members(archive, "pkg/migrations/"))
+    assert [(item.member, item.name) for item in found] == [
+        ("pkg/migrations/m.py", "m")
+    ]
+    # Directories above the listed one are not matched by the filter
+    path_filter = PathFilter(exclude=["pkg", "migrations"])
+    found = list(members(archive, "pkg/migrations/", path_filter))
+    assert [item.name for item in found] == ["m"]
+
+
+def test_members_invalid(tmp_path):
+    """Testing members - unreadable archives are reported as import errors"""
+    (tmp_path / "broken.whl").write_bytes(b"not a zip")
+    with pytest.raises(ImportException, match="Unable to read archive"):
+        list(members(str(tmp_path / "broken.whl")))
+
+
+def test_read(tmp_path):
+    """Testing read - zip archive is opened once for consecutive members and reopened once it changes"""
+    archive = _zip(tmp_path / "pkg.whl")
+    item = Member(archive, "pkg/mod.py", 9)
+    with mock.patch("noprint.archive._local", threading.local()), mock.patch(
+        "noprint.archive.zipfile.ZipFile", wraps=zipfile.ZipFile
+    ) as mock_zip:
+        assert read(item) == b"print(1)\n"
+        assert read(item._replace(member="pkg/__init__.py")) == b""
+        assert mock_zip.call_count == 1
+        with zipfile.ZipFile(archive, "a") as zfile:
+            zfile.writestr("pkg/new.py", b"print(4)\n" * 10)
+        opened = mock_zip.call_count
+        assert read(item._replace(member="pkg/new.py")) == b"print(4)\n" * 10
+        assert mock_zip.call_count == opened + 1
@@ -0,0 +1,77 @@
+"""
+Module with tests for noprint.bench
+"""
+import os
+import json
+
+from unittest import mock
+
+from noprint.bench import PACKAGE, Timing, _table, generate, main
+
+
+def test_generate(tmp_path):
+    """Testing generate - package tree shape, missing __init__.py and prints"""
+    stats = generate(str(tmp_path), depth=2, fanout=2, modules=1, lines=20, density=1)
+    assert stats.packages == 7
+    assert stats.files == 7 + 7  # Every package has its module and __init__.py
+    assert stats.prints > 0
+    assert os.path.isfile(tmp_path / PACKAGE / "sub_1" / "sub_0" / "mod_0.py")
+
+    stats = generate(
+        str(tmp_path / "other"), depth=1, fanout=2, modules=1, density=0, missing_init=1
+    )
+    assert stats.files == 3 + 1  # Only the top-level package has __init__.py
+    assert stats.prints == 0
+
+
+def test_main(tmp_path):
+    """Testing main - all phases are measured on the generated tree"""
+    report = tmp_path / "bench.json"
+    with mock.patch("noprint.bench.sys.stdout") as mock_stdout:
+        timings = main(
+            ["--depth", "1", "--lines", "10", "--workers", "1", "--json", str(report)]
+        )
+    assert [timing.phase for timing in timings] == [
+        "discovery",
+        "parsing",
+        "end-to-end",
+    ]
+    # 4 packages, each with 5 modules and __init__.py
+    assert {timing.files for timing in timings} == {4 * 6}
+    assert timings[2].pool is not None
+    assert timings[2].executor == "sequential"  # Single worker runs inline
+    assert "end-to-end" in mock_stdout.write.call_args[0][0]
+    with open(report, encoding="utf-8") as file:
+        assert [timing["phase"] for timing in json.load(file)] == [
+            "discovery",
+            "parsing",
+            "end-to-end",
+        ]
+
+
+def test__table():
+    """Testing _table - missing measurements are shown as dashes"""
+    table = _table(
+        [
+            Timing("parsing", 0, 0.5, 10),
+            Timing("end-to-end", 2, 1, 10, 2**20, 0.1, "process"),
+        ]
+    )
+    assert table.splitlines()[1].split() == [
+        "parsing",
+        "-",
+        "0.500",
+        "20",
+        "-",
+        "-",
+        "-",
+    ]
+    assert table.splitlines()[2].split() == [
+        "end-to-end",
+        "2",
+        "1.000",
+        "10",
+        "0.100",
+        "1.0",
+        "process",
+    ]
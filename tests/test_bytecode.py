@@ -0,0 +1,78 @@
+"""
+Module with tests for noprint.bytecode
+"""
+import os
+import py_compile
+from unittest import mock
+
+import pytest
+
+from noprint.bytecode import cached_code, uses_names
+
+MODES = [
+    py_compile.PycInvalidationMode.TIMESTAMP,
+    py_compile.PycInvalidationMode.CHECKED_HASH,
+    py_compile.PycInvalidationMode.UNCHECKED_HASH,
+]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_cached_code(tmp_path, mode):
+    """Testing cached_code - bytecode is used only while it matches the source"""
+    path = tmp_path / "mod.py"
+    path.write_text("x = 1\n")
+    assert cached_code(str(path)) is None  # No pyc yet
+    py_compile.compile(str(path), invalidation_mode=mode, doraise=True)
+    assert cached_code(str(path)).co_names == ("x",)
+
+    path.write_text("x = 22\n")
+    os.utime(path, (0, 0))
+    assert cached_code(str(path)) is None  # Stale, the source has changed
+
+
+def test_cached_code_invalid(tmp_path):
+    """Testing cached_code - corrupted bytecode is ignored"""
+    path = tmp_path / "mod.py"
+    path.write_text("x = 1\n")
+    pyc = py_compile.compile(str(path), doraise=True)
+    with open(pyc, "rb") as file:
+        data = file.read()
+    with open(pyc, "wb") as file:
+        file.write(data[:16] + b"\x00")
+    assert cached_code(str(path)) is None
+    with open(pyc, "wb") as file:
+        file.write(b"\x00" * 4 + data[4:])
+    assert cached_code(str(path)) is None
+    with open(pyc, "wb") as file:
+        file.write(data[:16] + b"N")  # Marshalled None
+    assert cached_code(str(path)) is None
+    with mock.patch(
+        "noprint.bytecode.cache_from_source", side_effect=NotImplementedError
+    ):
+        assert cached_code(str(path)) is None
+
+
+@pytest.mark.parametrize(
+    "source, used",
+    [
+        ("x = 1", False),
+        ("'print'\n# print", False),
+        ("print(1)", True),
+        ("obj.print()", True),
+        ("def f():\n    def g():\n        return print\n    return g", True),
+        ("def f():\n    print = 1\n    return print", True),
+        ("def f():\n    def g():\n        return print\n    print = g", True),
+        ("lambda: [print for _ in ()]", True),
+        ("def f(a: print): pass", True),
+        ("from __future__ import annotations\nx: 'int' = 'print'", True),
+        (
+            "from __future__ import annotations\nclass A:\n    def f(self, a: print): pass",
+            True,
+        ),
+        ("from __future__ import annotations\ndef f() -> print: pass", True),
+        ("from __future__ import annotations\nx: int = 1", False),
+    ],
+)
+def test_uses_names(source, used):
+    """Testing uses_names - names of nested code objects and postponed annotations are checked"""
+    assert uses_names(compile(source, "<test>", "exec"), ["print"]) is used
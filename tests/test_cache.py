@@ -0,0 +1,85 @@
+"""
+Module with tests for noprint.cache
+"""
+import os
+import json
+
+from unittest import mock
+
+import pytest
+
+from noprint.cache import ResultCache, digest
+from noprint.detect import Finding
+
+
+def test_cache_roundtrip(tmp_path):
+    """Testing ResultCache store, save and lookups"""
+    source = tmp_path / "mod.py"
+    source.write_bytes(b"print(1)\n")
+    stat = os.stat(source)
+
+    cache = ResultCache(str(tmp_path / "cache")).load()
+    assert cache.lookup(str(source), stat) is None
+    findings = (Finding(1, 0, "print"),)
+    cache.store(
+        str(source), (stat.st_size, stat.st_mtime_ns, digest(b"print(1)\n")), findings
+    )
+    cache.save()
+
+    cache = ResultCache(str(tmp_path / "cache")).load()
+    assert cache.lookup(str(source), stat) == findings
+    assert cache.lookup_digest(str(source), b"print(1)\n") == findings
+    assert cache.lookup_digest(str(source), b"i = 1\n") is None
+
+    other = ResultCache(str(tmp_path / "cache"), signature="other").load()
+    assert other.entries == {}
+
+
+def test_cache_save_evicts_and_merges(tmp_path):
+    """Testing ResultCache.save - merging with concurrent writers, evicting removed files"""
+    kept, removed, foreign = (tmp_path / name for name in ("a.py", "b.py", "c.py"))
+    for path in (kept, removed, foreign):
+        path.write_bytes(b"")
+
+    first = ResultCache(str(tmp_path)).load()
+    second = ResultCache(str(tmp_path)).load()
+    first.store(str(kept), (0, 0, ""), ())
+    first.store(str(removed), (0, 0, ""), ())
+    first.save()
+    removed.unlink()
+    second.store(str(foreign), (0, 0, ""), ())
+    second.save()
+
+    with open(second.path, "r", encoding="utf-8") as file:
+        assert set(json.load(file)["files"]) == {str(kept), str(foreign)}
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_cache_refresh(tmp_path):
+    """Testing ResultCache.refresh - entries are reloaded only once another writer replaced the file"""
+    reader = ResultCache(str(tmp_path)).load()
+    with mock.patch.object(reader, "_read") as mock_read:
+        assert reader.refresh() is reader
+        mock_read.assert_not_called()
+
+    (tmp_path / "mod.py").write_bytes(b"")
+    writer = ResultCache(str(tmp_path)).load()
+    writer.store(str(tmp_path / "mod.py"), (0, 0, ""), ())
+    writer.save()
+    assert reader.refresh().entries == {str(tmp_path / "mod.py"): [0, 0, "", []]}
+
+
+def test_cache_corrupted(tmp_path):
+    """Testing ResultCache - unreadable and unwritable caches"""
+    cache = ResultCache(str(tmp_path))
+    with open(cache.path, "w", encoding="utf-8") as file:
+        file.write("{not json")
+    assert cache.load().entries == {}
+
+    cache.save()  # Nothing to save
+    cache.store(str(tmp_path / "x.py"), (0, 0, ""), ())
+    with mock.patch(
+        "noprint.cache.json.dump", side_effect=ValueError("dump")
+    ), pytest.raises(ValueError):
+        cache.save()
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
@@ -1,18 +1,44 @@
 """
 Module with unit tests for noprint.cli
 """
+import sys
+import subprocess
 from unittest import mock
 
 import pytest
 
 import noprint.cli
 
+# Modules which should never be imported by --version or by a sequential scan of a single file
+HEAVY_MODULES = (
+    "multiprocessing",
+    "concurrent.futures.process",
+    "concurrent.futures.thread",
+    "pathlib",
+    "pkgutil",
+    "subprocess",
+    "hashlib",
+    "tempfile",
+    "json",
+    "noprint.output",
+    "noprint.watch",
+    "noprint.cache",
+    "noprint.vcs",
+    "noprint.filters",
+    "noprint.bytecode",
+    "noprint.archive",
+    "noprint.notebook",
+    "tarfile",
+    "tomllib",
+    "tomli",
+)
+
 
 @pytest.mark.parametrize("detected", [0, 1, 2])
 @pytest.mark.parametrize("as_error", [0, 1])
 @pytest.mark.parametrize("verbosity", [0, 1, 2])
-@mock.patch("noprint.cli.detect_prints")
-@mock.patch("noprint.cli.logging")
+@mock.patch("noprint.sprint.detect_prints")
+@mock.patch("noprint.logger.log")
 def test_cli(
     mock_log, mock_detect, verbosity, as_error, detected
 ):  # pylint: disable=unused-argument
@@ -32,3 +58,217 @@ def test_cli(
         assert syse.value.code == 2
     else:
         assert bool(syse.value.code) is bool(as_error and detected)
+
+
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.logger.log")
+def test_cli_changed_since(mock_log, mock_detect):  # pylint: disable=unused-argument
+    """Function for testing cli method - packages are optional with --changed-since"""
+    with mock.patch("sys.argv", ["noprint"]), pytest.raises(SystemExit) as syse:
+        noprint.cli.cli()
+    assert syse.value.code == 2
+    mock_detect.assert_not_called()
+
+    args = ["noprint", "--changed-since", "main"]
+    with mock.patch("sys.argv", args), pytest.raises(SystemExit) as syse:
+        noprint.cli.cli()
+    assert syse.value.code == 0
+    mock_detect.assert_called_once()
+
+
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.watch.Watcher")
+@mock.patch("noprint.logger.log")
+def test_cli_watch(
+    mock_log, mock_watcher, mock_detect, tmp_path
+):  # pylint: disable=unused-argument
+    """Function for testing cli method - watch mode runs until interrupted"""
+    mock_watcher.return_value.run.side_effect = KeyboardInterrupt
+    for option in (["-f"], ["--format", "json"]):  # Not supported in watch mode
+        with mock.patch(
+            "sys.argv", ["noprint", "--watch"] + option + ["noprint"]
+        ), pytest.raises(SystemExit) as syse:
+            noprint.cli.cli()
+        assert syse.value.code == 2
+    mock_watcher.assert_not_called()
+
+    with mock.patch("sys.argv", ["noprint", "--watch", "noprint"]), pytest.raises(
+        SystemExit
+    ) as syse:
+        noprint.cli.cli()
+    assert syse.value.code == 0
+    assert mock_watcher.call_args[1] == {"interval": 0.5}
+    mock_detect.assert_not_called()
+
+    (tmp_path / "lib.zip").write_bytes(b"")
+    with mock.patch(
+        "sys.argv", ["noprint", "--watch", str(tmp_path / "lib.zip")]
+    ), pytest.raises(SystemExit) as syse:
+        noprint.cli.cli()
+    assert syse.value.code == 2
+
+
+@pytest.mark.parametrize("fmt", ["text", "json", "jsonl", "sarif"])
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.logger.log")
+def test_cli_format(mock_log, mock_detect, fmt):  # pylint: disable=unused-argument
+    """Function for testing cli method - results are streamed in selected format"""
+    with mock.patch("sys.argv", ["noprint", "--format", fmt, "noprint"]), pytest.raises(
+        SystemExit
+    ):
+        noprint.cli.cli()
+    output = mock_detect.call_args[1]["output"]
+    assert output is None if fmt == "text" else output.format
+
+
+@pytest.mark.parametrize("kind", ["auto", "sequential", "thread", "process"])
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.logger.log")
+def test_cli_executor(mock_log, mock_detect, kind):  # pylint: disable=unused-argument
+    """Function for testing cli method - jobs are run by selected executor"""
+    with mock.patch(
+        "sys.argv", ["noprint", "--executor", kind, "noprint"]
+    ), pytest.raises(SystemExit):
+        noprint.cli.cli()
+    assert mock_detect.call_args[0][0].executor_kind == kind
+
+
+@pytest.mark.parametrize("bytecode", [False, True])
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.logger.log")
+def test_cli_bytecode(
+    mock_log, mock_detect, bytecode
+):  # pylint: disable=unused-argument
+    """Function for testing cli method - bytecode of __pycache__ is checked only when asked for"""
+    args = ["noprint", "noprint"] + (["--bytecode"] if bytecode else [])
+    with mock.patch("sys.argv", args), pytest.raises(SystemExit):
+        noprint.cli.cli()
+    detector = mock_detect.call_args[0][0].detector
+    assert (detector.bytecode_names is not None) is bytecode
+
+
+@pytest.mark.parametrize("size, code", [("4096", 0), ("0", 2)])
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.logger.log")
+def test_cli_chunk_size(
+    mock_log, mock_detect, size, code
+):  # pylint: disable=unused-argument
+    """Function for testing cli method - size of jobs is tunable"""
+    with mock.patch(
+        "sys.argv", ["noprint", "--chunk-size", size, "noprint"]
+    ), pytest.raises(SystemExit) as syse:
+        noprint.cli.cli()
+    assert syse.value.code == code
+    if not code:
+        assert mock_detect.call_args[0][0].chunk_size == 4096
+
+
+@pytest.mark.parametrize(
+    "config, code",
+    [
+        ("", 0),
+        ("[tool.noprint]\nexclude = ['migrations']\ninclude = ['pkg']\n", 0),
+        ("[tool.noprint]\nexclude = 'migrations\n", 2),
+    ],
+)
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.logger.log")
+def test_cli_patterns(
+    mock_log, mock_detect, tmp_path, config, code
+):  # pylint: disable=unused-argument
+    """Function for testing cli method - patterns of pyproject.toml are extended by arguments"""
+    (tmp_path / "pyproject.toml").write_text(config)
+    with mock.patch(
+        "sys.argv", ["noprint", "--exclude", "*_pb2", "--exclude=vendor", "noprint"]
+    ), mock.patch("os.getcwd", return_value=str(tmp_path)), pytest.raises(
+        SystemExit
+    ) as syse:
+        noprint.cli.cli()
+    assert syse.value.code == code
+    if code:
+        return
+    path_filter = mock_detect.call_args[0][0].path_filter
+    if config:
+        assert path_filter.exclude == ("migrations", "*_pb2", "vendor")
+        assert path_filter.include == ("pkg",)
+    else:
+        assert path_filter.exclude == ("*_pb2", "vendor")
+    with mock.patch("sys.argv", ["noprint", "noprint"]), mock.patch(
+        "noprint.config.find_pyproject", return_value=None
+    ), pytest.raises(SystemExit):
+        noprint.cli.cli()
+    assert mock_detect.call_args[0][0].path_filter is None
+
+
+@mock.patch("noprint.sprint.detect_prints", return_value=0)
+@mock.patch("noprint.logger.log")
+def test_cli_stats(mock_log, mock_detect, tmp_path):  # pylint: disable=unused-argument
+    """Function for testing cli method - statistics are shown and stored"""
+    args = [
+        "noprint",
+        "--stats",
+        "--stats-json",
+        str(tmp_path / "stats.json"),
+        "--profile",
+        str(tmp_path / "profile"),
+        "noprint",
+    ]
+    with mock.patch("sys.argv", args), mock.patch(
+        "noprint.cli.sys.stderr"
+    ) as mock_stderr, pytest.raises(SystemExit):
+        noprint.cli.cli()
+    scanner = mock_detect.call_args[0][0]
+    assert scanner.profile is True
+    assert "wall time" in mock_stderr.write.call_args[0][0]
+    assert (tmp_path / "stats.json").exists()
+
+
+def _import_times(*args) -> dict:
+    """Self import times (microseconds) of modules imported by running the CLI, besides interpreter startup"""
+
+    def run(code, *argv):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code, *argv],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            check=False,
+            universal_newlines=True,
+        ).stderr
+        times = {}
+        for line in stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                self_time, _, name = line[len("import time:") :].split("|")
+                if self_time.strip().isdigit():
+                    times[name.strip()] = int(self_time)
+        return times
+
+    startup = run("pass")
+    times = run("from noprint.cli import cli; cli()", *args)
+    return {name: time for name, time in times.items() if name not in startup}
+
+
+@pytest.mark.parametrize(
+    "args, budget, heavy",
+    [
+        (["--version"], 100_000, HEAVY_MODULES + ("noprint.sprint", "logging", "ast")),
+        (["-m", "4", "{path}"], 250_000, HEAVY_MODULES),
+    ],
+)
+def test_cli_import_time(tmp_path, args, budget, heavy):
+    """Function for testing cli method - only modules needed for the task are imported, within time budget"""
+    (tmp_path / "mod.py").write_text("i = 1\n")
+    times = _import_times(*[arg.format(path=tmp_path / "mod.py") for arg in args])
+    assert "noprint.cli" in times
+    assert not [name for name in heavy if name in times]
+    assert sum(times.values()) < budget
+
+
+def test_cli_choices():
+    """Function for testing cli method - choices of options match the registries they select from"""
+    from noprint.detect import ENGINES  # pylint: disable=import-outside-toplevel
+    from noprint.output import FORMATS  # pylint: disable=import-outside-toplevel
+    from noprint.executors import EXECUTORS  # pylint: disable=import-outside-toplevel
+
+    assert noprint.ENGINE_NAMES == tuple(ENGINES)
+    assert noprint.FORMAT_NAMES == tuple(FORMATS)
+    assert noprint.EXECUTOR_NAMES == tuple(EXECUTORS)
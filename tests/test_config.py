@@ -0,0 +1,67 @@
+"""
+Module with tests for noprint.config
+"""
+import sys
+import types
+from unittest import mock
+
+import pytest
+
+from noprint.config import _toml, find_pyproject, load_config
+from noprint.exceptions import ConfigException
+
+
+def test_find_pyproject(tmp_path):
+    """Testing find_pyproject - closest file in the directory or its parents"""
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "pyproject.toml").write_text("")
+    assert find_pyproject(str(tmp_path / "sub" / "deep")) == str(
+        tmp_path / "pyproject.toml"
+    )
+    (tmp_path / "sub" / "pyproject.toml").write_text("")
+    with mock.patch("os.getcwd", return_value=str(tmp_path / "sub" / "deep")):
+        assert find_pyproject() == str(tmp_path / "sub" / "pyproject.toml")
+    with mock.patch("noprint.config.os.path.isfile", return_value=False):
+        assert find_pyproject(str(tmp_path)) is None
+
+
+def test__toml():
+    """Testing _toml - tomli is used where tomllib isn't available"""
+    tomli = types.ModuleType("tomli")
+    with mock.patch.dict(sys.modules, {"tomllib": None, "tomli": tomli}):
+        assert _toml() is tomli
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("[project]\nname = 'x'\n", {}),
+        ("[tool.noprint]\n", {}),
+        (
+            "[tool.noprint]\nexclude = ['migrations', '*_pb2.py']\ninclude = 'src/*'\n",
+            {"exclude": ["migrations", "*_pb2.py"], "include": ["src/*"]},
+        ),
+    ],
+)
+def test_load_config(tmp_path, content, expected):
+    """Testing load_config"""
+    path = tmp_path / "pyproject.toml"
+    path.write_text(content)
+    assert load_config(str(path)) == expected
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ("[tool.noprint]\nexclude = [", "Unable to read"),
+        ("[tool.noprint]\nexcluded = []\n", "Unknown option [excluded]"),
+        ("[tool.noprint]\nexclude = [1]\n", "must be a list of patterns"),
+        ("[tool.noprint]\ninclude = true\n", "must be a list of patterns"),
+    ],
+)
+def test_load_config_invalid(tmp_path, content, message):
+    """Testing load_config - invalid sections are reported"""
+    path = tmp_path / "pyproject.toml"
+    path.write_text(content)
+    with pytest.raises(ConfigException, match=message.replace("[", r"\[")):
+        load_config(str(path))
@@ -0,0 +1,195 @@
+"""
+Module with tests for noprint.detect
+"""
+import ast
+
+from unittest import mock
+
+import pytest
+
+from noprint.detect import (
+    Detector,
+    Engine,
+    Finding,
+    NameRule,
+    PrintRule,
+    Rule,
+    TokenDetector,
+)
+
+
+class CallRule(Rule):
+    """Rule matching all calls - helper for testing rules sharing the traversal"""
+
+    name = "call"
+    node_types = (ast.Call,)
+
+    def check(self, node):
+        return True
+
+
+class ExecRule(NameRule):
+    """Rule matching exec usage"""
+
+    name = "exec"
+    names = ("exec",)
+
+
+CODE = b"""
+import os
+
+
+def func(print_me=print):
+    x = [print, os.sep, {'a': print}]
+    return print(x, end="") or exec("")
+
+
+print_me = lambda: None
+obj.print("")
+"""
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        (b"", False),
+        (b"i = 1\n", False),
+        (b"'''print'''\n", True),
+        (b"# \xc5\xbc\ni = 1\n", True),
+        ("ｐrint(1)\n".encode("utf-8"), True),
+    ],
+)
+def test_detector_may_match(code, expected):
+    """Testing Detector.may_match - sources without print are cleared without parsing"""
+    detector = Detector([PrintRule()])
+    assert detector.may_match(code) is expected
+    with mock.patch("noprint.detect.ast.parse") as mock_parse:
+        findings = detector.scan(code)
+        assert mock_parse.called is expected
+    if not expected:
+        assert not findings
+    assert Detector([PrintRule()], prefilter=False).may_match(code)
+    assert Detector([PrintRule(), CallRule()]).may_match(code)
+
+
+def test_detector_walk():
+    """Testing Detector.walk - findings are the same as with ast.walk, sorted by position"""
+    tree = ast.parse(CODE)
+    expected = sorted(
+        (node.lineno, node.col_offset)
+        for node in ast.walk(tree)
+        if node.__dict__.get("id") == "print"
+    )
+    findings = Detector([PrintRule()]).walk(tree)
+    assert [(finding.line, finding.col) for finding in findings] == expected
+    assert {finding.rule for finding in findings} == {"print"}
+    assert Detector([PrintRule()]).walk(tree, first=True) == (Finding(5, 18, "print"),)
+
+
+def test_detector_rules():
+    """Testing Detector - multiple rules within single traversal"""
+    detector = Detector([PrintRule(), ExecRule(), CallRule()])
+    findings = detector.scan(CODE)
+    assert [finding for finding in findings if finding.rule == "exec"] == [
+        Finding(7, 31, "exec")
+    ]
+    assert len([finding for finding in findings if finding.rule == "call"]) == 3
+    assert detector.signature == "call,exec,print"
+    assert detector.prefilter is None
+    with pytest.raises(TypeError):
+        Rule()  # pylint: disable=abstract-class-instantiated
+    with pytest.raises(TypeError):
+        Engine([PrintRule()])  # pylint: disable=abstract-class-instantiated
+
+
+@pytest.mark.parametrize(
+    "code, encoding",
+    [
+        ("# -*- coding: latin-1 -*-\nname = 'Señor'\nprint(name)\n", "latin-1"),
+        (
+            "#!/usr/bin/python\n# vim: set fileencoding=cp1250 :\nprint('Źle')\n",
+            "cp1250",
+        ),
+        ("\ufeff\n\nprint('Gżegżółka')\n", "utf-8"),
+    ],
+)
+def test_detector_encoding(code, encoding):
+    """Testing Detector.scan - source is decoded by the parser, by BOM or coding cookie"""
+    data = code.encode(encoding)
+    assert Detector([PrintRule()]).scan(data) == (Finding(3, 0, "print"),)
+    assert TokenDetector([PrintRule()]).scan(data) == (Finding(3, 0, "print"),)
+
+
+def test_detector_bytecode():
+    """Testing Detector - bytecode is checked only when asked for and all rules match names"""
+    assert Detector([PrintRule()]).bytecode_names is None
+    assert Detector([PrintRule(), ExecRule()], bytecode=True).bytecode_names == {
+        "print",
+        "exec",
+    }
+    assert Detector([PrintRule(), CallRule()], bytecode=True).bytecode_names is None
+    assert TokenDetector([PrintRule()], bytecode=True).bytecode_names == {"print"}
+
+
+def test_detector_leaf_rules():
+    """Testing Detector - rules checking nodes which are skipped by default"""
+
+    class ConstantRule(Rule):
+        """Rule matching constants"""
+
+        name = "constant"
+        node_types = (ast.Constant,)
+
+        def check(self, node):
+            return node.value == "print"
+
+    assert Detector([ConstantRule()]).scan(b"x = 'print'\n") == (
+        Finding(1, 4, "constant"),
+    )
+    assert ast.Constant in Detector([PrintRule()]).leaves
+
+
+TRICKY = b"""
+import print
+from print import print as print
+global print
+def print(print, a=print, *print, b: print = 1): pass
+class print(print=1, metaclass=print): pass
+lambda print, c=print: print
+f(print=1, a=print)
+x.print(print)
+with a as print: pass
+try: pass
+except E as print: pass
+for print in print: pass
+del print
+(print := 1)
+{print: 1}
+@print
+def g(): pass
+def h(a=f(b, print)): pass
+if x: import print
+yield from print
+\xef\xbd\x90rint(1)
+async def k(print): pass
+x = 1; global print
+"""
+
+
+@pytest.mark.parametrize("code", [CODE, TRICKY])
+def test_token_detector(code):
+    """Testing TokenDetector - same findings as syntax tree detection"""
+    detector = TokenDetector([PrintRule()])
+    findings = Detector([PrintRule()]).scan(code)
+    assert detector.scan(code) == findings
+    assert detector.scan(code, first=True) == findings[:1]
+    assert detector.signature == "tokens:print"
+    assert not hasattr(detector, "walk")
+
+
+def test_token_detector_rules():
+    """Testing TokenDetector - only name rules are supported"""
+    assert TokenDetector([ExecRule()]).scan(b"exec('')\n") == (Finding(1, 0, "exec"),)
+    assert not TokenDetector([ExecRule()]).scan(b"i = 1\n")
+    with pytest.raises(ValueError):
+        TokenDetector([PrintRule(), CallRule()])
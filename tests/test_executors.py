@@ -0,0 +1,53 @@
+"""
+Module with tests for noprint.executors
+"""
+import sys
+
+from unittest import mock
+
+import pytest
+
+from noprint.executors import InlineExecutor, _gil_enabled, auto_executor
+
+
+def test_inline_executor():
+    """Testing InlineExecutor - jobs run in order, only when asked to"""
+    executor = InlineExecutor(4)
+    calls = []
+    first = executor.submit(calls.append, 1)
+    cancelled = executor.submit(calls.append, 2)
+    failing = executor.submit(int, "x")
+    assert not calls and not first.done()
+
+    assert cancelled.cancel()
+    assert executor.run_next() and calls == [1] and first.done()
+    assert executor.run_next()  # Cancelled job is skipped
+    assert isinstance(failing.exception(), ValueError)
+    assert not executor.run_next()
+
+    pending = executor.submit(calls.append, 3)
+    executor.shutdown()
+    assert pending.cancelled() and calls == [1]
+
+
+@pytest.mark.parametrize(
+    "workers, files, size, gil, expected",
+    [
+        (1, 10**4, 2**30, True, "sequential"),
+        (4, 10, 2**30, True, "sequential"),
+        (4, 10**4, 2**10, True, "sequential"),
+        (4, 10**4, 2**30, True, "process"),
+        (4, 10**4, 2**30, False, "thread"),
+    ],
+)
+def test_auto_executor(workers, files, size, gil, expected):
+    """Testing auto_executor - worker processes only for large scans, threads without GIL"""
+    with mock.patch("noprint.executors._gil_enabled", return_value=gil):
+        assert auto_executor(workers, files, size) == expected
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test__gil_enabled(enabled):
+    """Testing _gil_enabled - free-threaded builds tell whether the GIL is on"""
+    with mock.patch.object(sys, "_is_gil_enabled", create=True, return_value=enabled):
+        assert _gil_enabled() is enabled
@@ -0,0 +1,101 @@
+"""
+Module with tests for noprint.filters
+"""
+import os
+import re
+
+import pytest
+
+from noprint.filters import PathFilter, _pattern_path, _translate
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("migrations", "migrations"),
+        ("pkg.migrations", "pkg/migrations"),
+        ("*_pb2.py", "*_pb2.py"),
+        ("*.ipynb", "*.ipynb"),
+        ("tests/data/", "tests/data"),
+        (os.path.join("a.b", "c"), "a.b/c"),
+    ],
+)
+def test__pattern_path(pattern, expected):
+    """Testing _pattern_path - dotted names become paths, file globs are kept"""
+    assert _pattern_path(pattern) == expected
+
+
+@pytest.mark.parametrize(
+    "path, is_dir, accepted",
+    [
+        ("src/pkg/migrations", True, False),
+        ("src/pkg/migrations.py", False, False),
+        ("src/pkg/old_migrations", True, True),
+        ("src/migrations/pkg", True, True),  # Parent directories are pruned by listing
+        ("gen/api_pb2.py", False, False),
+        ("src/pkg/vendor", True, False),
+        ("src/other/vendor", True, True),
+        ("src/pkg/tests/test_a.py", False, True),
+        ("src/pkg/tests/demo.ipynb", False, True),
+        ("src/pkg/migrations.ipynb", False, False),
+        ("src/pkg/core.py", False, False),  # Not included
+        # Directories are descended regardless of include
+        ("src/pkg/tests", True, True),
+    ],
+)
+def test_path_filter(path, is_dir, accepted):
+    """Testing PathFilter - globs and dotted names match trailing components of paths"""
+    path_filter = PathFilter(
+        include=["tests/*", "*_pb2", "pkg.migrations"],
+        exclude=["migrations", "*_pb2.py", "pkg.vendor"],
+    )
+    path = path.replace("/", os.sep)
+    check = path_filter.accepts_dir if is_dir else path_filter.accepts_file
+    assert check(path) is accepted
+
+
+@pytest.mark.parametrize(
+    "pattern, path, matched",
+    [
+        ("bui*", "build", True),
+        ("bui*", "build/repo/pkg", False),
+        ("*_pb2.py", "gen/api_pb2.py", False),
+        ("a?c", "a/c", False),
+        ("a?c", "abc", True),
+        ("a[!x]c", "a/c", False),
+        ("a[!x]c", "abc", True),
+        ("a[]]c", "a]c", True),
+        ("a[^]c", "a^c", True),
+        ("a[\\]c", "a\\c", True),
+        ("a[b", "a[b", True),
+        ("a.b+", "a.b+", True),
+    ],
+)
+def test__translate(pattern, path, matched):
+    """Testing _translate - wildcards never cross path separators"""
+    assert bool(re.fullmatch(_translate(pattern), path)) is matched
+
+
+@pytest.mark.parametrize("root", ["build", os.path.join("build", "repo")])
+def test_path_filter_rooted(root):
+    """Testing PathFilter.rooted - directories above the root never match"""
+    path_filter = PathFilter(exclude=["build", "bui*", "repo.pkg"]).rooted(root)
+    assert path_filter.root == root
+    assert path_filter.accepts_file(os.path.join("build", "repo", "mod.py"))
+    assert path_filter.accepts_dir(os.path.join("build", "repo", "sub"))
+    assert not path_filter.accepts_dir(os.path.join("build", "repo", "build"))
+    assert path_filter.accepts_file(os.path.join("other", "mod.py"))
+    assert path_filter.accepts_dir(os.path.join("build", "repo", "pkg")) is (
+        root != "build"
+    )
+    assert PathFilter(exclude=["bui*"]).accepts_file(os.path.join("build", "mod.py"))
+
+
+def test_path_filter_empty():
+    """Testing PathFilter - no patterns accept everything"""
+    path_filter = PathFilter()
+    assert not path_filter
+    assert PathFilter(exclude=["x"])
+    assert path_filter.accepts_dir("migrations")
+    assert path_filter.accepts_file("migrations.py")
+    assert PathFilter(include=["pkg"]).accepts_file("src/pkg.py")
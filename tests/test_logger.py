@@ -1,6 +1,7 @@
 """
 Module with tests for noprint.logger
 """
+import io
 import logging
 
 from unittest import mock
@@ -28,3 +29,52 @@ def test_log(mock_c, mock_e, mock_w, mock_i, lvl):
         mock_w.assert_called_once()
     elif lvl == logging.INFO:
         mock_i.assert_called_once()
+
+
+def test_reporter():
+    """Testing Reporter - levels are filtered, lines are buffered until flushed"""
+    reporter = noprint.logger.Reporter(
+        io.StringIO(), level=logging.WARNING, color=False, flush_interval=60
+    )
+    assert not reporter.enabled(logging.INFO)
+    reporter.write("clear", logging.INFO)
+    reporter.write_many(["[a] Line: 1", "[a] Line: 2"], logging.ERROR)
+    assert reporter.stream.getvalue() == ""
+    reporter.flush()
+    assert reporter.stream.getvalue() == "[ERROR]:[a] Line: 1\n[ERROR]:[a] Line: 2\n"
+
+
+def test_reporter_full_buffer():
+    """Testing Reporter - full buffer is written right away"""
+    stream = io.StringIO()
+    reporter = noprint.logger.Reporter(stream, buffer_size=10, flush_interval=60)
+    assert reporter.color is False  # Not a terminal
+    reporter.write("short", logging.INFO)
+    assert stream.getvalue() == ""
+    reporter.write("long enough", logging.INFO)
+    assert stream.getvalue() == "short\nlong enough\n"
+
+
+@pytest.mark.parametrize("isatty", [False, True])
+def test_reporter_color(isatty):
+    """Testing Reporter - colors are used only on terminals"""
+    stream = io.StringIO()
+    stream.isatty = lambda: isatty
+    reporter = noprint.logger.Reporter(stream)
+    reporter.write_many(["found"], logging.WARNING)
+    reporter.write("clear", logging.INFO)
+    reporter.flush()
+    if isatty:
+        assert stream.getvalue() == (
+            "\033[1;33m[WARNING]\033[1;0m:found\n\033[1;32mclear\033[1;0m\n"
+        )
+    else:
+        assert stream.getvalue() == "[WARNING]:found\nclear\n"
+
+
+def test_isatty():
+    """Testing isatty - closed streams and streams without isatty aren't terminals"""
+    closed = io.StringIO()
+    closed.close()
+    assert noprint.logger.isatty(closed) is False
+    assert noprint.logger.isatty(object()) is False
@@ -8,6 +8,7 @@ from importlib.machinery import ModuleSpec
 import pytest
 
 from noprint.exceptions import ParentModuleNotFoundException
+from noprint.filters import PathFilter
 from noprint.module import (
     Module,
     _get_module_search_path,
@@ -15,6 +16,10 @@ from noprint.module import (
     _find_parent_dir,
     _next_path,
     _package_to_dir,
+    walk_files,
+    walk_sizes,
+    list_dir,
+    DirListing,
 )
 
 
@@ -111,14 +116,19 @@ def test_module_origin(mock_isfile, mock_isdir, mock_module, isdir, isfile):
     """Testing Module.origin"""
     mock_isdir.return_value = isdir
     mock_isfile.return_value = isfile
+    listing = DirListing((), (), isfile, isfile)
     module = mock_module()
+    with mock.patch("noprint.module.list_dir", return_value=listing) as mock_list_dir:
+        origin = module.origin
     if isfile is False:
-        assert module.origin == []
+        assert origin == []
     elif isdir is False:
-        assert module.origin == [str(Path("/root/test/subpackage.py"))]
+        assert origin == [str(Path("/root/test/subpackage.py"))]
+        mock_list_dir.assert_not_called()
     else:
-        assert "__init__.py" in [origin[-11:] for origin in module.origin]
-        assert "__main__.py" in [origin[-11:] for origin in module.origin]
+        assert "__init__.py" in [orig[-11:] for orig in origin]
+        assert "__main__.py" in [orig[-11:] for orig in origin]
+        mock_list_dir.assert_called_once_with(str(Path("/root/test/subpackage")), None)
 
 
 @pytest.mark.parametrize("isdir", [False, True])
@@ -131,6 +141,137 @@ def test_module_search_path(mock_isdir, mock_module, isdir):
         assert [module.search_path] == ["/root" if isdir else None]
 
 
+@pytest.mark.parametrize(
+    "path, name",
+    [
+        ("pkg/sub/mod.py", "pkg.sub.mod"),
+        ("pkg/sub/__init__.py", "pkg.sub"),
+        ("pkg/__main__.py", "pkg.__main__"),
+        ("pkg/nopkg/mod.py", "mod"),
+        ("script.py", "script"),
+        ("pkg/sub/demo.ipynb", "pkg.sub.demo"),
+    ],
+)
+def test_module_from_path(tmp_path, path, name):
+    """Testing Module.from_path"""
+    for directory in ("pkg", "pkg/sub"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "__init__.py").write_text("")
+    (tmp_path / "pkg/nopkg").mkdir()
+    (tmp_path / path).write_text("")
+
+    module = Module.from_path(str(tmp_path / path))
+    assert module.name == name
+    assert str(tmp_path / path) in module.origin
+    if name.startswith("pkg"):
+        assert module._parent_loc == str(tmp_path)  # pylint:disable=protected-access
+
+
+def test_list_dir(tmp_path):
+    """Testing list_dir"""
+    for directory in ("sub", "__pycache__", ".git"):
+        (tmp_path / directory).mkdir()
+    for path in ("__init__.py", "__main__.py", "data.txt", "pkg.py.d"):
+        (tmp_path / path).write_text("")
+    (tmp_path / "mod.py").write_text("i = 1\n")
+    (tmp_path / "nb.ipynb").write_text("{}")
+    listing = list_dir(str(tmp_path))
+    assert listing == DirListing(
+        ("sub",),
+        ("mod",),
+        True,
+        True,
+        {"__init__.py": 0, "__main__.py": 0, "mod.py": 6, "nb.ipynb": 2},
+        ("nb",),
+    )
+    assert listing.origin == ["__init__.py", "__main__.py"]
+    assert listing.files == ["__init__.py", "__main__.py", "mod.py", "nb.ipynb"]
+    assert (listing.size("mod.py"), listing.size("data.txt")) == (6, None)
+    assert DirListing((), (), False, False).size("mod.py") is None
+
+
+def test_list_dir_filter(tmp_path):
+    """Testing list_dir - excluded entries are skipped before their stats are read"""
+    for directory in ("sub", "migrations"):
+        (tmp_path / directory).mkdir()
+    for path in ("__init__.py", "mod.py", "api_pb2.py"):
+        (tmp_path / path).write_text("")
+    path_filter = PathFilter(exclude=["migrations", "*_pb2.py"])
+    listing = list_dir(str(tmp_path), path_filter)
+    assert listing.packages == ("sub",)
+    assert (listing.modules, listing.sizes) == (
+        ("mod",),
+        {"__init__.py": 0, "mod.py": 0},
+    )
+    assert sorted(walk_files(str(tmp_path), PathFilter(exclude=["mod"]))) == [
+        str(tmp_path / "__init__.py"),
+        str(tmp_path / "api_pb2.py"),
+    ]
+
+
+def test_module_child(tmp_path):
+    """Testing Module.child - submodules are resolved from the listing of parent directory"""
+    (tmp_path / "pkg/sub").mkdir(parents=True)
+    for path in (
+        "pkg/__init__.py",
+        "pkg/mod.py",
+        "pkg/nb.ipynb",
+        "pkg/sub/__main__.py",
+    ):
+        (tmp_path / path).write_text("")
+    with mock.patch("noprint.module._find_parent_dir", return_value=str(tmp_path)):
+        parent = Module("pkg")
+    parent.path_filter = PathFilter(exclude=["data"])
+    sub = Module.child(parent, "sub", package=True)
+    mod = Module.child(parent, "mod", package=False)
+    notebook = Module.child(parent, "nb", package=False, suffix=".ipynb")
+    with mock.patch("noprint.module.os.path.isdir") as mock_isdir, mock.patch(
+        "noprint.module.os.path.isfile"
+    ) as mock_isfile:
+        assert (sub.name, sub.in_package) == ("pkg.sub", True)
+        assert sub.origin == [str(tmp_path / "pkg/sub/__main__.py")]
+        assert sub.search_path == str(tmp_path / "pkg/sub")
+        assert mod.name == "pkg.mod"
+        assert mod.origin == [str(tmp_path / "pkg/mod.py")]
+        assert mod.search_path is None
+        assert mod.listing == DirListing((), (), False, False)
+        assert (notebook.name, notebook.origin, notebook.size) == (
+            "pkg.nb",
+            [str(tmp_path / "pkg/nb.ipynb")],
+            0,
+        )
+        assert (sub.size, mod.size) == (None, 0)  # Known from the listing of parent
+        assert sub.path_filter is parent.path_filter
+        mock_isdir.assert_not_called()
+        mock_isfile.assert_not_called()
+
+
+def test_walk_files(tmp_path):
+    """Testing walk_files"""
+    for directory in ("pkg/sub", "pkg/__pycache__", "pkg/.hidden"):
+        (tmp_path / directory).mkdir(parents=True)
+    for path in (
+        "pkg/a.py",
+        "pkg/sub/b.py",
+        "pkg/sub/b.ipynb",
+        "pkg/c.txt",
+        "pkg/__pycache__/d.py",
+        "pkg/.hidden/e.py",
+    ):
+        (tmp_path / path).write_text("")
+    assert sorted(walk_files(str(tmp_path))) == [
+        str(tmp_path / "pkg/a.py"),
+        str(tmp_path / "pkg/sub/b.ipynb"),
+        str(tmp_path / "pkg/sub/b.py"),
+    ]
+    (tmp_path / "pkg/a.py").write_text("i = 1\n")
+    assert sorted(walk_sizes(str(tmp_path))) == [
+        (str(tmp_path / "pkg/a.py"), 6),
+        (str(tmp_path / "pkg/sub/b.ipynb"), 0),
+        (str(tmp_path / "pkg/sub/b.py"), 0),
+    ]
+
+
 def test_module___eq__(mock_module):
     """Testing Module.__eq__"""
     module = mock_module()
@@ -0,0 +1,150 @@
+"""
+Module with tests for noprint.notebook
+"""
+import os
+import json
+import base64
+import hashlib
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+from noprint.detect import Detector, Finding, PrintRule
+from noprint.notebook import code_cells, python_source, scan_notebook
+
+CELLS = [
+    {"cell_type": "markdown", "metadata": {}, "source": ["print('markdown')\n"]},
+    {
+        "cell_type": "code",
+        "execution_count": 1,
+        "id": "a1",
+        "metadata": {"tags": ["a]}"]},
+        "outputs": [
+            {
+                "data": {"text/plain": ['"quoted \\\\" [1]']},
+                "metadata": {},
+                "output_type": "execute_result",
+            }
+        ],
+        "source": ["import os\n", "print('\u00e9 \"x\"')\n"],
+    },
+    {"cell_type": "raw", "metadata": {}, "source": "print(0)"},
+    {
+        "cell_type": "code",
+        "execution_count": None,
+        "metadata": {},
+        "outputs": [],
+        "source": "%matplotlib inline\nfor x in [1]:\n    !ls\n    print(x)",
+    },
+    {
+        "cell_type": "code",
+        "execution_count": 2,
+        "metadata": {},
+        "outputs": [],
+        "source": "%%bash\necho print",
+    },
+]
+
+
+def _notebook(path, cells, indent=1):
+    """Write the notebook the way nbformat does - sorted keys, cells first"""
+    content = {
+        "cells": cells,
+        "metadata": {"kernelspec": {"name": "python3"}},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+    path.write_text(json.dumps(content, indent=indent, sort_keys=True) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk", [3, 2**16])
+@pytest.mark.parametrize("indent", [None, 1])
+def test_code_cells(tmp_path, chunk, indent):
+    """Testing code_cells - code cells numbered over all cells, values split between chunks"""
+    path = _notebook(tmp_path / "nb.ipynb", CELLS, indent)
+    with mock.patch("noprint.notebook.CHUNK", chunk):
+        assert list(code_cells(path)) == [
+            (2, "import os\nprint('é \"x\"')\n"),
+            (4, "pass\nfor x in [1]:\n    pass\n    print(x)"),
+        ]
+
+
+def test_code_cells_streamed(tmp_path):
+    """Testing code_cells - large outputs are skipped without being held in memory"""
+    image = base64.b64encode(os.urandom(3 * 2**20)).decode()
+    cell = dict(CELLS[1], outputs=[{"data": {"image/png": image}, "metadata": {}}])
+    path = _notebook(tmp_path / "nb.ipynb", [cell, cell])
+    content = hashlib.blake2b(digest_size=16)
+
+    tracemalloc.start()
+    try:
+        assert [number for number, _ in code_cells(path, content)] == [1, 2]
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 2**20
+    with open(path, "rb") as file:
+        expected = hashlib.blake2b(file.read(), digest_size=16)
+    assert content.hexdigest() == expected.hexdigest()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "[]",
+        '{"cells": [{"cell_type": "code", "source": "print(1)"}',
+        '{"cells": [{"cell_type": "code", "source": "print(1)}]}',
+        '{"cells": [{"cell_type": 1, "source": "print(1)"}]}',
+        '{"cells": [{"cell_type": "code", "source": ["\\x"]}]}',
+        '{"nbformat": 4',
+        '{"metadata": {"a": [1',
+        '{"metadata": {\\}}',
+    ],
+)
+def test_code_cells_invalid(tmp_path, content):
+    """Testing code_cells - malformed notebooks"""
+    path = tmp_path / "nb.ipynb"
+    path.write_text(content)
+    with pytest.raises(ValueError, match="Invalid notebook"):
+        list(code_cells(str(path)))
+
+
+@pytest.mark.parametrize("content", ["{}", '{"cells": []}', '{"cells": [{}]}'])
+def test_code_cells_empty(tmp_path, content):
+    """Testing code_cells - notebooks without code cells"""
+    path = tmp_path / "nb.ipynb"
+    path.write_text(content)
+    assert not list(code_cells(str(path)))
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("print(1)", "print(1)"),
+        ("%time f()\nx = !ls\n  os.path?\n?os", "pass\npass\n  pass\npass"),
+        ("x = 5 % 2\ny = a != b\n# why?", "x = 5 % 2\ny = a != b\n# why?"),
+        ("\n%%timeit\nprint(1)", "\npass\nprint(1)"),
+        ("%%time\nfor i in x:\n    print(i)", "pass\nfor i in x:\n    print(i)"),
+        ("%%capture out\nprint(1)", "pass\nprint(1)"),
+        ("%%bash\necho print", None),
+        ("%%writefile a.py\nprint(1)", None),
+        ("%%\nprint(1)", None),
+    ],
+)
+def test_python_source(source, expected):
+    """Testing python_source - IPython syntax is masked line by line"""
+    assert python_source(source) == expected
+
+
+@pytest.mark.parametrize("first", [False, True])
+def test_scan_notebook(tmp_path, first):
+    """Testing scan_notebook - findings are tagged with cell numbers, first stops at the first cell"""
+    path = _notebook(tmp_path / "nb.ipynb", CELLS)
+    detector = Detector([PrintRule()])
+    findings = scan_notebook(path, detector.scan, first=first)
+    assert findings == (Finding(2, 0, "print", 2),) + (
+        () if first else (Finding(4, 4, "print", 4),)
+    )
@@ -0,0 +1,135 @@
+"""
+Module with tests for noprint.output
+"""
+import io
+import os
+import json
+from unittest import mock
+
+import pytest
+
+from noprint.detect import Finding
+from noprint.output import FORMATS, JsonLinesOutput, SarifOutput, _uri
+from noprint.sprint import FileResult, ModuleResult
+from noprint.exceptions import ImportException
+
+RESULTS = [
+    ModuleResult(
+        "pkg",
+        (
+            FileResult("pkg/__init__.py", (Finding(1, 4, "print"),)),
+            FileResult("pkg/__main__.py", ()),
+        ),
+        1,
+    ),
+    ImportException("Module [missing] is not present"),
+    ModuleResult("pkg.mod", (FileResult("pkg/mod.py", (Finding(2, 0, "print"),)),), 1),
+]
+
+
+def _write(output):
+    """Stream all results into the output, return written text"""
+    output.start()
+    statuses = [output.write(result) for result in RESULTS]
+    output.finish()
+    assert statuses == [1, 2, 1]
+    return output.stream.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+def test_json_outputs(fmt):
+    """Testing JSON outputs - one record per finding or error"""
+    text = _write(FORMATS[fmt](io.StringIO()))
+    records = (
+        json.loads(text)
+        if fmt == "json"
+        else [json.loads(line) for line in text.splitlines()]
+    )
+    assert records == [
+        {
+            "type": "finding",
+            "path": "pkg/__init__.py",
+            "module": "pkg.__init__",
+            "line": 1,
+            "col": 4,
+            "rule": "print",
+        },
+        {"type": "error", "message": "Module [missing] is not present"},
+        {
+            "type": "finding",
+            "path": "pkg/mod.py",
+            "module": "pkg.mod",
+            "line": 2,
+            "col": 0,
+            "rule": "print",
+        },
+    ]
+
+
+def test_json_outputs_empty():
+    """Testing JSON outputs - nothing found"""
+    output = FORMATS["json"](io.StringIO())
+    output.start()
+    output.finish()
+    assert json.loads(output.stream.getvalue()) == []
+
+
+def test_jsonl_streamed():
+    """Testing JSON lines output - records are flushed as soon as results arrive"""
+    output = JsonLinesOutput(io.StringIO())
+    output.write(RESULTS[0])
+    assert output.stream.getvalue().count("\n") == 1
+
+
+@pytest.mark.parametrize("error_out", [False, True])
+def test_sarif_output(error_out):
+    """Testing SARIF output - results with locations, errors as tool notifications"""
+    log = json.loads(_write(SarifOutput(io.StringIO(), error_out=error_out)))
+    run = log["runs"][0]
+    assert log["version"] == "2.1.0"
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == ["print"]
+    assert [result["level"] for result in run["results"]] == [
+        "error" if error_out else "warning"
+    ] * 2
+    location = run["results"][0]["locations"][0]
+    assert location["physicalLocation"] == {
+        "artifactLocation": {"uri": "pkg/__init__.py"},
+        "region": {"startLine": 1, "startColumn": 5},
+    }
+    assert location["logicalLocations"][0]["fullyQualifiedName"] == "pkg.__init__"
+    assert run["invocations"] == [
+        {
+            "executionSuccessful": False,
+            "toolExecutionNotifications": [
+                {
+                    "level": "error",
+                    "message": {"text": "Module [missing] is not present"},
+                }
+            ],
+        }
+    ]
+
+
+def test_outputs_notebook():
+    """Testing outputs - findings within notebooks carry their cell number"""
+    result = ModuleResult(
+        "nb", (FileResult("nb.ipynb", (Finding(2, 0, "print", 3),)),), 1
+    )
+    record = next(JsonLinesOutput(io.StringIO()).records(result))
+    assert (record["cell"], record["line"]) == (3, 2)
+
+    output = SarifOutput(io.StringIO())
+    output.start()
+    output.write(result)
+    output.finish()
+    sarif = json.loads(output.stream.getvalue())["runs"][0]["results"][0]
+    assert sarif["message"]["text"] == "print found in nb (cell 3)"
+    assert sarif["properties"] == {"cell": 3}
+
+
+def test__uri(tmp_path):
+    """Testing _uri - paths outside of working directory are absolute URIs"""
+    assert _uri(os.path.join(os.getcwd(), "pkg", "mod.py")) == "pkg/mod.py"
+    assert _uri(str(tmp_path / "mod.py")).startswith("file://")
+    with mock.patch("noprint.output.os.path.commonpath", side_effect=ValueError):
+        assert _uri(str(tmp_path / "mod.py")) == (tmp_path / "mod.py").as_uri()
@@ -1,44 +1,79 @@
 """
 Module with tests for noprint.sprint
 """
-import contextvars
+import io
+import os
+import json
+import py_compile
+import tarfile
+import zipfile
 from unittest import mock
+from concurrent.futures import Future
 
 import pytest
 
 import noprint
 
 from noprint.sprint import (
-    PackageFinder,
+    FileResult,
+    ModuleResult,
+    Report,
+    Scanner,
+    detect_prints,
+    _report,
+    _parse_file,
     _parse_pyfile,
     _get_module,
     _get_subpackages,
     _parse_module,
+    _parse_chunk,
+    _chunks,
+    _estimate,
+    _Backlog,
+    _resolve,
+    _changed_modules,
+    _filter_accepts,
+    _is_path,
+    _targets,
+    _init_worker,
+    _worker_settings,
+    _Settings,
+)
+from noprint.cache import ResultCache
+from noprint.stats import Stats
+from noprint.logger import Reporter
+from noprint.module import Module
+from noprint.filters import PathFilter
+from noprint.detect import Detector, Finding, NameRule, PrintRule
+from noprint.exceptions import (
+    ChangedFilesException,
+    ImportException,
+    ParentModuleNotFoundException,
 )
-from noprint.exceptions import ImportException, ParentModuleNotFoundException
-
-
-@pytest.mark.parametrize("origin", [None, "origin", "__init__.py"])
-@pytest.mark.parametrize("name", ["name", "__pycache__"])
-@mock.patch("noprint.sprint.os")
-def test_get_subpackages(mock_os, origin, name):
-    """Testing function for _get_subpackages - mock several different module specs and finish with a proper one"""
-    mod_mock = mock.MagicMock()
-    mod_mock.origin = [origin] if origin is not None else []
-    mod_mock.name = name
-    mod_mock.search_path = "loc"
-    mod_mock.submodule_search_locations = ["loc"]
-
-    mod_mock_e = mock.MagicMock()
-    mod_mock_e.origin = ["origin"]
-    mod_mock_e.name = "name"
-    mod_mock_e.search_path = "loc"
-    mod_mock_e.submodule_search_locations = ["loc"]
 
-    mock_os.listdir.return_value = ["name"]
 
-    for package in _get_subpackages("noprint", module=mod_mock):
-        assert package is not None
+@pytest.mark.parametrize("origin", [None, "origin.py", "__init__.py"])
+def test_get_subpackages(mock_module, tmp_path, origin):
+    """Testing function for _get_subpackages - submodules come from a single directory listing"""
+    for directory in ("sub", "__pycache__"):
+        (tmp_path / directory).mkdir()
+    for path in ("mod.py", "__init__.py", "data.txt", "nb.ipynb"):
+        (tmp_path / path).write_text("")
+
+    module = mock_module()
+    module._origin = [origin] if origin else []  # pylint:disable=protected-access
+    module._search_path = str(tmp_path)  # pylint:disable=protected-access
+    subpackages = _get_subpackages("test.subpackage", module=module)
+    if origin == "origin.py":
+        assert not subpackages
+    else:
+        assert [(sub.name, sub.in_package) for sub in subpackages] == [
+            ("test.subpackage.sub", True),
+            ("test.subpackage.mod", True),
+            ("test.subpackage.nb", True),
+        ]
+        assert subpackages[0].origin == []
+        assert subpackages[1].origin == [str(tmp_path / "mod.py")]
 
 
 @pytest.mark.parametrize("sub_pkgs", [[], [mock.Mock()], [mock.Mock(), mock.Mock()]])
@@ -49,6 +84,9 @@ def test_parse_module(origin, sub_pkgs):
     module.origin = origin
     with mock.patch("noprint.sprint._get_module", return_value=module), mock.patch(
         "noprint.sprint._get_subpackages", return_value=sub_pkgs
+    ), mock.patch(
+        "noprint.sprint._parse_pyfile",
+        side_effect=lambda mod, first, settings=None: mod,
     ):
         result = _parse_module(package="noprint")
         if module.origin:
@@ -58,22 +96,231 @@ def test_parse_module(origin, sub_pkgs):
         assert len(result[1]) == len(sub_pkgs)
 
 
-def _parse_mock(package):  # pylint:disable=unused-argument
+def _parse_mock(
+    package, first=False, recursive=True, stats=None, settings=None
+):  # pylint:disable=unused-argument
     """Helper function for mocking _parse_module (Pool pickling)"""
-    return (package, [])
+    if package == "broken":
+        raise ImportException("broken")
+    return (package, [f"{package}.sub"] if "." not in package else [])
+
+
+def _resolve_mock(
+    targets, verbose=False, path_filter=None
+):  # pylint:disable=unused-argument
+    """Helper function for mocking _resolve - jobs get packages by their names"""
+    return iter(targets)
+
+
+@pytest.mark.parametrize("kind", ["sequential", "thread", "process"])
+def test_scanner_results(kind):
+    """Testing Scanner.results - subpackages are submitted as their parents complete"""
+    with mock.patch("noprint.sprint._parse_module", _parse_mock), mock.patch(
+        "noprint.sprint._resolve", _resolve_mock
+    ), Scanner(workers=2, executor=kind) as scanner:
+        assert scanner.choose_executor([("source", True)]) == kind
+        results = list(scanner.results(("source", "test", "broken")))
+        executor = scanner.executor
+        assert list(scanner.results(("other",))) == ["other", "other.sub"]
+        assert scanner.pool(kind) is executor  # Pool is kept warm between scans
+    assert not scanner._executors  # pylint: disable=protected-access
+    assert {res for res in results if isinstance(res, str)} == {
+        "source",
+        "test",
+        "source.sub",
+        "test.sub",
+    }
+    assert [str(res) for res in results if isinstance(res, Exception)] == ["broken"]
+
+
+def test__init_worker():
+    """Testing _init_worker - settings are installed into the worker process, profiling collects stats"""
+    detector = Detector([PrintRule()], prefilter=False)
+    previous = _worker_settings()
+    try:
+        _init_worker(_Settings(None, detector, verbose=True, profile=True))
+        assert _worker_settings() == _Settings(None, detector, True, True, True)
+    finally:
+        _init_worker(previous)
+    assert _worker_settings() == previous
+
+
+class _ExitRule(NameRule):
+    """Rule of a second scanner"""
+
+    name = "exit"
+    names = ("exit",)
+
+
+@pytest.mark.parametrize("kind", ["sequential", "thread"])
+def test_scanner_results_isolated(tmp_path, kind):
+    """Testing Scanner.results - interleaved in-process scans keep their own settings"""
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.py").write_text("exit()\nprint(1)\n")
+    paths = [str(tmp_path / f"{name}.py") for name in ("a", "b", "c")]
+
+    options = {"executor": kind, "chunk_size": 1, "queue_depth": 1}
+    with Scanner(rules=[_ExitRule()], **options) as first, Scanner(**options) as second:
+        exits, prints = first.results(paths), second.results(paths)
+        found = []
+        for _ in paths:
+            found.append(next(exits).files[0].findings)
+            found.append(next(prints).files[0].findings)
+    assert found == [(Finding(1, 0, "exit"),), (Finding(2, 0, "print"),)] * 3
+
+
+def test_scanner_scan(tmp_path):
+    """Testing Scanner.scan and Scanner.scan_source - collecting results into a report"""
+    (tmp_path / "clean.py").write_text("i = 1\n")
+    (tmp_path / "dirty.py").write_text("i = 1\nprint(i)\n")
+
+    with Scanner(cache_dir=str(tmp_path / "cache")) as scanner:
+        report = scanner.scan([str(tmp_path), str(tmp_path / "missing")])
+        assert scanner.scan_source(b"print(1)\n", "mod.py") == (Finding(1, 0, "print"),)
+    assert report.status == 2
+    assert [str(exc) for exc in report.errors] == [
+        f"Path [{tmp_path / 'missing'}] is not a python file, directory nor archive"
+    ]
+    assert sorted((module.name, module.status) for module in report.modules) == [
+        ("clean", 0),
+        ("dirty", 1),
+    ]
+    assert set(
+        ResultCache(str(tmp_path / "cache"), scanner.detector.signature).load().entries
+    ) == {
+        str(tmp_path / "clean.py"),
+        str(tmp_path / "dirty.py"),
+    }
+
+    with Scanner(first_only=True) as scanner:
+        report = scanner.scan([str(tmp_path / "dirty.py"), str(tmp_path / "clean.py")])
+    assert report.status == 1
+    assert [module.name for module in report.modules] == ["dirty"]
+    assert Report((), ()).status == 0
+
+
+def test__parse_module_resolved(mock_module):
+    """Testing _parse_module - already resolved module is scanned without its subpackages"""
+    module = mock_module()
+    with mock.patch("noprint.sprint._get_module") as mock_get, mock.patch(
+        "noprint.sprint._get_subpackages"
+    ) as mock_sub, mock.patch("noprint.sprint._parse_pyfile") as mock_parse, mock.patch(
+        "noprint.module.os.path.isfile", return_value=True
+    ):
+        result = _parse_module(module, recursive=False)
+        mock_get.assert_not_called()
+        mock_sub.assert_not_called()
+        assert result == (mock_parse.return_value, [])
+
+
+@mock.patch("noprint.vcs.toplevel")
+@mock.patch("noprint.vcs.changed_files")
+def test__changed_modules(mock_changed, mock_top, tmp_path):
+    """Testing _changed_modules - changed files are limited to selected packages and paths"""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg/__init__.py").write_text("")
+    (tmp_path / "pkgs").mkdir()
+    (tmp_path / "pkgs/__init__.py").write_text("")
+    mock_top.return_value = str(tmp_path)
+    mock_changed.return_value = [
+        str(tmp_path / "pkg/__init__.py"),
+        str(tmp_path / "pkg/mod.py"),
+        str(tmp_path / "pkg/mod.py"),
+        str(tmp_path / "pkgs/mod.py"),
+        str(tmp_path / "setup.py"),
+    ]
+    names = [module.name for module in _changed_modules("main", ["pkg"])]
+    assert names == ["pkg", "pkg.mod"]
+    targets = [
+        ([str(tmp_path / "pkg")], ["pkg", "pkg.mod"]),
+        ([str(tmp_path / "pkg/mod.py"), "pkgs"], ["pkg.mod", "pkgs.mod"]),
+        ([str(tmp_path / "pk")], []),  # Only whole components of paths match
+    ]
+    for packages, expected in targets:
+        names = [module.name for module in _changed_modules("main", packages)]
+        assert names == expected
+    names = [module.name for module in _changed_modules("main", [])]
+    assert names == ["pkg", "pkg.mod", "pkgs.mod", "setup"]
+    path_filter = PathFilter(
+        exclude=["pkgs", "setup.py", tmp_path.name, f"{tmp_path.name[:4]}*"]
+    )
+    names = [module.name for module in _changed_modules("main", [], path_filter)]
+    assert names == ["pkg", "pkg.mod"]
+    mock_changed.assert_called_with("main", str(tmp_path))
 
 
-def test_pf_packages_iter():
-    """Testing PackageFinder.packages_iter"""
-    pkg_finder = PackageFinder()
+@pytest.mark.parametrize(
+    "path, accepted",
+    [
+        ("pkg/mod.py", True),
+        ("pkg/migrations/0001.py", False),
+        ("/src/migrations/pkg/mod.py", False),
+        ("pkg/migrations.py", False),
+    ],
+)
+def test__filter_accepts(path, accepted):
+    """Testing _filter_accepts - files within excluded directories are rejected too"""
+    path = path.replace("/", os.sep)
+    assert _filter_accepts(PathFilter(exclude=["migrations"]), path) is accepted
 
-    noprint.sprint._parse_module = _parse_mock  # pylint:disable=protected-access
 
-    packages = ("source", "test")
-    var = contextvars.ContextVar("packages")
-    var.set(packages)
-    noprint.sprint.packages = var
-    assert set(pkg_finder.packages_iter()) == set(packages)
+@pytest.mark.parametrize(
+    "package, expected",
+    [
+        ("noprint", False),
+        ("noprint.cli", False),
+        ("cli.py", True),
+        ("demo.ipynb", True),
+        ("src/noprint", True),
+    ],
+)
+def test__is_path(package, expected):
+    """Testing _is_path - arguments with path separator or .py extension are paths"""
+    assert _is_path(package) is expected
+
+
+def test__targets(tmp_path):
+    """Testing _targets - paths are scanned directly, file by file"""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg/__init__.py").write_text("")
+    (tmp_path / "pkg/mod.py").write_text("")
+    (tmp_path / "script.py").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+
+    packages = [
+        "noprint",
+        str(tmp_path / "pkg"),
+        str(tmp_path / "script.py"),
+        str(tmp_path / "notes.txt"),
+    ]
+    with mock.patch("noprint.sprint.Module.__init__") as mock_init:
+        targets = list(_targets(packages))
+        mock_init.assert_not_called()
+    assert targets[0] == ("noprint", True)
+    assert sorted((target.name, rec) for target, rec in targets[1:4]) == [
+        ("pkg", False),
+        ("pkg.mod", False),
+        ("script", False),
+    ]
+    assert {target.size for target, _ in targets[1:4]} == {0}  # Known from listings
+    assert isinstance(targets[4][0], ImportException)
+    assert len(targets) == 5
+
+
+def test_scanner_results_changed():
+    """Testing Scanner.results - scanning files changed since git reference"""
+    with mock.patch(
+        "noprint.sprint._changed_modules", return_value=["source.sub"]
+    ), mock.patch("noprint.sprint._parse_module", _parse_mock), mock.patch(
+        "noprint.sprint._resolve", _resolve_mock
+    ), Scanner() as scanner:
+        assert list(scanner.results(changed_since="main")) == ["source.sub"]
+        with mock.patch(
+            "noprint.sprint._changed_modules",
+            side_effect=ChangedFilesException("no git"),
+        ):
+            results = list(scanner.results(changed_since="main"))
+            assert [str(res) for res in results] == ["no git"]
 
 
 @pytest.mark.parametrize(
@@ -94,6 +341,28 @@ def test__get_module__mod(ret):
         _get_module("noprint")
 
 
+@pytest.mark.parametrize(
+    "system, message",
+    [
+        (ParentModuleNotFoundException("Dummy exception"), "is not installed"),
+        (None, "is not installed"),
+        (mock.MagicMock(), "is overshadowing installed module"),
+    ],
+)
+def test__get_module_verbose(system, message):
+    """Testing _get_module - installed module is looked up only when verbose"""
+    module = mock.MagicMock()
+    with mock.patch("noprint.sprint.Module", side_effect=[module]):
+        assert _get_module("noprint") is module
+    with mock.patch("noprint.sprint.Module", side_effect=[module, system]), mock.patch(
+        "noprint.sprint.logging"
+    ) as mock_log:
+        if isinstance(system, mock.MagicMock):
+            system.origin.__len__.return_value = 1
+        assert _get_module("noprint", verbose=True) is module
+    assert message in mock_log.log.call_args[0][0]
+
+
 @pytest.mark.parametrize(
     "ret", [None, ParentModuleNotFoundException("Dummy exception")]
 )
@@ -110,68 +379,553 @@ def test__get_module__import_exc(ret):
         _get_module("noprint")
 
 
-@pytest.mark.parametrize("code", ["print('')", "", "i=1"])
-@pytest.mark.parametrize("mod", [None, ImportException("X")])
+@pytest.mark.parametrize("first", [True, False])
+@pytest.mark.parametrize("code", ["print('')\nprint('')", "", "i=1"])
 @mock.patch("builtins.open")
-def test__parse_pyfile(mock_open, mod, code):
+@mock.patch("noprint.sprint._detector", Detector([PrintRule()], prefilter=False))
+def test__parse_pyfile(mock_open, code, first):
     """Test method for _parse_python - finding print statements"""
     fin = mock.Mock()
-    fin.return_value.readline.return_value = "# -*- coding: utf-8-sig -*-"
-    fin.return_value.read.return_value = code
+    fin.return_value.read.return_value = f"# -*- coding: utf-8 -*-\n{code}".encode()
     mock_open.return_value.__enter__ = fin
 
     module = mock.Mock()
-    module.origin = ["noprint"]
+    module.origin = ["noprint", "noprint"]
     module.name = "noprint"
 
-    if mod is None:
-        mod = module
+    res = _parse_pyfile(module, first=first)
 
-    res = _parse_pyfile(mod)
-
-    if isinstance(mod, ImportException):
-        assert res == 2
-    elif "print" in code:
-        assert res == 1  # ([("[noprint] Line: 1", True)], None)
+    assert res.name == "noprint"
+    if "print" in code:
+        assert res.status == 1
+        assert [finding.line for finding in res.files[0].findings] == (
+            [2] if first else [2, 3]
+        )
+        assert len(res.files) == (1 if first else 2)
     else:
-        assert res == 0  # ([("[CLEAR]:[noprint]", False)], None)
+        assert res.status == 0
+        assert res.files == (FileResult("noprint", ()), FileResult("noprint", ()))
 
 
 @pytest.mark.parametrize("first", [True, False])
+def test__parse_file_cached(tmp_path, first):
+    """Test method for _parse_file - reusing results of unchanged files"""
+    source = tmp_path / "mod.py"
+    source.write_text("print(1)\nprint(2)\n", encoding="utf-8")
+    cache = ResultCache(str(tmp_path / "cache"))
+
+    with mock.patch("noprint.sprint._cache", cache):
+        result = _parse_file(str(source), first=first)
+        assert [finding.line for finding in result.findings] == (
+            [1] if first else [1, 2]
+        )
+        assert (result.key is None) is first
+        if first:
+            return
+
+        cache.store(result.path, result.key, result.findings)
+        cache.save()
+        with mock.patch("noprint.detect.ast.parse") as mock_parse:
+            assert _parse_file(str(source)).findings == result.findings
+            os.utime(source, ns=(0, 0))  # Touched, but contents are the same
+            assert _parse_file(str(source)).findings == result.findings
+            mock_parse.assert_not_called()
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test__parse_file_bytecode(tmp_path, cached):
+    """Test method for _parse_file - up-to-date bytecode without prints clears the file unread"""
+    clear, dirty = tmp_path / "clear.py", tmp_path / "dirty.py"
+    clear.write_text("x = 1\n", encoding="utf-8")
+    dirty.write_text("x = 1\nprint(x)\n", encoding="utf-8")
+    for path in (clear, dirty):
+        py_compile.compile(str(path), doraise=True)
+    cache = ResultCache(str(tmp_path / "cache")) if cached else None
+    stats = Stats()
+
+    detector = Detector([PrintRule()], bytecode=True)
+    with mock.patch("noprint.sprint._detector", detector), mock.patch(
+        "noprint.sprint._cache", cache
+    ):
+        with mock.patch("noprint.sprint._read_source") as mock_read:
+            assert _parse_file(str(clear), stats=stats) == (str(clear), (), None)
+            mock_read.assert_not_called()
+        assert _parse_file(str(dirty), stats=stats).findings == (
+            Finding(2, 0, "print"),
+        )
+        clear.write_text("print(1)\n", encoding="utf-8")  # Bytecode is stale now
+        assert _parse_file(str(clear)).findings == (Finding(1, 0, "print"),)
+    assert stats.counters == {"bytecode": 1, "files": 1, "bytes": 15}
+    assert "bytecode" in stats.timers
+
+
+def _notebook(path, *sources):
+    """Write a notebook with code cells of given sources"""
+    cells = [
+        {"cell_type": "code", "metadata": {}, "outputs": [], "source": source}
+        for source in sources
+    ]
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4}))
+    return str(path)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test__parse_file_notebook(tmp_path, cached):
+    """Test method for _parse_file - notebooks are streamed cell by cell, their digest is computed meanwhile"""
+    path = _notebook(tmp_path / "nb.ipynb", "x = 1", "x = 2\nprint(x)")
+    cache = ResultCache(str(tmp_path / "cache")) if cached else None
+    stats = Stats()
+
+    with mock.patch("noprint.sprint._cache", cache):
+        result = _parse_file(path, stats=stats)
+        assert result.findings == (Finding(2, 0, "print", 2),)
+        assert (result.key is not None) is cached
+        assert _parse_file(path, first=True) == (path, result.findings, None)
+        if cached:
+            cache.store(result.path, result.key, result.findings)
+            cache.save()
+            with mock.patch("noprint.notebook.code_cells") as mock_cells:
+                assert _parse_file(path, stats=stats).findings == result.findings
+                mock_cells.assert_not_called()
+    assert stats.counters == dict(
+        {"files": 1, "bytes": os.path.getsize(path)},
+        **({"cached": 1} if cached else {}),
+    )
+
+
+@pytest.mark.parametrize("verbosity", [0, 1, 2])
 @pytest.mark.parametrize(
-    "mod",
+    "result",
     [
-        (
-            [("X", False)],
-            None,
+        ImportException("X"),
+        ModuleResult(
+            "noprint",
+            (FileResult("noprint/__init__.py", (Finding(1, 0, "print"),)),),
+            1,
         ),
-        (
-            [("X", True)],
-            None,
-        ),
-        (
-            [],
-            ImportException("X"),
+        ModuleResult("noprint", (FileResult("noprint/cli.py", ()),), 0),
+        ModuleResult(
+            "noprint.__init__",
+            (FileResult("noprint/__init__.ipynb", (Finding(1, 0, "print", 3),)),),
+            1,
         ),
     ],
 )
-@mock.patch("noprint.sprint._parse_pyfile", side_effect=lambda *args, **kwargs: 0)
-def test_pf_run(mock_parse, mod, first):  # pylint: disable=unused-argument
-    """Testing function for _get_prints - verifying if code contains print statements"""
-
-    def _subpackages():  # pylint: disable=unused-argument
-        i = 0
-        yield mod
-        i = i + 1
-        if i == 10:
-            return
+def test__report(result, verbosity):
+    """Test method for _report - results received from workers are written by the reporter"""
+    reporter = Reporter(io.StringIO(), color=False)
+    res = _report(result, verbosity, noprint.logger.WARNING, reporter)
+    reporter.flush()
+    lines = reporter.stream.getvalue().splitlines()
+    if isinstance(result, Exception):
+        assert res == 2
+        assert lines == ["[CRITICAL]:X"]
+    else:
+        assert res == result.status
+        if result.status and verbosity:
+            cell = "Cell: 3 " if result.files[0].findings[0].cell else ""
+            assert lines == [f"[WARNING]:[noprint.__init__] {cell}Line: 1"]
+        elif not result.status and verbosity >= 2:
+            assert lines == ["[CLEAR]:[noprint]"]
+        else:
+            assert not lines
 
+
+@pytest.mark.parametrize("first", [True, False])
+@pytest.mark.parametrize(
+    "results, expected",
+    [
+        ([ModuleResult("X", (), 0)], 0),
+        ([ModuleResult("X", (), 1), ModuleResult("Y", (), 0)], 1),
+        ([ImportException("X"), ModuleResult("Y", (), 1)], 2),
+    ],
+)
+@mock.patch("noprint.sprint.logging.log")
+def test_detect_prints(
+    mock_log, results, expected, first
+):  # pylint: disable=unused-argument
+    """Testing detect_prints - results are reported as they come, first only stops early"""
+    scanner = Scanner(first_only=first)
+    with mock.patch.object(
+        scanner, "results", return_value=(result for result in results)
+    ), mock.patch("noprint.sprint._report", wraps=_report) as mock_report:
+        assert detect_prints(scanner, ["X"]) == expected
+    assert mock_report.call_count == (1 if first and expected else len(results))
+
+
+def test_detect_prints_output():
+    """Testing detect_prints - results are written to the output format instead of logs"""
+    scanner = Scanner()
+    output = mock.Mock()
+    output.write.side_effect = [0, 1]
+    results = [ModuleResult("X", (), 0), ModuleResult("Y", (), 1)]
+    with mock.patch.object(
+        scanner, "results", return_value=(result for result in results)
+    ), mock.patch("noprint.sprint._report") as mock_report:
+        assert detect_prints(scanner, ["X"], output=output) == 1
+    mock_report.assert_not_called()
+    assert output.write.call_args_list == [mock.call(result) for result in results]
+    output.start.assert_called_once()
+    output.finish.assert_called_once()
+
+
+def test__parse_chunk_stats(tmp_path):
+    """Testing _parse_chunk - phases of the job are measured when collecting stats"""
+    (tmp_path / "mod.py").write_text("print(1)\n")
+    module = Module.from_path(str(tmp_path / "mod.py"))
+    with mock.patch("noprint.sprint._collect_stats", True), mock.patch(
+        "noprint.sprint._profile", True
+    ):
+        results, sub_pkgs, stats = _parse_chunk([module], recursive=False)
+    assert results[0].status == 1 and not sub_pkgs
+    assert set(stats.timers) == {"resolve", "listing", "read", "parse"}
+    assert stats.counters == {"modules": 1, "files": 1, "bytes": 9, "jobs": 1}
+    assert [path for _, path in stats.slowest] == [str(tmp_path / "mod.py")]
+    assert stats.profile is not None
+
+
+def test_scanner_stats(tmp_path):
+    """Testing Scanner - stats of jobs are merged together with the result loop"""
+    (tmp_path / "mod.py").write_text("print(1)\n")
+    with Scanner(stats=True) as scanner:
+        assert detect_prints(scanner, [str(tmp_path)]) == 1
+    summary = scanner.stats.summary(scanner.workers)
+    assert summary["counters"] == {"bytes": 9, "files": 1, "jobs": 1, "modules": 1}
+    assert summary["wall"] > 0
+    assert summary["phases"]["report"] > 0
+    assert scanner.stats.profile is None
+
+    with Scanner(stats=True, cache_dir=str(tmp_path / "cache")) as scanner:
+        for _ in range(2):
+            assert detect_prints(scanner, [str(tmp_path)]) == 1
+        os.utime(tmp_path / "mod.py", ns=(1, 1))  # Found by its content hash
+        assert detect_prints(scanner, [str(tmp_path)]) == 1
+    assert scanner.stats.counters["cached"] == 2
+
+
+@pytest.mark.parametrize("first", [False, True])
+def test__parse_chunk(first):
+    """Testing _parse_chunk - errors are returned along results, first print ends the job"""
+    results = [(ModuleResult("a", (), 1), ["a.sub"]), (ModuleResult("b", (), 0), [])]
     with mock.patch(
-        "noprint.sprint.PackageFinder.packages_iter", side_effect=_subpackages
+        "noprint.sprint._parse_module",
+        side_effect=[ImportException("broken")] + results,
     ):
-        result = PackageFinder().run()
-        packages = ("source", "test")
-        var = contextvars.ContextVar("packages")
-        var.set(packages)
-        noprint.sprint.packages = var
-        assert result == 0
+        items, sub_pkgs, stats = _parse_chunk(["broken", "a", "b"], first)
+    assert [getattr(item, "name", str(item)) for item in items] == ["broken", "a"] + (
+        [] if first else ["b"]
+    )
+    assert sub_pkgs == ["a.sub"]
+    assert stats is None
+
+
+@pytest.mark.parametrize(
+    "count, workers, sizes",
+    [(0, 4, []), (3, 4, [1, 1, 1]), (10, 2, [5, 5]), (40, 1, [16, 16, 8])],
+)
+def test__chunks_unknown(count, workers, sizes):
+    """Testing _chunks - packages of unknown size are chunked by their count"""
+    chunks = list(_chunks(list(range(count)), workers))
+    assert [len(chunk) for chunk in chunks] == sizes
+    assert sum(chunks, []) == list(range(count))
+
+
+def _sized(name, size):
+    """Module of the file with known size"""
+    return Module.from_path(f"{name}.py", size)
+
+
+@pytest.mark.parametrize(
+    "workers, chunk_size, expected",
+    [
+        (1, 2**30, [["a", "b", "c", "d", "e"]]),
+        (2, 2**30, [["a", "d"], ["b", "c", "e"]]),
+        (1, 70 * 2**10, [["a"], ["b"], ["c"], ["d", "e"]]),
+        (8, 2**30, [["a"], ["b"], ["c"], ["d"], ["e"]]),
+    ],
+)
+def test__chunks(workers, chunk_size, expected):
+    """Testing _chunks - unknown packages first, then modules balanced by size, largest first"""
+    sizes = {"a": 100, "b": 60, "c": 40, "d": 20, "e": 1}
+    modules = [_sized(name, size * 2**10) for name, size in sorted(sizes.items())]
+    chunks = list(_chunks(["pkg"] + modules[::-1], workers, chunk_size))
+    assert chunks[0] == ["pkg"]
+    assert [[module.name for module in chunk] for chunk in chunks[1:]] == expected
+
+
+def test__resolve_estimate(tmp_path):
+    """Testing _resolve and _estimate - packages are resolved once, files are counted until limits are reached"""
+    (tmp_path / "est_pkg" / "sub").mkdir(parents=True)
+    for path in ("est_pkg/__init__.py", "est_pkg/mod.py", "est_pkg/sub/mod.py"):
+        (tmp_path / path).write_text("i = 1\n")
+    (tmp_path / "est_script.py").write_text("i = 1\n")
+    script = Module.from_path(str(tmp_path / "est_script.py"))
+    error = ImportException("broken")
+    with mock.patch("noprint.module.os.getcwd", return_value=str(tmp_path)):
+        targets = list(
+            _resolve(
+                [
+                    ("est_pkg", True),
+                    ("est_missing", True),
+                    ("est_pkg", True),
+                    ("est_script", True),
+                    (script, False),
+                    (Module.from_path(str(tmp_path / "est_script.py"), 1000), False),
+                    (error, False),
+                ]
+            )
+        )
+    assert [getattr(target, "name", None) for target, _ in targets] == [
+        "est_pkg",
+        None,
+        "est_script",
+        "est_script",
+        "est_script",
+        None,
+    ]
+    assert targets[0][0].listing.init  # Listed before it's sent to workers
+    assert isinstance(targets[1][0], ImportException) and targets[5][0] is error
+    modules = [target for target in targets if isinstance(target[0], Module)]
+    with mock.patch("noprint.sprint.os.stat") as mock_stat:
+        assert _estimate(modules[:1], 100, 100) == (3, 18)  # Sizes come from listings
+        mock_stat.assert_not_called()
+    os.remove(tmp_path / "est_script.py")
+    assert _estimate(modules, 100, 100) == (4, 1018)
+    assert _estimate(modules, 2, 1) == (2, 12)
+
+
+@pytest.mark.parametrize(
+    "workers, size, expected",
+    [(1, 2**30, "sequential"), (4, 10, "sequential"), (4, 2**30, "process")],
+)
+def test_scanner_choose_executor(workers, size, expected):
+    """Testing Scanner.choose_executor - tiny scans run inline, large ones in worker processes"""
+    with mock.patch("noprint.sprint._estimate", return_value=(1000, size)):
+        scanner = Scanner(workers=workers)
+        assert scanner.choose_executor([("pkg", True)]) == expected
+    with pytest.raises(ValueError):
+        Scanner(executor="fibers")
+
+
+def test_scanner_results_failures():
+    """Testing Scanner.results - failed jobs are reported, closing the iterator cancels the rest"""
+    with mock.patch(
+        "noprint.sprint._parse_chunk", side_effect=RuntimeError("crash")
+    ), mock.patch("noprint.sprint._resolve", _resolve_mock), mock.patch(
+        "noprint.sprint.logging"
+    ) as mock_log, Scanner(
+        verbose=True
+    ) as scanner:
+        assert [str(res) for res in scanner.results(["pkg"])] == ["crash"]
+    mock_log.log.assert_called_once_with(
+        "Scanning with sequential executor", mock_log.INFO
+    )
+
+    with mock.patch("noprint.sprint._parse_module", _parse_mock), mock.patch(
+        "noprint.sprint._resolve", _resolve_mock
+    ), Scanner(workers=2, executor="sequential") as scanner:
+        results = scanner.results(["source", "test"])
+        assert next(results) == "source"
+        executor = scanner.pool("sequential")
+        results.close()
+        # Jobs of test and source.sub are cancelled
+        assert [job[0].cancelled() for job in executor.pending] == [True, True]
+
+
+def test__backlog_idle():
+    """Testing _Backlog - windows are split between idle workers only"""
+    backlog = _Backlog(workers=4)
+    modules = [_sized(f"m{idx}", 100) for idx in range(8)]
+    backlog.push((module, False) for module in modules)
+    assert backlog.pop(idle=0) == (modules, False)
+    backlog.push((module, False) for module in modules)
+    chunks = [backlog.pop() for _ in range(4)]
+    assert chunks == [(modules[idx::4], False) for idx in range(4)]
+    assert backlog.pop(idle=4) is None
+
+
+@pytest.mark.parametrize("workers", [1, 4, 8])
+def test_scanner_small_dirs(tmp_path, workers):
+    """Testing Scanner - files of many small directories are sent in few jobs, regardless of workers"""
+    for idx in range(12):
+        (tmp_path / f"pkg/sub{idx}").mkdir(parents=True)
+        for name in ("__init__", "a", "b", "c", "d"):
+            (tmp_path / f"pkg/sub{idx}/{name}.py").write_text("i = 1\n")
+    (tmp_path / "pkg/__init__.py").write_text("")
+    with Scanner(workers=workers, executor="sequential", stats=True) as scanner:
+        with mock.patch("noprint.module._find_parent_dir", return_value=str(tmp_path)):
+            assert len(list(scanner.results(["pkg"]))) == 61
+        assert scanner.stats.counters["files"] == 61
+        # Directories are split between workers only until they're all busy
+        assert scanner.stats.counters["jobs"] <= 2 * workers + 1
+
+
+def test__backlog():
+    """Testing _Backlog - packages discovered last are taken first, a window at a time"""
+    backlog = _Backlog(workers=1)
+    backlog.push([("source", True), (ImportException("gone"), False), ("cli", False)])
+    with mock.patch("noprint.sprint.WINDOW", 2):
+        assert backlog.pop() == (["source"], True)
+        backlog.push([("source.sub", True)])
+        assert backlog.pop() == (["source.sub"], True)
+        assert backlog.pop() == (["cli"], False)
+        assert backlog.pop() is None
+    assert [str(err) for err in backlog.errors] == ["gone"]
+
+
+def _wide_mock(
+    package, first=False, recursive=True, stats=None, settings=None
+):  # pylint:disable=unused-argument
+    """Helper function for mocking _parse_module - every package has 4 subpackages, 3 levels deep"""
+    subs = [f"{package}.{idx}" for idx in range(4)] if package.count(".") < 3 else []
+    return (package, subs)
+
+
+def test_scanner_results_bounded():
+    """Testing Scanner.results - targets are streamed and jobs in flight are limited"""
+    pulled = []
+
+    def resolve(
+        targets, verbose=False, path_filter=None
+    ):  # pylint:disable=unused-argument
+        for target in targets:
+            pulled.append(target)
+            yield target
+
+    with mock.patch("noprint.sprint._parse_module", _wide_mock), mock.patch(
+        "noprint.sprint._resolve", resolve
+    ), mock.patch("noprint.sprint.WINDOW", 2), Scanner(
+        workers=2, executor="sequential", queue_depth=3
+    ) as scanner:
+        executor = scanner.pool("sequential")
+        run_next = executor.run_next
+        in_flight = []
+
+        def record():
+            in_flight.append(len(executor.pending))
+            return run_next()
+
+        with mock.patch.object(executor, "run_next", record):
+            results = scanner.results(f"pkg{idx}" for idx in range(20))
+            assert next(results) == "pkg0"
+            assert len(pulled) < 20  # Rest of targets is pulled as jobs complete
+            assert len(list(results)) == 20 * (1 + 4 + 16 + 64) - 1
+    assert max(in_flight) <= 2 * 3
+
+
+def test_scanner_results_stray_future():
+    """Testing Scanner.results - completed futures which aren't jobs of the scan are skipped"""
+    stray = Future()
+    stray.cancel()
+    real = noprint.sprint._next_completed  # pylint: disable=protected-access
+    picked = iter([stray])
+
+    def next_completed(*args):
+        return next(picked, None) or real(*args)
+
+    with mock.patch("noprint.sprint._parse_module", _parse_mock), mock.patch(
+        "noprint.sprint._resolve", _resolve_mock
+    ), mock.patch("noprint.sprint._next_completed", next_completed), Scanner(
+        executor="sequential"
+    ) as scanner:
+        assert list(scanner.results(["pkg"])) == ["pkg", "pkg.sub"]
+
+
+def test_scanner_results_auto(tmp_path):
+    """Testing Scanner.results - executor is picked by targets taken from the stream, errors included"""
+    (tmp_path / "auto_a.py").write_text("x = 1\n")
+    (tmp_path / "auto_b.py").write_text("print(1)\n")
+    with Scanner(workers=2) as scanner:
+        results = list(
+            scanner.results([str(tmp_path / "missing.py"), str(tmp_path) + os.sep])
+        )
+        executors = scanner._executors  # pylint: disable=protected-access
+        assert list(executors) == ["sequential"]
+    assert isinstance(results[0], ImportException)
+    assert sorted(res.name for res in results[1:]) == ["auto_a", "auto_b"]
+
+
+def test_scanner_filter(tmp_path, monkeypatch):
+    """Testing Scanner - excluded directories of packages and paths are never scanned
+
+    Paths are matched relative to the scan root, its parent directories never match"""
+    root = tmp_path / "build"
+    for directory in ("pkg/migrations", "pkg/sub"):
+        (root / directory).mkdir(parents=True)
+    for path in ("pkg/__init__.py", "pkg/sub/__init__.py", "pkg/migrations/m.py"):
+        (root / path).write_text("print(1)\n")
+    (root / "pkg/api_pb2.py").write_text("print(1)\n")
+    monkeypatch.chdir(root)
+    with Scanner(exclude=["migrations", "*_pb2", "build", "bui*"]) as scanner:
+        assert scanner.path_filter
+        for target in (str(root / "pkg") + os.sep, "pkg" + os.sep):
+            results = list(scanner.results([target]))
+            assert sorted(res.name for res in results) == ["pkg", "pkg.sub"]
+        with mock.patch("noprint.module._find_parent_dir", return_value=str(root)):
+            results = list(scanner.results(["pkg"]))
+        assert sorted(res.name for res in results) == ["pkg", "pkg.sub"]
+    with Scanner() as scanner:
+        assert scanner.path_filter is None
+
+
+@pytest.mark.parametrize("kind", ["sequential", "process"])
+def test_scanner_archives(tmp_path, kind):
+    """Testing Scanner - members of wheels and sdists are scanned without extracting them"""
+    sources = {"pkg/__init__.py": b"", "pkg/mod.py": b"x = 1\nprint(x)\n"}
+    wheel = str(tmp_path / "pkg-1.0-py3-none-any.whl")
+    with zipfile.ZipFile(wheel, "w") as zfile:
+        for name, data in sources.items():
+            zfile.writestr(name, data)
+    sdist = str(tmp_path / "pkg-1.0.tar.gz")
+    with tarfile.open(sdist, "w:gz") as tfile:
+        for name, data in sources.items():
+            info = tarfile.TarInfo(f"pkg-1.0/{name}")
+            info.size = len(data)
+            tfile.addfile(info, io.BytesIO(data))
+
+    with Scanner(workers=2, executor=kind, stats=True) as scanner:
+        report = scanner.scan([wheel, sdist, f"{wheel}/pkg"])
+        assert scanner.stats.counters["files"] == 6
+    assert not report.errors
+    assert sorted(
+        (module.name, module.files[0].path, module.status) for module in report.modules
+    ) == [
+        ("__init__", f"{wheel}/pkg/__init__.py", 0),
+        ("mod", f"{wheel}/pkg/mod.py", 1),
+        ("pkg", f"{wheel}/pkg/__init__.py", 0),
+        ("pkg", f"{sdist}/pkg-1.0/pkg/__init__.py", 0),
+        ("pkg.mod", f"{wheel}/pkg/mod.py", 1),
+        ("pkg.mod", f"{sdist}/pkg-1.0/pkg/mod.py", 1),
+    ]
+
+
+@pytest.mark.parametrize("kind", ["sequential", "process"])
+def test_scanner_notebooks(tmp_path, kind):
+    """Testing Scanner - notebooks are discovered within packages and directories"""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg/__init__.py").write_text("")
+    _notebook(tmp_path / "pkg/demo.ipynb", "%time x = 1", "print(x)")
+
+    with Scanner(workers=2, executor=kind) as scanner:
+        with mock.patch("noprint.module._find_parent_dir", return_value=str(tmp_path)):
+            report = scanner.scan(["pkg", str(tmp_path / "pkg/demo.ipynb")])
+    assert not report.errors
+    assert sorted((module.name, module.files) for module in report.modules) == [
+        ("pkg", (FileResult(str(tmp_path / "pkg/__init__.py"), ()),)),
+        (
+            "pkg.demo",
+            (
+                FileResult(
+                    str(tmp_path / "pkg/demo.ipynb"), (Finding(1, 0, "print", 2),)
+                ),
+            ),
+        ),
+        (
+            "pkg.demo",
+            (
+                FileResult(
+                    str(tmp_path / "pkg/demo.ipynb"), (Finding(1, 0, "print", 2),)
+                ),
+            ),
+        ),
+    ]
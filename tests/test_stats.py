@@ -0,0 +1,51 @@
+"""
+Module with tests for noprint.stats
+"""
+import pstats
+import pickle
+
+from noprint.stats import Stats
+
+
+def _job(path, parse, started=10.0):
+    """Stats of a finished job"""
+    stats = Stats()
+    stats.start(profile=True)
+    stats.read(100, 0.5)
+    stats.parsed(path, parse)
+    stats.stop()
+    stats.started = started
+    return pickle.loads(pickle.dumps(stats))  # Sent back from a pool worker
+
+
+def test_stats_merge(tmp_path):
+    """Testing Stats.merge - timers, counters, slowest files, queue waits and profiles are combined"""
+    total = Stats()
+    total.slowest_count = 2
+    for i, parse in enumerate([0.1, 0.3, 0.2]):
+        total.merge(_job(f"mod{i}.py", parse), submitted=9.0 + i * 0.5)
+    total.add("wall", 2.0)
+
+    summary = total.summary(workers=2)
+    assert summary["counters"] == {"bytes": 300, "files": 3, "jobs": 3}
+    assert summary["phases"]["read"] == 1.5
+    assert summary["phases"]["wait"] == 0.0
+    assert summary["queue_wait"] == {"total": 1.5, "mean": 0.5, "max": 1.0}
+    assert [item["path"] for item in summary["slowest"]] == ["mod1.py", "mod2.py"]
+    assert 0 <= summary["utilization"] < 1
+
+    table = total.table(workers=2)
+    assert "slowest files:" in table
+    assert "mod0.py" not in table
+
+    total.dump_profile(str(tmp_path / "profile"))
+    assert pstats.Stats(str(tmp_path / "profile")).total_calls > 0
+
+
+def test_stats_empty(tmp_path):
+    """Testing Stats - summary without any jobs and no profile to dump"""
+    stats = Stats()
+    assert stats.summary(workers=1)["utilization"] == 0.0
+    assert stats.summary(workers=1)["queue_wait"]["mean"] == 0.0
+    stats.dump_profile(str(tmp_path / "profile"))
+    assert not (tmp_path / "profile").exists()
@@ -0,0 +1,84 @@
+"""
+Module with tests for noprint.vcs
+"""
+import os
+import subprocess
+
+from unittest import mock
+
+import pytest
+
+from noprint.exceptions import ChangedFilesException
+from noprint.vcs import changed_files, toplevel
+
+
+@mock.patch("noprint.vcs.subprocess.run")
+def test_changed_files(mock_run):
+    """Testing changed_files - paths are relative to repository root"""
+    mock_run.side_effect = [
+        mock.Mock(stdout=b"/repo\n"),
+        mock.Mock(stdout=b"src/pkg/mod.py\0tests/test_mod.py\0"),
+        mock.Mock(stdout=b"src/pkg/new.py\0src/pkg/mod.py\0"),
+    ]
+    assert changed_files("main") == [
+        os.path.join("/repo", "src/pkg/mod.py"),
+        os.path.join("/repo", "tests/test_mod.py"),
+        os.path.join("/repo", "src/pkg/new.py"),
+    ]
+    args = mock_run.call_args_list[1]
+    assert args[0][0] == [
+        "git",
+        "diff",
+        "--name-only",
+        "--diff-filter=d",
+        "-z",
+        "main",
+        "--",
+        "*.py",
+        "*.ipynb",
+    ]
+    assert args[1]["cwd"] == "/repo"
+    untracked = mock_run.call_args[0][0]
+    assert untracked[:4] == ["git", "ls-files", "--others", "--exclude-standard"]
+    assert untracked[-2:] == ["*.py", "*.ipynb"]
+
+    mock_run.side_effect = [mock.Mock(stdout=b"/repo\n")]
+    assert toplevel() == "/repo"
+    mock_run.side_effect = [mock.Mock(stdout=b"mod.py\0"), mock.Mock(stdout=b"")]
+    assert changed_files("main", "/top") == [os.path.join("/top", "mod.py")]
+    assert mock_run.call_args[1]["cwd"] == "/top"
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        subprocess.CalledProcessError(128, "git", stderr=b"fatal: bad revision 'x'"),
+        FileNotFoundError("git"),
+    ],
+)
+@mock.patch("noprint.vcs.subprocess.run")
+def test_changed_files_error(mock_run, exc):
+    """Testing changed_files - git failures are reported with ChangedFilesException"""
+    mock_run.side_effect = exc
+    with pytest.raises(ChangedFilesException) as err:
+        changed_files("x")
+    assert "Unable to get changed files from git" in str(err.value)
+
+
+def test_changed_files_untracked(tmp_path):
+    """Testing changed_files - new files of the working tree are included, ignored ones are not"""
+    git = ["git", "-c", "user.name=noprint", "-c", "user.email=noprint@localhost"]
+    subprocess.run([*git, "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / "mod.py").write_text("")
+    subprocess.run([*git, "add", "."], cwd=tmp_path, check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "init"], cwd=tmp_path, check=True)
+    (tmp_path / "mod.py").write_text("print(1)\n")
+    for path in ("new.py", "build/gen.py", "notes.txt"):
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_text("")
+    top = str(tmp_path)
+    assert changed_files("HEAD", top) == [
+        os.path.join(top, "mod.py"),
+        os.path.join(top, "new.py"),
+    ]
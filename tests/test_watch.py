@@ -0,0 +1,206 @@
+"""
+Module with tests for noprint.watch
+"""
+import io
+import os
+import json
+from unittest import mock
+
+from noprint.detect import Finding
+from noprint.logger import Reporter
+from noprint.sprint import Scanner
+from noprint.watch import Change, Watcher, _diff, _Entry, report_change
+
+
+def _touch(path, content):
+    """Write file and make sure its modification time changes"""
+    path.write_text(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test__diff():
+    """Testing _diff - findings on shifted lines are matched by their source line"""
+    old = _Entry(
+        "mod",
+        (Finding(1, 0, "print"), Finding(2, 0, "print")),
+        ("print(a)", "print(b)"),
+    )
+    new = _Entry(
+        "mod",
+        (Finding(3, 0, "print"), Finding(4, 0, "print")),
+        ("print(b)", "print(c)"),
+    )
+    assert _diff(old, new) == ((Finding(4, 0, "print"),), (Finding(1, 0, "print"),))
+    assert _diff(new, new) == ((), ())
+
+
+def test_watcher(tmp_path):
+    """Testing Watcher - initial scan and incremental rescans of modified, added and removed files"""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg/__init__.py").write_text("")
+    (tmp_path / "pkg/mod.py").write_text("print(1)\n")
+    (tmp_path / "pkg/old.py").write_text("print(0)\n")
+
+    with Scanner() as scanner:
+        watcher = Watcher(scanner, [str(tmp_path)])
+        assert watcher.start() == 1
+    assert set(watcher.files) == {
+        str(tmp_path / "pkg/__init__.py"),
+        str(tmp_path / "pkg/mod.py"),
+        str(tmp_path / "pkg/old.py"),
+    }
+    assert watcher.poll() == set()
+
+    _touch(tmp_path / "pkg/mod.py", "i = 1\nprint(1)\nprint(2)\n")
+    (tmp_path / "pkg/sub").mkdir()
+    (tmp_path / "pkg/sub/__init__.py").write_text("")
+    (tmp_path / "pkg/sub/new.py").write_text("print(3)\n")
+    (tmp_path / "pkg/old.py").unlink()
+    changed = watcher.poll()
+    assert changed == {
+        str(tmp_path / "pkg/mod.py"),
+        str(tmp_path / "pkg/old.py"),
+        str(tmp_path / "pkg/sub/__init__.py"),
+        str(tmp_path / "pkg/sub/new.py"),
+    }
+    # Changes are reported once, so a burst of saves can settle
+    assert watcher.poll() == set()
+    changes = watcher.rescan(changed)
+    assert changes == [
+        Change("pkg.mod", str(tmp_path / "pkg/mod.py"), (Finding(3, 0, "print"),), ()),
+        Change("pkg.old", str(tmp_path / "pkg/old.py"), (), (Finding(1, 0, "print"),)),
+        Change(
+            "pkg.sub.new",
+            str(tmp_path / "pkg/sub/new.py"),
+            (Finding(1, 0, "print"),),
+            (),
+        ),
+    ]
+    assert str(tmp_path / "pkg/old.py") not in watcher.files
+
+    _touch(tmp_path / "pkg/mod.py", "print(1\n")  # Saved in the middle of editing
+    with mock.patch("noprint.watch.logging.log") as mock_log:
+        assert not watcher.rescan(watcher.poll())
+        mock_log.assert_called_once()
+    assert watcher.poll() == set()
+    assert len(watcher.files[str(tmp_path / "pkg/mod.py")].findings) == 2
+
+
+def test_watcher_errors(tmp_path):
+    """Testing Watcher - errors of the initial scan are reported, unreadable directories are skipped"""
+    with Scanner() as scanner, mock.patch("noprint.sprint.logging.reporter"):
+        watcher = Watcher(scanner, [str(tmp_path / "missing.py")])
+        assert watcher.start() == 2
+    assert not watcher.files
+    missing = str(tmp_path / "missing")
+    assert watcher._discover(missing) == set()  # pylint: disable=protected-access
+
+
+def test_watcher_notebook(tmp_path):
+    """Testing Watcher - notebooks are rescanned cell by cell, findings matched by their source lines"""
+
+    def write(*sources):
+        cells = [{"cell_type": "code", "source": source} for source in sources]
+        _touch(tmp_path / "nb.ipynb", json.dumps({"cells": cells}))
+
+    write("print(1)", "x = 1")
+    with Scanner() as scanner:
+        watcher = Watcher(scanner, [str(tmp_path)])
+        assert watcher.start() == 1
+    path = str(tmp_path / "nb.ipynb")
+    assert watcher.files[path].lines == ("print(1)",)
+
+    write("x = 0", "print(1)\nprint(2)")
+    assert watcher.rescan(watcher.poll()) == [
+        Change("nb", path, (Finding(2, 0, "print", 2),), ()),
+    ]
+
+
+@mock.patch("noprint.watch.time.sleep")
+def test_watcher_run(mock_sleep, tmp_path):
+    """Testing Watcher.run - bursts of changes are debounced into a single rescan"""
+    (tmp_path / "mod.py").write_text("print(1)\n")
+    polls = iter([set(), {str(tmp_path / "mod.py")}, {str(tmp_path / "mod.py")}, set()])
+
+    with Scanner() as scanner, mock.patch.object(
+        Watcher, "poll", side_effect=lambda: next(polls)
+    ), mock.patch.object(Watcher, "rescan", return_value=[]) as mock_rescan, mock.patch(
+        "noprint.watch.logging.log"
+    ):
+        Watcher(scanner, [str(tmp_path / "mod.py")], interval=1, debounce=0.1).run(
+            rounds=1
+        )
+    mock_rescan.assert_called_once_with({str(tmp_path / "mod.py")})
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [1, 1, 0.1, 0.1]
+
+
+@mock.patch("noprint.watch.time.sleep")
+def test_watcher_run_reports(mock_sleep, tmp_path):  # pylint: disable=unused-argument
+    """Testing Watcher.run - changes found by rescans are reported"""
+    (tmp_path / "mod.py").write_text("x = 1\n")
+    path = str(tmp_path / "mod.py")
+    change = Change("mod", path, (Finding(1, 0, "print"),), ())
+
+    with Scanner() as scanner, mock.patch.object(
+        Watcher, "poll", side_effect=[{path}, set()]
+    ), mock.patch.object(Watcher, "rescan", return_value=[change]), mock.patch(
+        "noprint.watch.report_change"
+    ) as mock_report, mock.patch(
+        "noprint.watch.logging.log"
+    ):
+        Watcher(scanner, [path]).run(rounds=1, level=40)
+    mock_report.assert_called_once_with(change, 40)
+
+
+def test_report_change():
+    """Testing report_change - new findings at selected level, resolved ones as information"""
+    reporter = Reporter(io.StringIO(), color=False)
+    report_change(
+        Change(
+            "pkg",
+            "pkg/__init__.py",
+            (Finding(2, 0, "print"),),
+            (Finding(1, 0, "print"),),
+        ),
+        40,
+        reporter,
+    )
+    report_change(
+        Change("nb", "nb.ipynb", (Finding(1, 0, "print", 4),), ()), 40, reporter
+    )
+    reporter.flush()
+    assert reporter.stream.getvalue().splitlines() == [
+        "[ERROR]:[NEW]:[pkg.__init__] Line: 2",
+        "[RESOLVED]:[pkg.__init__] Line: 1",
+        "[ERROR]:[NEW]:[nb] Cell: 4 Line: 1",
+    ]
+
+
+def test_watcher_filter(tmp_path):
+    """Testing Watcher - added files are matched by the path filter relative to their scan root"""
+    root = tmp_path / "build"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg/__init__.py").write_text("")
+
+    def find_parent(package, in_cwd):  # pylint: disable=unused-argument
+        if package != "pkg":
+            raise ModuleNotFoundError(package)
+        return str(root)
+
+    packages = [str(root / "pkg"), str(root / "pkg/__init__.py"), "pkg", "missing"]
+    with Scanner(exclude=["build", "bui*", "migrations"]) as scanner:
+        with mock.patch("noprint.module._find_parent_dir", side_effect=find_parent):
+            watcher = Watcher(scanner, packages)
+            assert watcher.roots == [
+                os.path.normcase(str(root / "pkg")),
+                os.path.normcase(str(root / "pkg")),
+                os.path.normcase(str(root)),
+            ]
+            assert watcher.start() == 2  # Package "missing" is reported
+    for directory in ("pkg/migrations", "pkg/sub"):
+        (root / directory).mkdir()
+        (root / directory / "mod.py").write_text("print(1)\n")
+    stat = os.stat(root / "pkg")
+    os.utime(root / "pkg", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert watcher.poll() == {str(root / "pkg/sub/mod.py")}